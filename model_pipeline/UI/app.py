@@ -6,24 +6,31 @@ import trimesh
 from matplotlib.colors import Normalize, LinearSegmentedColormap
 import json
 import os
+import sys
 import streamlit as st
 import tempfile
 import open3d as o3d
-from ui_based_services.load_view_model import load_and_display_model
+
+# Make the shared model_pipeline modules importable from the UI services
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feature_store import features_to_json, features_to_npz_bytes
+from ui_based_services.load_view_model import load_and_display_model, simplify_to_error, lod_levels, model_preview
+from ui_based_services.upload_cache import cached_mesh, cached_result, cache_stats
 from ui_based_services.feature_extraction import process_mesh_features
-from ui_based_services.feature_analysis import analyze_features
+from feature_statistics import analyze_feature_source, corpus_statistics
 from ui_based_services.shape_classification import (
-    refine_shapes,visualize_mesh, shape_statistics_table,
+    refine_shapes, classify_faces, segment_mesh, visualize_mesh, shape_statistics_table,
 )
 from ui_based_services.feature_visualizations import (
-    visualize_curvature_distribution, load_features, visualize_mesh_with_curvature,
+    visualize_curvature_distribution, load_uploaded_features, visualize_mesh_with_curvature,
 )
 from ui_based_services.model_visualization_plotted import (
-    visualize_point_cloud, create_point_cloud_from_mesh,
+    visualize_point_cloud, create_point_cloud_from_mesh, point_cloud_preview,
 )
 
 from ui_based_services.model_visualization_annotated import (
-    load_mesh, visualize_mesh_with_annotations
+    visualize_mesh_with_annotations
 )
 
 from ui_based_services.model_visualization_labelled import (
@@ -49,12 +56,8 @@ if main_section == "Model Viewer & Feature Extraction":
         uploaded_file = st.file_uploader("Choose a STL file", type="stl")
 
         if uploaded_file is not None:
-            # Create a temporary file to store the uploaded STL file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".stl") as temp_file:
-                temp_file.write(uploaded_file.read())
-                temp_file_path = temp_file.name
-
-            mesh = load_and_display_model(temp_file_path)
+            # Parse the uploaded STL bytes once per upload, no temporary file needed
+            mesh = cached_result(uploaded_file, "open3d_mesh", lambda: load_and_display_model(uploaded_file.getvalue()))
 
             # Optionally, display some basic info about the mesh
             if mesh:
@@ -65,16 +68,26 @@ if main_section == "Model Viewer & Feature Extraction":
                 "Number of Triangles": [len(mesh.triangles)],
                 })
                 st.table(features_df)
+
+                # Off-screen preview of the standard views, cached by mesh content
+                st.image(cached_result(uploaded_file, "preview", lambda: model_preview(uploaded_file.getvalue())),
+                         caption="Preview (iso, front, right, top)")
+
+                # Optionally view the coarsest cached LOD level within an error tolerance
+                view_mesh = mesh
+                if st.checkbox("Simplify for viewing"):
+                    levels = cached_result(uploaded_file, "lod_levels", lambda: lod_levels(mesh))
+                    st.table(pd.DataFrame(levels, columns=["Level", "Triangles", "Hausdorff Error", "Mean Error"]))
+                    max_error = st.number_input("Maximum error (model units)", min_value=0.0, value=0.05, step=0.01, format="%.3f")
+                    view_mesh = cached_result(uploaded_file, ("lod_mesh", max_error), lambda: simplify_to_error(mesh, max_error))
+                    st.write(f"Viewing {len(view_mesh.triangles)} of {len(mesh.triangles)} triangles")
                 if st.button("Open 3D Viewer"):
                     # Open 3D visualizer window
-                    o3d.visualization.draw_geometries([mesh], window_name="3D Model Viewer", width=800, height=600, left=50, top=50)
+                    o3d.visualization.draw_geometries([view_mesh], window_name="3D Model Viewer", width=800, height=600, left=50, top=50)
                 st.write(f"Number of vertices: {len(mesh.vertices)}")
                 st.write(f"Number of triangles: {len(mesh.triangles)}")
             else:
                 st.error("Failed to load the model. Please check the file format.")
-
-            # Clean up the temporary file after visualization
-            os.remove(temp_file_path)
         else:
             st.info("Please upload an STL file to visualize.")
 
@@ -85,13 +98,8 @@ if main_section == "Model Viewer & Feature Extraction":
         uploaded_file = st.file_uploader("Upload your STL file for feature extraction", type="stl")
 
         if uploaded_file is not None:
-            # Create a temporary file to store the uploaded STL file
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".stl") as temp_file:
-                temp_file.write(uploaded_file.read())
-                temp_file_path = temp_file.name
-
-            # Process the mesh to extract features
-            features = process_mesh_features(temp_file_path)
+            # Extract features from the parsed mesh, once per upload
+            features = cached_result(uploaded_file, "process_mesh_features", lambda: process_mesh_features(cached_mesh(uploaded_file)))
 
             # Display features in a table
             st.subheader("Extracted Features")
@@ -107,7 +115,7 @@ if main_section == "Model Viewer & Feature Extraction":
             st.table(features_df)
 
             # Place download buttons side by side
-            col1, col2 = st.columns(2)
+            col1, col2, col3 = st.columns(3)
 
             with col1:
                 # Create a downloadable CSV button
@@ -120,16 +128,23 @@ if main_section == "Model Viewer & Feature Extraction":
                 )
             
             with col2:
-                # Convert the 'features' dictionary to a JSON format and make it downloadable
-                features_json = json.dumps(features, indent=4).encode('utf-8')
+                # Package the typed feature arrays as a binary .npz archive
+                st.download_button(
+                    label="Download raw features as NPZ",
+                    data=cached_result(uploaded_file, "features_npz", lambda: features_to_npz_bytes(features)),
+                    file_name='extracted_features(NPZ).npz',
+                    mime='application/octet-stream'
+                )
+
+            with col3:
+                # Explicit export of the raw features in the legacy JSON layout
+                features_json = cached_result(uploaded_file, "features_json", lambda: features_to_json(features).encode('utf-8'))
                 st.download_button(
                     label="Download raw features as JSON",
                     data=features_json,
                     file_name='extracted_features(JSON).json',
                     mime='application/json'
                 )
-            
-            os.remove(temp_file_path)
         else:
             st.info("Please upload an STL file to extract features.")
 
@@ -137,19 +152,23 @@ if main_section == "Model Viewer & Feature Extraction":
         st.header("Feature Analysis")
         st.write("This section allows you to analyze the geometric features extracted from the uploaded STL file.")
         
-        # Provide a way to load previously extracted features or allow a new upload
-        extracted_features_path = st.file_uploader("Upload extracted features JSON", type="json")
-
-        if extracted_features_path is not None:
-            # Load the extracted features
-            features = json.load(extracted_features_path)
-            
-            vertices = np.array(features['vertices'])
-            faces = np.array(features['faces'])
-            curvatures = np.array(features['curvatures'])
-            
-            # Analyze features
-            feature_df = analyze_features(vertices, faces, curvatures)
+        # Provide a way to load previously extracted features; several files give corpus-wide statistics
+        extracted_feature_files = st.file_uploader("Upload extracted features (NPZ or JSON)", type=["npz", "json"], accept_multiple_files=True)
+
+        if extracted_feature_files:
+            # Stream the curvatures of each upload into mergeable statistics, once per upload
+            results = [
+                cached_result(feature_file, "analyze_feature_source", lambda feature_file=feature_file: analyze_feature_source(feature_file))
+                for feature_file in extracted_feature_files
+            ]
+            feature_dfs = [feature_df for feature_df, _ in results]
+
+            if len(results) == 1:
+                feature_df = feature_dfs[0]
+            else:
+                # One row per file plus the merged statistics of all of them
+                feature_df = pd.concat(feature_dfs + [corpus_statistics(feature_dfs, [stats for _, stats in results])], ignore_index=True)
+                feature_df.insert(0, "file", [feature_file.name for feature_file in extracted_feature_files] + ["All files"])
 
             # Display statistics in a table
             st.subheader("Feature Statistics")
@@ -181,29 +200,20 @@ if main_section == "Model Viewer & Feature Extraction":
         st.header("Feature Visualization")
         st.write("Visualize and analyze the geometric features extracted from the model.")
 
-        # File uploader for STL and JSON feature files
+        # File uploader for STL and extracted feature files
         uploaded_mesh_file = st.file_uploader("Upload the STL file for mesh visualization", type="stl")
-        uploaded_feature_file = st.file_uploader("Upload the JSON file for extracted features", type="json")
+        uploaded_feature_file = st.file_uploader("Upload the extracted features (NPZ or JSON)", type=["npz", "json"])
 
         if uploaded_mesh_file is not None and uploaded_feature_file is not None:
-            # Create temporary files for STL and JSON
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".stl") as temp_stl_file:
-                temp_stl_file.write(uploaded_mesh_file.read())
-                stl_file_path = temp_stl_file.name
-
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".json") as temp_json_file:
-                temp_json_file.write(uploaded_feature_file.read())
-                json_file_path = temp_json_file.name
-
-            # Load extracted features from JSON
-            features = load_features(json_file_path)
+            # Load extracted features straight from the upload, once per upload
+            features = cached_result(uploaded_feature_file, "features", lambda: load_uploaded_features(uploaded_feature_file))
 
             # Extract curvatures from features
-            curvatures = np.array(features['curvatures'])
+            curvatures = features['curvatures']
 
             # Visualize curvature distribution as a histogram
             st.subheader("Curvature Distribution")
-            curvature_fig = visualize_curvature_distribution(curvatures)
+            curvature_fig = cached_result(uploaded_feature_file, "curvature_figure", lambda: visualize_curvature_distribution(curvatures))
             st.pyplot(curvature_fig)
 
             # Create a download button for the curvature histogram
@@ -218,14 +228,14 @@ if main_section == "Model Viewer & Feature Extraction":
             
             # Visualize the 3D mesh with curvature values
             st.subheader("Mesh with Curvature Visualization")
-            mesh = visualize_mesh_with_curvature(stl_file_path, curvatures)
+            mesh = visualize_mesh_with_curvature(cached_mesh(uploaded_mesh_file), curvatures)
             
             # Display mesh using trimesh in Streamlit (can use trimesh viewer, though external window)
             if st.button("Open 3D Mesh Viewer"):
                 trimesh.Scene([mesh]).show()
             
         else:
-            st.info("Please upload both an STL file and a JSON file containing extracted features to proceed with visualization.")
+            st.info("Please upload both an STL file and a file containing extracted features to proceed with visualization.")
 
 elif main_section == "Geometric Analysis":
     # New section for Geometric Analysis
@@ -242,29 +252,34 @@ elif main_section == "Geometric Analysis":
         
 
         if uploaded_file is not None:
-            # Save uploaded file temporarily
-            with open("temp_model.stl", "wb") as f:
-                f.write(uploaded_file.getbuffer())
-
-            # Process and classify shapes
-            shapes = refine_shapes([{'faces': [i]} for i in range(len(trimesh.load("temp_model.stl").faces))], 
-                                trimesh.load("temp_model.stl").vertices, trimesh.load("temp_model.stl").faces)
+            # Parse the uploaded STL once per upload
+            model_bytes = uploaded_file.getvalue()
+            mesh = cached_mesh(uploaded_file)
+
+            # Group triangles into surface patches, or classify every face on its own
+            group_patches = st.checkbox("Group triangles into surface patches", value=True)
+            if group_patches:
+                shapes = cached_result(uploaded_file, ("refine_shapes", "patches"),
+                                       lambda: refine_shapes(segment_mesh(mesh.vertices, mesh.faces), mesh.vertices, mesh.faces))
+            else:
+                shapes = cached_result(uploaded_file, ("refine_shapes", "faces"), lambda: classify_faces(mesh.vertices, mesh.faces))
             
             # Display classified shapes
             st.subheader("Classified Shapes:")
             shape_type = st.selectbox("Filter by shape type", ["All", "cylinder", "square", "rectangle", "circle", "triangle"])
             
-            filtered_shapes = [shape for shape in shapes if shape['shape'] == shape_type or shape_type == "All"]
+            # Only the selected shapes are expanded into dictionaries
+            filtered_shapes = cached_result(uploaded_file, ("filtered_shapes", group_patches, shape_type), lambda: shapes.filter(shape_type).to_list())
 
             col1, col2 = st.columns(2)
 
             with col1:    
                 # Display 3D model visualization
                 if st.button("Visualize 3D Model"):
-                    visualize_mesh("temp_model.stl")
+                    visualize_mesh(model_bytes)
             with col2:
                 # Option to download the classified shapes as JSON
-                output_json = json.dumps(filtered_shapes, indent=4)
+                output_json = cached_result(uploaded_file, ("filtered_shapes_json", group_patches, shape_type), lambda: json.dumps(filtered_shapes, indent=4))
                 st.download_button(label="Download Filtered Classified Shapes", data=output_json, file_name="filtered_shapes.json", mime="application/json")
 
             # Display some statistical insights
@@ -286,15 +301,18 @@ elif main_section == "Geometric Analysis":
             # Upload the STL file
         uploaded_file = st.file_uploader("Upload your STL model", type=['stl'])
         if uploaded_file is not None:
-            # Create a temporary file to save the uploaded STL
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.stl') as temp_file:
-                temp_file.write(uploaded_file.read())
-                temp_file_path = temp_file.name
-
-            # Load the mesh using trimesh from the saved temporary file
-            mesh = trimesh.load(temp_file_path)
-
-            point_cloud = create_point_cloud_from_mesh(mesh, density=10000)
+            # Reuse the mesh and point cloud parsed for this upload
+            mesh = cached_mesh(uploaded_file)
+
+            # Sampling is seeded, so every rerun reuses the same cloud for the same settings
+            sampling_method = st.selectbox("Sampling method", ["area", "poisson", "voxel"],
+                                           help="Uniform random points, evenly spread Poisson-disk points or one point per voxel")
+            point_count = int(st.number_input("Number of points", min_value=100, max_value=200000, value=10000, step=1000))
+            point_cloud = cached_result(uploaded_file, ("point_cloud", sampling_method, point_count),
+                                        lambda: create_point_cloud_from_mesh(mesh, density=point_count, method=sampling_method))
+            # Off-screen preview of the cloud; the button below opens the interactive viewer
+            st.image(cached_result(uploaded_file, ("point_cloud_preview", sampling_method, point_count),
+                                   lambda: point_cloud_preview(point_cloud)), caption="Point cloud preview")
                 # Button to visualize point cloud
             if st.button("Visualize Point Cloud"):
                 # Create a point cloud from the mesh
@@ -310,13 +328,8 @@ elif main_section == "Geometric Analysis":
         # Upload the STL file
         uploaded_file = st.file_uploader("Upload your STL model", type=['stl'])
         if uploaded_file is not None:
-            # Create a temporary file to save the uploaded STL
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.stl') as temp_file:
-                temp_file.write(uploaded_file.read())
-                temp_file_path = temp_file.name
-            
-            # Load the mesh using trimesh from the saved temporary file
-            mesh = load_mesh(temp_file_path)
+            # Reuse the mesh parsed for this upload
+            mesh = cached_mesh(uploaded_file)
 
             # Button to visualize the annotated model
             if st.button("Visualize Annotated Model"):
@@ -330,17 +343,15 @@ elif main_section == "Geometric Analysis":
         uploaded_file = st.file_uploader("Upload your STL model", type=['stl'])
 
         if uploaded_file is not None:
-            # Create a temporary file to save the uploaded STL
-            with tempfile.NamedTemporaryFile(delete=False, suffix='.stl') as temp_file:
-                temp_file.write(uploaded_file.read())
-                temp_file_path = temp_file.name
+            # Reuse the mesh parsed for this upload
+            mesh = cached_mesh(uploaded_file)
 
-            # Load the mesh using trimesh
-            mesh = load_mesh(temp_file_path)
+            # Larger meshes are drawn at a cached LOD level that fits the budget
+            face_budget = int(st.number_input("Display triangle budget", min_value=1000, max_value=500000, value=20000, step=1000))
 
             # Button to visualize the model with labels
             if st.button("Visualize Labelled Model"):
-                visualize_mesh_with_face_annotations(mesh)
+                visualize_mesh_with_face_annotations(mesh, face_budget=face_budget)
 
     elif analysis_selection == "Model visualization - shape identification":
         st.header("Model visualization - shape identification")
@@ -349,4 +360,6 @@ elif main_section == "Geometric Analysis":
             unsafe_allow_html=True
         )
 
-
+# Report how much geometry work the session cache saved
+stats = cache_stats()
+st.sidebar.caption(f"Upload cache: {stats['hits']} hits, {stats['misses']} misses, {stats['uploads']} uploads")
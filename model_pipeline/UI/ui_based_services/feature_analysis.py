@@ -1,8 +1,7 @@
 # feature-analysis.py analyzes geometric features extracted from a 3D mesh. The script computes statistical measures such as the number of vertices, faces, and mean curvatures of the mesh. The feature statistics are saved to CSV and JSON files for further analysis or visualization.
-import numpy as np
-import pandas as pd
 import json
 import os
+from feature_statistics import curvature_statistics, statistics_frame
 
 def analyze_features(vertices, faces, curvatures):
     """
@@ -11,33 +10,12 @@ def analyze_features(vertices, faces, curvatures):
     Parameters:
     - vertices (np.ndarray): Array of vertices.
     - faces (np.ndarray): Array of faces.
-    - curvatures (np.ndarray): Mean curvatures of vertices.
+    - curvatures (np.ndarray): Mean curvatures of the faces.
 
     Returns:
     - feature_df (pd.DataFrame): DataFrame containing feature statistics.
     """
-    # Compute statistical measures
-    vertex_count = len(vertices)
-    face_count = len(faces)
-    curvature_mean = np.mean(curvatures)
-    curvature_std = np.std(curvatures)
-    curvature_min = np.min(curvatures)
-    curvature_max = np.max(curvatures)
-
-    # Prepare feature statistics
-    feature_stats = {
-        "vertex_count": vertex_count,
-        "face_count": face_count,
-        "curvature_mean": curvature_mean,
-        "curvature_std": curvature_std,
-        "curvature_min": curvature_min,
-        "curvature_max": curvature_max
-    }
-
-    # Create a DataFrame for feature statistics
-    feature_df = pd.DataFrame([feature_stats])
-
-    return feature_df
+    return statistics_frame(len(vertices), len(faces), curvature_statistics(curvatures))
 
 def save_features(feature_df, output_dir):
     """
@@ -1,30 +1,29 @@
 #feature-extraction.py extracts geometric features from a 3D mesh.
 import trimesh
-import numpy as np
-import json
+from feature_store import as_feature_arrays
+from stl_reader import load_trimesh
+from mesh_curvature import mesh_curvatures
 
 
-def calculate_dimensions(face_vertices):
-    # Calculate dimensions of the shape
-    length = np.linalg.norm(face_vertices[0] - face_vertices[1])
-    width = np.linalg.norm(face_vertices[1] - face_vertices[2])
-    return {"length": length, "width": width}
-
 def process_mesh_features(file_path):
-    # Load the mesh
-    mesh = trimesh.load(file_path)
+    # Load the mesh (a path or the raw bytes of an upload), or reuse an already parsed one
+    mesh = file_path if isinstance(file_path, trimesh.Trimesh) else load_trimesh(file_path)
     vertices = mesh.vertices
     faces = mesh.faces
-    estimated_mean_curvatures = np.linalg.norm(mesh.face_normals, axis=1)
-
+    # Discrete mean and Gaussian curvature; "curvatures" holds the per-face
+    # mean curvature so faces can be coloured by it
+    curvatures = mesh_curvatures(vertices, faces)
 
-    # Prepare features dictionary
-    features = {
-        "vertices": vertices.tolist(),
-        "faces": faces.tolist(),
-        "edges": mesh.edges.tolist(),
-        "curvatures": estimated_mean_curvatures.tolist(),
-    }
+    # Prepare features dictionary of typed arrays
+    features = as_feature_arrays({
+        "vertices": vertices,
+        "faces": faces,
+        "edges": mesh.edges,
+        "curvatures": curvatures["face_mean"],
+        "gaussian_curvatures": curvatures["face_gaussian"],
+        "vertex_curvatures": curvatures["vertex_mean"],
+        "vertex_gaussian_curvatures": curvatures["vertex_gaussian"],
+    })
 
     return features
 
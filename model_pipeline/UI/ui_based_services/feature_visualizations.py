@@ -1,17 +1,11 @@
 # This script visualizes the extracted features from a 3D mesh model.
 
-import json
 import matplotlib.pyplot as plt
 import numpy as np
 import trimesh
 from matplotlib.colors import Normalize, LinearSegmentedColormap
-
-
-def load_features(json_path):
-    """Load extracted features from a JSON file."""
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-    return data
+from feature_store import load_features, load_uploaded_features
+from stl_reader import load_trimesh
 
 def visualize_curvature_distribution(curvatures):
     """Create a histogram of curvature distribution and return the plot."""
@@ -24,8 +18,12 @@ def visualize_curvature_distribution(curvatures):
 
 def visualize_mesh_with_curvature(mesh_path, curvatures):
     """Visualize the 3D mesh with curvature values highlighted."""
-    # Load the mesh
-    mesh = trimesh.load(mesh_path)
+    # Load the mesh (a path or the raw bytes of an upload); a parsed mesh is
+    # copied so the colours do not leak into a cached instance
+    if isinstance(mesh_path, trimesh.Trimesh):
+        mesh = mesh_path.copy()
+    else:
+        mesh = load_trimesh(mesh_path)
     
     # Define a colormap for curvature values
     cmap = plt.cm.jet
@@ -1,12 +1,15 @@
 # load_model.py loads a 3D CAD model from an STL file and displays it in a 3D viewer using the open3d library. This script can be used to quickly visualize 3D models and inspect their geometry. The load_and_display_model function takes the path to the STL file as input, loads the model, and displays it in a 3D viewer.
-import open3d as o3d
 import numpy as np
+from stl_reader import load_open3d
+from mesh_lod import coarsest_mesh, mesh_lod_pyramid
+from mesh_cache import default_cache
+from mesh_thumbnails import mesh_preview
 
 
 
 def load_and_display_model(model_path):
-    # Load the STL model
-    mesh = o3d.io.read_triangle_mesh(model_path)
+    # Load the STL model (a path or the raw bytes of an upload)
+    mesh = load_open3d(model_path)
     
     # Check if the mesh is loaded successfully
     if not mesh.has_vertices():
@@ -31,3 +34,16 @@ def simplify_mesh(mesh, target_number_of_triangles=1000):
 
     return simplified_mesh
 
+
+def simplify_to_error(mesh, max_error, cache=None):
+    # Coarsest level of the mesh's LOD pyramid whose Hausdorff error stays below max_error;
+    # the pyramid is built once per mesh and kept in the on-disk cache
+    return coarsest_mesh(mesh, max_error, cache or default_cache())
+
+def lod_levels(mesh, cache=None):
+    # (level, triangles, error, mean_error) rows of the mesh's LOD pyramid
+    return mesh_lod_pyramid(mesh, cache or default_cache()).summary()
+
+def model_preview(model_path, cache=None):
+    # PNG contact sheet of the standard views, rendered off-screen once per mesh content
+    return mesh_preview(model_path, cache=cache or default_cache())
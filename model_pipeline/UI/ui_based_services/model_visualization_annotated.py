@@ -1,4 +1,5 @@
-import trimesh
+from stl_reader import load_trimesh
+from face_geometry import mesh_face_geometry
 import numpy as np
 import pyvista as pv
 
@@ -7,28 +8,26 @@ def load_mesh(model_path):
     Load a 3D model using trimesh.
     
     Parameters:
-        model_path (str): Path to the model file.
+        model_path (str or bytes): Path to the model file or its contents.
         
     Returns:
         trimesh.Trimesh: Loaded 3D model.
     """
-    mesh = trimesh.load(model_path)
+    mesh = load_trimesh(model_path)
     return mesh
 
-def calculate_edge_lengths(vertices, face):
+def calculate_edge_lengths(geometry, face_index):
     """
-    Calculate the edge lengths of a face.
+    Look up the edge lengths of a face.
     
     Parameters:
-        vertices (numpy.ndarray): Vertices of the mesh.
-        face (list): Indices of the face's vertices.
+        geometry (FaceGeometry): Shared per-face geometry of the mesh.
+        face_index (int): Index of the face.
         
     Returns:
         list: Edge lengths of the face.
     """
-    face_vertices = vertices[face]
-    edge_lengths = [np.linalg.norm(face_vertices[i] - face_vertices[(i+1) % len(face_vertices)]) for i in range(len(face_vertices))]
-    return edge_lengths
+    return geometry.edge_lengths[face_index].tolist()
 
 def visualize_mesh_with_annotations(mesh):
     """
@@ -39,9 +38,11 @@ def visualize_mesh_with_annotations(mesh):
     """
     points = mesh.vertices
     faces = mesh.faces.reshape(-1, 3)  # Reshape faces correctly
+    # Edge lengths of every face, computed once and shared with the other views
+    geometry = mesh_face_geometry(mesh)
 
     # PyVista expects faces formatted as [n, v0, v1, ..., vn, n, v0, v1, ..., vn, ...]
-    face_indices = np.hstack([[3] + list(face) for face in faces])
+    face_indices = np.column_stack([np.full(len(faces), 3), faces]).ravel()
 
     # Create a PyVista mesh object
     pyvista_mesh = pv.PolyData(points, face_indices)
@@ -57,8 +58,7 @@ def visualize_mesh_with_annotations(mesh):
             plotter.remove_actor(annotation)  # Remove previous annotation
         if idx < 0:
             return
-        face = faces[idx]
-        edge_lengths = calculate_edge_lengths(points, face)
+        edge_lengths = calculate_edge_lengths(geometry, idx)
         annotation_text = ", ".join(f"Edge {i+1}: {length:.2f}" for i, length in enumerate(edge_lengths))
         annotation = plotter.add_text(annotation_text, position='lower_left', font_size=10, color='black')
         plotter.render()
@@ -1,7 +1,11 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-import trimesh
+from stl_reader import load_trimesh
+from face_geometry import mesh_face_geometry
+from display_lod import DISPLAY_FACE_BUDGET, DISPLAY_POINT_BUDGET, budget_points, display_mesh
+from mesh_cache import default_cache
+from figure_payload import PositionQuantizer, compact_mesh3d, compact_scatter3d
 import tempfile
 
 def load_mesh(model_path):
@@ -9,106 +13,93 @@ def load_mesh(model_path):
     Load a 3D mesh from a file path using trimesh.
     
     Parameters:
-        model_path (str): Path to the STL model file.
+        model_path (str or bytes): Path to the STL model file or its contents.
         
     Returns:
         trimesh.Trimesh: Loaded mesh model.
     """
-    mesh = trimesh.load(model_path)
+    mesh = load_trimesh(model_path)
     return mesh
 
-def calculate_face_dimensions(vertices, face):
+def create_hover_template(with_face_index=False):
     """
-    Calculate dimensions of a triangular face, returning width and height.
+    Create the hover template displaying width and height.
     
-    Parameters:
-        vertices (np.ndarray): Vertices of the mesh.
-        face (np.ndarray): Indices of the vertices forming a face.
-        
-    Returns:
-        dict: A dictionary with 'width' and 'height' of the face.
-    """
-    face_vertices = vertices[face]
-    edges = [np.linalg.norm(face_vertices[i] - face_vertices[(i+1) % len(face_vertices)]) for i in range(len(face_vertices))]
-    dimensions = {
-        'width': edges[0],
-        'height': edges[1] if len(edges) > 1 else edges[0],
-    }
-    return dimensions
-
-def create_hover_template(face_dimensions):
-    """
-    Create a hover template displaying width and height.
+    The browser fills it in from each marker's customdata (width, height and,
+    for decimated meshes, the full-resolution face index), so no per-face text
+    is sent. Otherwise the face index is the marker's own point number.
     
     Parameters:
-        face_dimensions (dict): Dictionary with 'width' and 'height'.
+        with_face_index (bool): Whether customdata carries the face index.
         
     Returns:
-        str: Formatted hover text with width and height.
+        str: Plotly hovertemplate.
     """
-    return f"Width: {face_dimensions['width']:.2f}<br>Height: {face_dimensions['height']:.2f}"
+    face = "%{customdata[2]:.0f}" if with_face_index else "%{pointNumber}"
+    return f"Face {face}<br>Width: %{{customdata[0]:.2f}}<br>Height: %{{customdata[1]:.2f}}<extra></extra>"
 
-def visualize_mesh_with_face_annotations(mesh):
+def visualize_mesh_with_face_annotations(mesh, face_budget=DISPLAY_FACE_BUDGET, point_budget=DISPLAY_POINT_BUDGET):
     """
     Visualize a 3D mesh with Plotly, adding face dimension annotations.
     
     Parameters:
         mesh (trimesh.Trimesh): Loaded mesh model.
+        face_budget (int): Most triangles to draw; larger meshes are shown at a cached LOD level.
+        point_budget (int): Most vertices to draw in the vertex overlay.
     """
-    points = mesh.vertices
-    faces = mesh.faces
-
-    # Create face dimension annotations
-    face_x = []
-    face_y = []
-    face_z = []
-    face_texts = []
+    # Draw a representation that fits the budget; the labels still describe
+    # the full-resolution face each drawn face stands for
+    shown = display_mesh(mesh, face_budget, default_cache())
+    points = shown.vertices
+    faces = shown.faces
 
-    for face in faces:
-        dimensions = calculate_face_dimensions(points, face)
-        centroid = points[face].mean(axis=0)
-        face_x.append(centroid[0])
-        face_y.append(centroid[1])
-        face_z.append(centroid[2])
-        face_texts.append(create_hover_template(dimensions))
+    # Face dimensions from the shared edge lengths (width = edge 1, height = edge 2)
+    # of the full-resolution face each drawn face stands for, as numbers
+    geometry = mesh_face_geometry(mesh)
+    face_data = geometry.edge_lengths[shown.source_faces, :2]
+    if shown.decimated:
+        face_data = np.column_stack([face_data, shown.source_faces])
+    centroids = points[faces].mean(axis=1)
 
     # Color the vertices based on Z-coordinate
-    colors = points[:, 2]  # Use Z-coordinate for color gradient
+    overlay = points[budget_points(points, point_budget)]
+    colors = overlay[:, 2].astype(np.float32)  # Use Z-coordinate for color gradient
+
+    # Positions are sent as uint16 steps of the bounding box
+    quantizer = PositionQuantizer(points)
 
     # Create the Plotly figure
     fig = go.Figure()
 
-    # Add faces as a 3D mesh with annotations
-    fig.add_trace(go.Mesh3d(
-        x=points[:, 0],
-        y=points[:, 1],
-        z=points[:, 2],
-        i=faces[:, 0],
-        j=faces[:, 1],
-        k=faces[:, 2],
+    # Add faces as a 3D mesh
+    fig.add_trace(compact_mesh3d(
+        points, faces, quantizer,
         opacity=0.5,
-        hoverinfo='text',
-        hovertext=face_texts,
+        hoverinfo='skip',
         colorscale='Blues',
         showscale=False
     ))
 
+    # Add the face annotations as small centroid markers that show the dimensions on hover
+    fig.add_trace(compact_scatter3d(
+        centroids, quantizer, customdata=face_data,
+        mode='markers',
+        marker=dict(size=2, color='navy', opacity=0.3),
+        hovertemplate=create_hover_template(shown.decimated),
+        showlegend=False
+    ))
+
     # Add vertices as scatter3d with color
-    fig.add_trace(go.Scatter3d(
-        x=points[:, 0],
-        y=points[:, 1],
-        z=points[:, 2],
+    fig.add_trace(compact_scatter3d(
+        overlay, quantizer,
         mode='markers',
         marker=dict(size=4, color=colors, colorscale='Viridis', colorbar=dict(title='Z Coordinate')),
+        hoverinfo='skip',
         showlegend=False
     ))
 
-    # Update layout for axis titles
-    fig.update_layout(scene=dict(
-        xaxis_title='X',
-        yaxis_title='Y',
-        zaxis_title='Z'
-    ))
+    # Label the quantized axes in model units
+    fig.update_layout(scene=quantizer.scene())
 
     # Display the figure in Streamlit
     st.plotly_chart(fig)
\ No newline at end of file
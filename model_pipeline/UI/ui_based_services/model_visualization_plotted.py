@@ -3,20 +3,23 @@ import numpy as np
 import trimesh
 import open3d as o3d
 import tempfile  # To create a temporary file
+from point_sampling import SEED, sample_mesh
+from mesh_thumbnails import png_bytes, render_points, save_points_png
 
-def create_point_cloud_from_mesh(mesh, density=10000):
+def create_point_cloud_from_mesh(mesh, density=10000, method="area", seed=SEED):
     """
-    Create a point cloud from a mesh by sampling points from its surface using trimesh.
+    Create a point cloud from a mesh by sampling points from its surface.
     
     Parameters:
         mesh (trimesh.Trimesh): The input mesh.
         density (int): Number of points to sample from the mesh surface.
+        method (str): "area" (uniform random), "poisson" (evenly spread) or "voxel" sampling.
+        seed (int): Seed of the sampling, so the same mesh always gives the same cloud.
         
     Returns:
         numpy.ndarray: Array of sampled points.
     """
-    points = mesh.sample(density)
-    return points
+    return sample_mesh(mesh, method, count=density, seed=seed).points
 
 def visualize_point_cloud(points):
     """
@@ -50,34 +53,26 @@ def visualize_point_cloud(points):
     vis.run()
     vis.destroy_window()
 
+def point_cloud_preview(points, size=512):
+    """
+    Render a point cloud with red dots off-screen, for st.image.
+    
+    Parameters:
+        points (numpy.ndarray): Array of points to visualize.
+        size (int): Width and height of the image in pixels.
+        
+    Returns:
+        bytes: PNG image.
+    """
+    return png_bytes(render_points(points, size=size))
+
 def save_point_cloud_visualization(points, image_path):
     """
-    Save a point cloud visualization as an image using Open3D.
+    Save a point cloud visualization as an image, rendered off-screen so no window or display is needed.
     
     Parameters:
         points (numpy.ndarray): Array of points to visualize.
         image_path (str): Path to save the image.
     """
-    # Create an Open3D point cloud object
-    pcd = o3d.geometry.PointCloud()
-    pcd.points = o3d.utility.Vector3dVector(points)
-    
-    # Set point color to red
-    colors = np.asarray(pcd.points)
-    pcd.colors = o3d.utility.Vector3dVector(np.ones_like(colors) * [1, 0, 0])
-    
-    # Create the visualizer
-    vis = o3d.visualization.Visualizer()
-    vis.create_window()
-    vis.add_geometry(pcd)
-    
-    # Set the point size
-    render_option = vis.get_render_option()
-    render_option.point_size = 5
-    
-    # Capture the screenshot
-    vis.poll_events()
-    vis.update_renderer()
-    vis.capture_screen_image(image_path)
-    vis.destroy_window()
-    print(f"Point cloud visualization saved to {image_path}")
\ No newline at end of file
+    save_points_png(points, image_path)
+    print(f"Point cloud visualization saved to {image_path}")
@@ -1,62 +1,49 @@
 import streamlit as st
-import open3d as o3d
 import numpy as np
-import matplotlib.pyplot as plt
+from stl_reader import load_open3d
+from circle_features import detect_circles
+from sketch_drawing import key_dimensions, mesh_sketch, plot_sketch
 
 def load_model(file_path):
     """
     Load the model using Open3D.
     
     Parameters:
-        file_path (str): Path to the STL model file.
+        file_path (str or bytes): Path to the STL model file or its contents.
         
     Returns:
         open3d.geometry.TriangleMesh: Loaded 3D model.
     """
-    mesh = o3d.io.read_triangle_mesh(file_path)
+    mesh = load_open3d(file_path)
     return mesh
 
-def create_hand_drawn_effect(mesh):
+def create_hand_drawn_effect(mesh, show_hidden=True):
     """
-    Create a hand-drawn style effect for the 3D model with dashed edges.
+    Create a hand-drawn style sketch of the 3D model.
+
+    Only feature edges (boundary, sharp and silhouette edges) are drawn, split
+    into visible runs and dashed hidden runs, all in one line collection.
     
     Parameters:
         mesh (open3d.geometry.TriangleMesh): Loaded 3D model.
-    """
-    vertices = np.asarray(mesh.vertices)
-    faces = np.asarray(mesh.triangles)
-
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection='3d')
-
-    # Plot dashed edges for each face
-    for face in faces:
-        for i in range(3):
-            start = vertices[face[i]]
-            end = vertices[face[(i + 1) % 3]]
-            line = np.vstack([start, end])
-            ax.plot(line[:, 0], line[:, 1], line[:, 2], c='k', linestyle='--')
+        show_hidden (bool): Draw the hidden edges dashed instead of leaving them out.
 
-    # Label axes
-    ax.set_xlabel('X axis')
-    ax.set_ylabel('Y axis')
-    ax.set_zlabel('Z axis')
-
-    # Show plot
-    plt.show()
+    Returns:
+        matplotlib.figure.Figure: The sketch.
+    """
+    # Returned for st.pyplot; plt.show() would wait for a window the server does not have
+    ax = plot_sketch(mesh_sketch(mesh), show_hidden=show_hidden)
+    return ax.figure
 
 def draw_dimensions(vertices, faces, ax):
     """
-    Draw the dimensions on the edges of the model by calculating edge lengths.
+    Draw the dimensions that describe the model: its overall extents and its distinct hole and boss diameters.
     
     Parameters:
         vertices (numpy.ndarray): Vertices of the mesh.
         faces (numpy.ndarray): Faces (triangles) of the mesh.
         ax (Axes3D): The matplotlib 3D axis to draw the dimensions on.
     """
-    for face in faces:
-        for i in range(3):
-            start = vertices[face[i]]
-            end = vertices[face[(i + 1) % 3]]
-            mid_point = (start + end) / 2
-            ax.text(mid_point[0], mid_point[1], mid_point[2], f'{np.linalg.norm(end - start):.2f}', color='red')
\ No newline at end of file
+    vertices = np.asarray(vertices, dtype=np.float64)
+    for label in key_dimensions(vertices, detect_circles(vertices, faces)):
+        ax.text(*label['position'], label['text'], color='red')
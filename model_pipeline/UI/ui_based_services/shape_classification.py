@@ -1,8 +1,10 @@
 import numpy as np
-import trimesh
 import json
 import open3d as o3d
 import pyvista as pv
+from stl_reader import load_stl, load_trimesh
+from batch_classification import ShapeTable, classify_faces, classify_shapes
+from mesh_segmentation import segment_mesh
 
 
 def is_cylinder(vertices, threshold=0.1):
@@ -14,13 +16,13 @@ def is_cylinder(vertices, threshold=0.1):
 def is_rectangle(vertices, threshold=0.1):
     if len(vertices) != 4:
         return False
-    edges = np.linalg.norm(np.diff(vertices, axis=0), axis=1)
+    edges = np.linalg.norm(np.roll(vertices, -1, axis=0) - vertices, axis=1)
     return np.allclose(edges[0], edges[2], rtol=threshold) and np.allclose(edges[1], edges[3], rtol=threshold)
 
 def is_square(vertices, threshold=0.1):
     if not is_rectangle(vertices, threshold):
         return False
-    edges = np.linalg.norm(np.diff(vertices, axis=0), axis=1)
+    edges = np.linalg.norm(np.roll(vertices, -1, axis=0) - vertices, axis=1)
     return np.allclose(edges[0], edges[1], rtol=threshold)
 
 def is_circle(vertices, threshold=0.1):
@@ -29,77 +31,57 @@ def is_circle(vertices, threshold=0.1):
     return np.allclose(distances, distances[0], rtol=threshold)
 
 
-def process_mesh(file_path):
-    mesh = trimesh.load(file_path)
+def process_mesh(file_path, cache=None, per_face=False):
+    mesh = load_trimesh(file_path)
     vertices = mesh.vertices
     faces = mesh.faces
     print(f"Loaded mesh with {len(vertices)} vertices and {len(faces)} faces")
 
-    shapes = [{'faces': [i]} for i in range(len(faces))]
-    shapes = refine_shapes(shapes, vertices, faces)
+    if per_face:
+        # Every face is its own shape; classify them all at once
+        if cache is not None:
+            shapes = cache.run("classify_faces", classify_faces, vertices, faces)
+        else:
+            shapes = classify_faces(vertices, faces)
+    else:
+        # Group connected triangles into surface patches and classify the patches
+        if cache is not None:
+            patches = cache.run("segment_mesh", segment_mesh, vertices, faces)
+        else:
+            patches = segment_mesh(vertices, faces)
+        print(f"Grouped faces into {len(patches)} surface patches")
+        shapes = refine_shapes(patches, vertices, faces)
     
     
     return shapes
 
 # Load the mesh and visualize it
 def visualize_mesh(file_path):
-    model_mesh = trimesh.load(file_path)
-    pv_mesh = pv.wrap(model_mesh)
+    pv_mesh = load_stl(file_path).to_pyvista()
     plotter = pv.Plotter()
     plotter.add_mesh(pv_mesh)
     plotter.show()
 
 def refine_shapes(shapes, vertices, faces):
-    refined_shapes = []
-
-    for shape in shapes:
-        face_indices = shape['faces']
-        face_vertices = vertices[np.unique(faces[face_indices])]
-
-        if is_cylinder(face_vertices):
-            refined_shapes.append({
-                'shape': 'cylinder',
-                'vertices': face_vertices.tolist(),
-                'dimensions': {'height': np.ptp(face_vertices[:, 2]), 'radius': np.mean(np.ptp(face_vertices[:, :2], axis=0))}
-            })
-        elif is_square(face_vertices):
-            refined_shapes.append({
-                'shape': 'square',
-                'vertices': face_vertices.tolist(),
-                'dimensions': {'side_length': np.ptp(face_vertices[:, 0])}
-            })
-        elif is_rectangle(face_vertices):
-            refined_shapes.append({
-                'shape': 'rectangle',
-                'vertices': face_vertices.tolist(),
-                'dimensions': {'width': np.ptp(face_vertices[:, 0]), 'height': np.ptp(face_vertices[:, 1])}
-            })
-        elif is_circle(face_vertices):
-            refined_shapes.append({
-                'shape': 'circle',
-                'vertices': face_vertices.tolist(),
-                'dimensions': {'radius': np.mean(np.linalg.norm(face_vertices - np.mean(face_vertices, axis=0), axis=1))}
-            })
-        else:
-            refined_shapes.append({
-                'shape': 'triangle',
-                'vertices': face_vertices.tolist()
-            })
-
-    return refined_shapes
+    # Classify all shapes in one vectorized pass; the result is a lazy ShapeTable
+    # that yields the same shape dictionaries as the former per-shape loop
+    return classify_shapes(vertices, faces, shapes)
 
 import streamlit as st
 import pandas as pd
 
 def shape_statistics_table(shapes):
-    # Calculate shape counts
-    shape_counts = {
-        'cylinder': sum(1 for s in shapes if s['shape'] == 'cylinder'),
-        'square': sum(1 for s in shapes if s['shape'] == 'square'),
-        'rectangle': sum(1 for s in shapes if s['shape'] == 'rectangle'),
-        'circle': sum(1 for s in shapes if s['shape'] == 'circle'),
-        'triangle': sum(1 for s in shapes if s['shape'] == 'triangle')
-    }
+    # Calculate shape counts, straight from the label array when available
+    if isinstance(shapes, ShapeTable):
+        shape_counts = shapes.counts()
+    else:
+        shape_counts = {
+            'cylinder': sum(1 for s in shapes if s['shape'] == 'cylinder'),
+            'square': sum(1 for s in shapes if s['shape'] == 'square'),
+            'rectangle': sum(1 for s in shapes if s['shape'] == 'rectangle'),
+            'circle': sum(1 for s in shapes if s['shape'] == 'circle'),
+            'triangle': sum(1 for s in shapes if s['shape'] == 'triangle')
+        }
     
     # Convert to a DataFrame for better display
     shape_df = pd.DataFrame(list(shape_counts.items()), columns=['Shape Type', 'Count'])
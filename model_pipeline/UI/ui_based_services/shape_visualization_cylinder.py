@@ -1,99 +1,80 @@
 import streamlit as st
 import plotly.graph_objects as go
 import numpy as np
-import trimesh
+from stl_reader import load_trimesh
+from circle_features import mesh_circles
+from display_lod import DISPLAY_FACE_BUDGET, display_mesh
+from mesh_cache import default_cache
+from figure_payload import PositionQuantizer, compact_mesh3d, compact_scatter3d
 import tempfile
 
 def load_mesh(model_path):
     """Load a 3D mesh using trimesh."""
-    mesh = trimesh.load(model_path)
+    mesh = load_trimesh(model_path)
     return mesh
 
 def identify_circular_faces(mesh):
-    """Identify circular faces and calculate their dimensions."""
-    circular_faces = []
-    for face in mesh.faces:
-        face_vertices = mesh.vertices[face]
-        if is_circular_face(face_vertices):
-            print("Is circular face")
-            center, radius = calculate_circle_properties(face_vertices)
-            circular_faces.append({
-                'face': face,
-                'center': center,
-                'radius': radius,
-                'diameter': 2 * radius,
-                'circumference': 2 * np.pi * radius
-            })
-        print
+    """
+    Detect circular holes and bosses from the rims in the mesh's feature-edge loops.
+
+    Returns:
+        list: One dict per circle with center, axis, radius, diameter,
+        circumference, residual, kind ("hole" or "boss"), vertices and faces.
+    """
+    circular_faces = mesh_circles(mesh)
     return circular_faces
 
-def is_circular_face(face_vertices, tolerance=1e-3):
-    """Check if a face is circular based on vertex positions."""
-    # Calculate the centroid of the face vertices
-    center = face_vertices.mean(axis=0)
-
-    # Calculate distances from each vertex to the center
-    distances = np.linalg.norm(face_vertices - center, axis=1)
-
-    # Check if all distances are approximately equal (within a tolerance)
-    radius = distances.mean()
-    if np.all(np.abs(distances - radius) < tolerance):
-        return True
-    return False
-
-
-def calculate_circle_properties(face_vertices):
-    """Calculate center and radius of a circular face."""
-    center = face_vertices.mean(axis=0)
-    radius = np.mean(np.linalg.norm(face_vertices - center, axis=1))
-    return center, radius
-
-def create_hover_template_circle(face_properties):
-    """Create hover template for circular face dimensions."""
-    return (f"Diameter: {face_properties['diameter']:.2f}<br>"
-            f"Circumference: {face_properties['circumference']:.2f}")
-
-def visualize_mesh_with_highlighted_faces(mesh, circular_faces):
-    """Visualize the mesh and highlight circular faces with annotations."""
-    points = mesh.vertices
-    faces = mesh.faces
-
-    # Create hover text and highlighting
-    face_x, face_y, face_z, face_texts = [], [], [], []
-
+def create_hover_template_circle():
+    """Create the hover template for circular features; customdata holds diameter and circumference, text the kind."""
+    return ("%{text}<br>"
+            "Diameter: %{customdata[0]:.2f}<br>"
+            "Circumference: %{customdata[1]:.2f}<extra></extra>")
+
+def visualize_mesh_with_highlighted_faces(mesh, circular_faces, face_budget=DISPLAY_FACE_BUDGET):
+    """
+    Visualize the mesh and highlight circular faces with annotations.
+
+    Meshes above face_budget triangles are drawn at a cached LOD level; the
+    circles were found on the full-resolution mesh and their faces are
+    highlighted on the drawn faces that cover them.
+    """
+    shown = display_mesh(mesh, face_budget, default_cache())
+    points = shown.vertices
+    faces = shown.faces
+
+    # Hover values of every circle as numbers, formatted in the browser
+    centers = np.array([face_info['center'] for face_info in circular_faces]).reshape(-1, 3)
+    dimensions = np.array([[face_info['diameter'], face_info['circumference']] for face_info in circular_faces]).reshape(-1, 2)
+    kinds = [face_info['kind'].capitalize() for face_info in circular_faces]
+
+    highlighted = np.zeros(len(faces), dtype=bool)
     for face_info in circular_faces:
-        face_center = face_info['center']
-        face_x.append(face_center[0])
-        face_y.append(face_center[1])
-        face_z.append(face_center[2])
-        face_texts.append(create_hover_template_circle(face_info))
+        highlighted |= shown.display_mask(face_info['faces'])
 
+    # Positions are sent as uint16 steps of the bounding box
+    quantizer = PositionQuantizer(points)
     fig = go.Figure()
 
-    # Add the main mesh
-    fig.add_trace(go.Mesh3d(
-        x=points[:, 0], y=points[:, 1], z=points[:, 2],
-        i=faces[:, 0], j=faces[:, 1], k=faces[:, 2],
+    # Add the main mesh, rim faces in red
+    fig.add_trace(compact_mesh3d(
+        points, faces, quantizer,
         opacity=0.5,
-        colorscale='Blues',
+        intensity=highlighted.astype(np.uint8), intensitymode='cell',
+        colorscale=[[0, 'lightblue'], [1, 'red']], cmin=0, cmax=1, showscale=False,
         hoverinfo='skip'  # Skip default hover for main mesh
     ))
 
-    # Add hoverable circular faces as scatter points with custom hover text
-    fig.add_trace(go.Scatter3d(
-        x=face_x, y=face_y, z=face_z,
+    # Add hoverable circle centres as scatter points
+    fig.add_trace(compact_scatter3d(
+        centers, quantizer, customdata=dimensions,
         mode='markers',
         marker=dict(size=5, color='red'),
-        text=face_texts,
-        hoverinfo='text'
+        text=kinds,
+        hovertemplate=create_hover_template_circle()
     ))
 
-    # Update layout
-    fig.update_layout(scene=dict(
-        xaxis_title='X',
-        yaxis_title='Y',
-        zaxis_title='Z'
-    ))
+    # Label the quantized axes in model units
+    fig.update_layout(scene=quantizer.scene())
 
     st.plotly_chart(fig)
 
@@ -0,0 +1,103 @@
+# upload_cache.py memoizes parsed meshes and stage results per Streamlit session. Every entry is keyed by the SHA-256 of the uploaded bytes, which is computed once per upload and remembered under the upload's id, so reruns caused by widgets (filters, buttons, checkboxes) reuse the parsed mesh and the computed results instead of repeating any geometry work. Only the most recent uploads are kept to bound the session's memory.
+import hashlib
+from collections import OrderedDict
+
+import streamlit as st
+
+from stl_reader import load_trimesh
+
+SESSION_KEY = "upload_cache"
+STATS_KEY = "upload_cache_stats"
+DIGESTS_KEY = "upload_cache_digests"
+MAX_UPLOADS = 4
+
+
+def upload_digest(uploaded_file):
+    """Return the SHA-256 hex digest of an uploaded file's bytes."""
+    return hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+
+
+def _upload_id(uploaded_file):
+    """Return the id Streamlit gives an upload, or its name and size on versions without one."""
+    file_id = getattr(uploaded_file, "file_id", None)
+    return file_id if file_id is not None else (uploaded_file.name, uploaded_file.size)
+
+
+def _session_entries():
+    """Return the session's digest -> entry mapping, creating it on first use."""
+    if SESSION_KEY not in st.session_state:
+        st.session_state[SESSION_KEY] = OrderedDict()
+        st.session_state[STATS_KEY] = {"hits": 0, "misses": 0}
+        st.session_state[DIGESTS_KEY] = {}
+    return st.session_state[SESSION_KEY]
+
+
+def upload_entry(uploaded_file):
+    """
+    Return the cache entry of an upload, creating it if needed.
+
+    Parameters:
+        uploaded_file (UploadedFile): File returned by st.file_uploader.
+
+    Returns:
+        tuple: (digest, entry) where entry holds the upload's digest, bytes and memoized results.
+    """
+    entries = _session_entries()
+    digests = st.session_state[DIGESTS_KEY]
+    upload_id = _upload_id(uploaded_file)
+    # Hash the bytes only the first time an upload is seen, not on every rerun and lookup
+    digest = digests.get(upload_id)
+    if digest is None:
+        digest = digests[upload_id] = upload_digest(uploaded_file)
+    if digest in entries:
+        entries.move_to_end(digest)
+    else:
+        entries[digest] = {"digest": digest, "bytes": uploaded_file.getvalue(), "results": {}}
+        # Forget the least recently used uploads and the ids pointing to them
+        while len(entries) > MAX_UPLOADS:
+            entries.popitem(last=False)
+        for stale_id in [key for key, value in digests.items() if value not in entries]:
+            del digests[stale_id]
+    return digest, entries[digest]
+
+
+def _memoized(entry, key, compute):
+    """Return compute() memoized in an upload's cache entry, counting hits and misses."""
+    stats = st.session_state[STATS_KEY]
+    results = entry["results"]
+    if key in results:
+        stats["hits"] += 1
+    else:
+        stats["misses"] += 1
+        results[key] = compute()
+    return results[key]
+
+
+def cached_result(uploaded_file, key, compute):
+    """
+    Return compute() memoized for this upload.
+
+    Parameters:
+        uploaded_file (UploadedFile): Upload the result is derived from.
+        key (hashable): Stage name, or a tuple of stage name and parameters.
+        compute (callable): Zero-argument function producing the result on a miss.
+
+    Returns:
+        The memoized result.
+    """
+    _, entry = upload_entry(uploaded_file)
+    return _memoized(entry, key, compute)
+
+
+def cached_mesh(uploaded_file):
+    """Return the trimesh parsed from an uploaded STL, parsing it only once per upload."""
+    _, entry = upload_entry(uploaded_file)
+    return _memoized(entry, "mesh", lambda: load_trimesh(entry["bytes"]))
+
+
+def cache_stats():
+    """Return the session's hit/miss counters and number of cached uploads."""
+    entries = _session_entries()
+    stats = dict(st.session_state[STATS_KEY])
+    stats["uploads"] = len(entries)
+    return stats
@@ -0,0 +1,231 @@
+# batch_classification.py classifies mesh shapes (single faces or groups of faces) as cylinders, squares, rectangles, circles or triangles in one vectorized pass. It applies the same tests as is_cylinder, is_square, is_rectangle and is_circle, but evaluates them for every shape at once with segment reductions over a flat vertex list. The result is a ShapeTable holding a label array and a struct-of-arrays dimension table; the familiar list of shape dictionaries is only built when it is asked for.
+import numpy as np
+
+SHAPE_NAMES = np.array(['cylinder', 'square', 'rectangle', 'circle', 'triangle'])
+CYLINDER, SQUARE, RECTANGLE, CIRCLE, TRIANGLE = range(len(SHAPE_NAMES))
+
+# Dimension columns reported for each label, in output order
+SHAPE_DIMENSIONS = {
+    CYLINDER: ('height', 'radius'),
+    SQUARE: ('side_length',),
+    RECTANGLE: ('width', 'height'),
+    CIRCLE: ('radius',),
+    TRIANGLE: (),
+}
+
+# Absolute tolerance np.allclose applies on top of the relative threshold
+ALLCLOSE_ATOL = 1e-8
+
+
+def _isclose(a, b, rtol):
+    """Element-wise np.allclose test with the default absolute tolerance."""
+    return np.abs(a - b) <= ALLCLOSE_ATOL + rtol * np.abs(b)
+
+
+class ShapeTable:
+    """
+    Columnar result of a batched shape classification.
+
+    Attributes:
+        labels (np.ndarray): (S,) int8 label code per shape, indexing SHAPE_NAMES.
+        dimensions (dict): Column name -> (S,) float64 array; NaN where the column
+            does not apply to the shape's label.
+        vertices (np.ndarray): Mesh vertices the shapes refer to.
+        point_ids (np.ndarray): Flat, per-shape sorted unique vertex ids.
+        offsets (np.ndarray): (S + 1,) start offsets of each shape in point_ids.
+
+    A ShapeTable behaves like the list returned by the per-face refine_shapes:
+    len(), indexing and iteration yield the same shape dictionaries, each one
+    built on demand.
+    """
+
+    def __init__(self, labels, dimensions, vertices, point_ids, offsets):
+        self.labels = labels
+        self.dimensions = dimensions
+        self.vertices = vertices
+        self.point_ids = point_ids
+        self.offsets = offsets
+
+    @property
+    def shape_names(self):
+        """(S,) array of label names."""
+        return SHAPE_NAMES[self.labels]
+
+    def __len__(self):
+        return len(self.labels)
+
+    def shape_vertices(self, index):
+        """Return the (k, 3) vertex coordinates of one shape."""
+        return self.vertices[self.point_ids[self.offsets[index]:self.offsets[index + 1]]]
+
+    def shape_dict(self, index):
+        """Build the refine_shapes dictionary of one shape."""
+        label = int(self.labels[index])
+        shape = {
+            'shape': str(SHAPE_NAMES[label]),
+            'vertices': self.shape_vertices(index).tolist(),
+        }
+        names = SHAPE_DIMENSIONS[label]
+        if names:
+            shape['dimensions'] = {name: float(self.dimensions[name][index]) for name in names}
+        return shape
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.shape_dict(i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("shape index out of range")
+        return self.shape_dict(index)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.shape_dict(index)
+
+    def to_list(self):
+        """Return all shapes as the list of dictionaries produced by refine_shapes."""
+        return list(self)
+
+    def counts(self):
+        """Return a dictionary of shape name -> number of shapes with that label."""
+        totals = np.bincount(self.labels, minlength=len(SHAPE_NAMES))
+        return {str(name): int(total) for name, total in zip(SHAPE_NAMES, totals)}
+
+    def select(self, mask):
+        """Return a new ShapeTable with the shapes where mask (or an index array) selects."""
+        index = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else np.asarray(mask)
+        starts = self.offsets[index]
+        counts = self.offsets[index + 1] - starts
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        gather = np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])
+        return ShapeTable(
+            self.labels[index],
+            {name: column[index] for name, column in self.dimensions.items()},
+            self.vertices,
+            self.point_ids[gather],
+            offsets,
+        )
+
+    def filter(self, shape_type):
+        """Return the shapes of one type, or all of them for "All"."""
+        if shape_type == "All":
+            return self
+        return self.select(self.shape_names == shape_type)
+
+
+def _classify_segments(vertices, point_ids, offsets, threshold):
+    """Run the shape tests on every segment of point_ids at once."""
+    if len(offsets) < 2:
+        empty = np.zeros(0)
+        return np.zeros(0, dtype=np.int8), {name: empty for name in ('height', 'radius', 'side_length', 'width')}
+
+    points = vertices[point_ids]
+    starts = offsets[:-1]
+    counts = np.diff(offsets)
+    segment = np.repeat(np.arange(len(counts)), counts)
+
+    # Bounding box extents (np.ptp per shape)
+    extent = np.maximum.reduceat(points, starts, axis=0) - np.minimum.reduceat(points, starts, axis=0)
+
+    # is_cylinder: height > radius * threshold
+    radius_xy = (extent[:, 0] + extent[:, 1]) / 2
+    cylinder = extent[:, 2] > radius_xy / 2 * threshold
+
+    # is_circle: all distances to the centre close to the first one. Sums use
+    # bincount, which accumulates in order like np.mean on a few vertices does
+    segments = len(counts)
+    center = np.column_stack([np.bincount(segment, weights=points[:, axis], minlength=segments) for axis in range(3)])
+    center /= counts[:, None]
+    distances = np.linalg.norm(points - center[segment], axis=1)
+    first = distances[starts]
+    circle = np.logical_and.reduceat(_isclose(distances, first[segment], threshold), starts)
+    mean_distance = np.bincount(segment, weights=distances, minlength=segments) / counts
+
+    # is_rectangle / is_square: only four-vertex shapes, opposite edges of the closed loop match
+    rectangle = np.zeros(len(counts), dtype=bool)
+    square = np.zeros(len(counts), dtype=bool)
+    quads = np.flatnonzero(counts == 4)
+    if len(quads):
+        corners = points[starts[quads, None] + np.arange(4)]
+        edges = np.linalg.norm(np.roll(corners, -1, axis=1) - corners, axis=2)
+        rectangle[quads] = _isclose(edges[:, 0], edges[:, 2], threshold) & _isclose(edges[:, 1], edges[:, 3], threshold)
+        square[quads] = rectangle[quads] & _isclose(edges[:, 0], edges[:, 1], threshold)
+
+    # Same precedence as the if/elif chain in refine_shapes
+    labels = np.select(
+        [cylinder, square, rectangle, circle],
+        [CYLINDER, SQUARE, RECTANGLE, CIRCLE],
+        default=TRIANGLE,
+    ).astype(np.int8)
+
+    nan = np.full(len(counts), np.nan)
+    is_cylinder = labels == CYLINDER
+    is_rectangle = labels == RECTANGLE
+    dimensions = {
+        'height': np.where(is_cylinder, extent[:, 2], np.where(is_rectangle, extent[:, 1], nan)),
+        'radius': np.where(is_cylinder, radius_xy, np.where(labels == CIRCLE, mean_distance, nan)),
+        'side_length': np.where(labels == SQUARE, extent[:, 0], nan),
+        'width': np.where(is_rectangle, extent[:, 0], nan),
+    }
+    return labels, dimensions
+
+
+def classify_faces(vertices, faces, threshold=0.1):
+    """
+    Classify every face of a mesh as its own shape.
+
+    This is the batched equivalent of refine_shapes([{'faces': [i]} ...]). The
+    (F, 3) face array is turned into sorted unique vertex ids per face, which
+    is the order np.unique(faces[i]) gives the per-face code.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        threshold (float): Relative tolerance of the shape tests.
+
+    Returns:
+        ShapeTable: One row per face.
+    """
+    vertices = np.asarray(vertices)
+    ordered = np.sort(np.asarray(faces), axis=1)
+    # Drop repeated indices of degenerate faces, as np.unique would
+    keep = np.ones(ordered.shape, dtype=bool)
+    keep[:, 1:] = ordered[:, 1:] != ordered[:, :-1]
+
+    point_ids = ordered[keep]
+    offsets = np.concatenate([[0], np.cumsum(keep.sum(axis=1))])
+    labels, dimensions = _classify_segments(vertices, point_ids, offsets, threshold)
+    return ShapeTable(labels, dimensions, vertices, point_ids, offsets)
+
+
+def classify_shapes(vertices, faces, shapes, threshold=0.1):
+    """
+    Classify shapes made of arbitrary groups of faces.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        shapes (list): List of {'faces': [face indices]} dictionaries.
+        threshold (float): Relative tolerance of the shape tests.
+
+    Returns:
+        ShapeTable: One row per shape, in input order.
+    """
+    vertices = np.asarray(vertices)
+    faces = np.asarray(faces)
+    face_lists = [np.asarray(shape['faces'], dtype=np.int64).ravel() for shape in shapes]
+    sizes = np.array([len(face_list) for face_list in face_lists], dtype=np.int64)
+    if np.any(sizes == 0):
+        raise ValueError("Every shape needs at least one face")
+
+    shape_ids = np.repeat(np.arange(len(shapes)), sizes * faces.shape[1])
+    vertex_ids = faces[np.concatenate(face_lists)].ravel() if len(shapes) else np.zeros(0, dtype=np.int64)
+
+    # Unique (shape, vertex) pairs, sorted by shape and then by vertex id
+    pairs = np.unique(shape_ids * len(vertices) + vertex_ids)
+    point_ids = pairs % len(vertices)
+    offsets = np.searchsorted(pairs // len(vertices), np.arange(len(shapes) + 1))
+
+    labels, dimensions = _classify_segments(vertices, point_ids, offsets, threshold)
+    return ShapeTable(labels, dimensions, vertices, point_ids, offsets)
@@ -0,0 +1,350 @@
+# batch_pipeline.py runs the model pipeline stages over many STL files in parallel. It takes files, directories or glob patterns (e.g. "STLs/*.stl"), runs the selected stages for every file on a process pool and writes each file's results to its own output directory. Progress is reported as files finish and a summary table is printed at the end.
+#
+# Example:
+#     python batch_pipeline.py "../STLs/*.stl" --output output/batch --stages extract analyze classify3d --workers 8
+#     python batch_pipeline.py "../STLs/*.stl" --stages preview    # off-screen PNG previews and a contact sheet
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from feature_statistics import curvature_statistics, statistics_frame
+from feature_store import save_feature_store
+from mesh_cache import DEFAULT_CACHE_DIR, MeshCache
+from mesh_lod import mesh_lod_pyramid, to_open3d
+from mesh_thumbnails import contact_sheet, mesh_preview
+from stl_reader import load_open3d, load_trimesh
+from streaming_stats import merge_stats
+
+PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Stages in the order they run for each file
+STAGES = ("extract", "analyze", "normalize", "simplify", "shapes2d", "sections", "classify3d", "primitives", "preview")
+
+# Pipeline scripts the stages reuse; several have hyphenated names and are loaded by path
+SCRIPTS = {
+    "extraction": "feature-extraction.py",
+    "analysis": "feature-analysis.py",
+    "normalization": "mesh_normalization.py",
+    "simplification": "mesh-simplification.py",
+    "shapes2d": os.path.join("geometric-analysis", "2Dshape_analysis", "shape-extraction.py"),
+    "classify3d": os.path.join("geometric-analysis", "3Dshape_analysis", "shape-classification.py"),
+}
+
+_loaded_scripts = {}
+
+
+def load_script(name):
+    """Import one of the pipeline scripts by path, once per process."""
+    if name not in _loaded_scripts:
+        path = os.path.join(PIPELINE_DIR, SCRIPTS[name])
+        module_name = "pipeline_" + name
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded_scripts[name] = module
+    return _loaded_scripts[name]
+
+
+def expand_inputs(patterns):
+    """
+    Expand files, directories and glob patterns into a sorted list of STL paths.
+
+    Parameters:
+        patterns (list): File paths, directories or glob patterns.
+
+    Returns:
+        list: Unique STL file paths.
+    """
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            candidates = [os.path.join(pattern, name) for name in os.listdir(pattern)]
+        else:
+            candidates = glob.glob(pattern) or [pattern]
+        for candidate in candidates:
+            if os.path.isfile(candidate) and candidate.lower().endswith(".stl"):
+                paths.add(os.path.abspath(candidate))
+    return sorted(paths)
+
+
+def file_output_dir(output_root, mesh_path):
+    """Return the per-file output directory, named after the STL file."""
+    stem = os.path.splitext(os.path.basename(mesh_path))[0]
+    return os.path.join(output_root, stem.replace(" ", "-"))
+
+
+def preview_path(output_root, mesh_path):
+    """Return the path of a file's preview contact sheet."""
+    out_dir = file_output_dir(output_root, mesh_path)
+    return os.path.join(out_dir, f"{os.path.basename(out_dir)}-preview.png")
+
+
+def write_contact_sheet(mesh_paths, output_root, file_name="contact_sheet.png"):
+    """
+    Combine the previews of a batch into one labelled contact sheet.
+
+    Parameters:
+        mesh_paths (list): Files whose previews were written.
+        output_root (str): Root output directory of the batch.
+        file_name (str): Name of the sheet inside output_root.
+
+    Returns:
+        str: Path of the sheet, or None when no preview exists.
+    """
+    from PIL import Image
+
+    found = [mesh_path for mesh_path in mesh_paths if os.path.isfile(preview_path(output_root, mesh_path))]
+    if not found:
+        return None
+    images = [Image.open(preview_path(output_root, mesh_path)).convert("RGB") for mesh_path in found]
+    sheet_path = os.path.join(output_root, file_name)
+    contact_sheet(images, [os.path.basename(mesh_path) for mesh_path in found]).save(sheet_path)
+    return sheet_path
+
+
+def process_file(mesh_path, output_root, stages, cache_dir=None, shape_method="raster", section_count=5, lod_error=None,
+                 fit_workers=None):
+    """
+    Run the selected stages on one STL file.
+
+    Parameters:
+        mesh_path (str): Path to the STL file.
+        output_root (str): Root directory; results go to a sub-directory per file.
+        stages (list): Stage names from STAGES.
+        cache_dir (str): Mesh cache directory, or None to disable caching.
+        shape_method (str): "raster" contours, exact "vector" silhouettes or mask "regions" for shapes2d.
+        section_count (int): Number of Z cross-sections for the sections stage.
+        lod_error (float): When set, the simplify stage writes the coarsest LOD
+            level within this Hausdorff error instead of a fixed 1000 triangles.
+        fit_workers (int): Threads of the primitives stage; all cores by default.
+            run_batch passes 1 to its worker processes, which already use every core.
+
+    Returns:
+        dict: Summary row with the file name, status, timings and stage outputs,
+        plus the file's curvature StreamingStats when the analyze stage ran.
+    """
+    start = time.perf_counter()
+    out_dir = file_output_dir(output_root, mesh_path)
+    stem = os.path.basename(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    cache = MeshCache(cache_dir) if cache_dir else None
+    row = {"file": os.path.basename(mesh_path), "status": "ok"}
+
+    def run(stage, func, mesh, *args, version=1):
+        if cache is None:
+            return func(mesh, *args)
+        return cache.run(stage, func, mesh, *args, version=version)
+
+    try:
+        features = None
+        for stage in STAGES:
+            if stage not in stages:
+                continue
+            stage_start = time.perf_counter()
+
+            if stage in ("extract", "analyze") and features is None:
+                extraction = load_script("extraction")
+                features = run(extraction.CACHE_STAGE, extraction.process_mesh, mesh_path, version=extraction.CACHE_VERSION)
+                row["vertices"] = len(features["vertices"])
+                row["faces"] = len(features["faces"])
+
+            if stage == "extract":
+                save_feature_store(features, os.path.join(out_dir, "features"), source=mesh_path)
+
+            elif stage == "analyze":
+                analysis = load_script("analysis")
+                curvature_stats = curvature_statistics(features["curvatures"])
+                feature_df = statistics_frame(row["vertices"], row["faces"], curvature_stats)
+                analysis.save_features(feature_df, out_dir)
+                row["curvature_mean"] = float(feature_df["curvature_mean"].iloc[0])
+                # Handed back to run_batch, which merges it into the corpus statistics
+                row["curvature_stats"] = curvature_stats
+
+            elif stage == "normalize":
+                normalization = load_script("normalization")
+                normalized_mesh = run("normalize_mesh", normalization.normalize_mesh, load_trimesh(mesh_path))
+                normalized_mesh.export(os.path.join(out_dir, f"{stem}-normalized-mesh.stl"), file_type='stl')
+
+            elif stage == "simplify":
+                # Open3D is only needed by this stage
+                import open3d as o3d
+                simplification = load_script("simplification")
+                mesh = load_open3d(mesh_path)
+                mesh.compute_vertex_normals()
+                if lod_error is None:
+                    simplified_mesh = run("simplify_mesh", simplification.simplify_mesh, mesh)
+                else:
+                    pyramid = mesh_lod_pyramid(mesh, cache)
+                    pd.DataFrame(pyramid.summary(), columns=["level", "triangles", "error", "mean_error"]).to_csv(
+                        os.path.join(out_dir, "lod_levels.csv"), index=False)
+                    # Reuse the pyramid rather than rebuilding it when caching is disabled
+                    simplified_mesh = to_open3d(pyramid.coarsest(lod_error))
+                o3d.io.write_triangle_mesh(os.path.join(out_dir, f"{stem}-simplified-mesh.stl"), simplified_mesh)
+                row["simplified_faces"] = len(simplified_mesh.triangles)
+
+            elif stage == "shapes2d":
+                shapes2d = load_script("shapes2d")
+                shapes = shapes2d.process_mesh(mesh_path, os.path.join(out_dir, "extracted_shapes.json"), cache=cache,
+                                               method=shape_method)
+                row["shapes_2d"] = sum(len(plane_shapes) for plane_shapes in shapes.values())
+
+            elif stage == "sections":
+                shapes2d = load_script("shapes2d")
+                sections = shapes2d.process_sections(mesh_path, os.path.join(out_dir, "section_shapes.csv"), cache=cache,
+                                                     count=section_count)
+                row["section_shapes"] = len(sections)
+
+            elif stage == "classify3d":
+                classify3d = load_script("classify3d")
+                shapes = classify3d.process_mesh(mesh_path, cache=cache)
+                with open(os.path.join(out_dir, "classified_shapes.json"), 'w') as json_file:
+                    json.dump(shapes.to_list(), json_file, indent=4)
+                row["shapes_3d"] = len(shapes)
+
+            elif stage == "primitives":
+                classify3d = load_script("classify3d")
+                primitives = classify3d.process_primitives(mesh_path, os.path.join(out_dir, "primitives.json"), cache=cache,
+                                                        workers=fit_workers)
+                row["primitives"] = len(primitives)
+
+            elif stage == "preview":
+                # Rendered off-screen, so it runs in worker processes without a display
+                with open(preview_path(output_root, mesh_path), 'wb') as image_file:
+                    image_file.write(mesh_preview(mesh_path, cache=cache))
+
+            row[f"{stage}_s"] = round(time.perf_counter() - stage_start, 3)
+    except Exception as error:
+        row["status"] = f"error: {type(error).__name__}: {error}"
+
+    if cache is not None:
+        row["cache_hits"] = cache.hits
+        row["cache_misses"] = cache.misses
+    row["seconds"] = round(time.perf_counter() - start, 3)
+    return row
+
+
+def run_batch(mesh_paths, output_root, stages, workers=None, cache_dir=None, shape_method="raster", section_count=5,
+              lod_error=None, progress=print):
+    """
+    Run the selected stages over many files on a process pool.
+
+    Parameters:
+        mesh_paths (list): STL files to process.
+        output_root (str): Root output directory.
+        stages (list): Stage names from STAGES.
+        workers (int): Worker processes; None uses all cores, 1 runs in this process.
+        cache_dir (str): Mesh cache directory, or None to disable caching.
+        shape_method (str): "raster", "vector" or "regions" shapes for the shapes2d stage.
+        section_count (int): Number of Z cross-sections for the sections stage.
+        lod_error (float): Hausdorff error tolerance of the simplify stage, or None for 1000 triangles.
+        progress (callable): Called with one progress line per finished file.
+
+    Returns:
+        tuple: (summary, curvature_stats) where summary is a DataFrame with one
+        row per file in input order and curvature_stats is the merged
+        StreamingStats of every analyzed file, or None.
+    """
+    os.makedirs(output_root, exist_ok=True)
+    workers = workers or os.cpu_count() or 1
+    total = len(mesh_paths)
+    rows = {}
+
+    def report(done, row):
+        progress(f"[{done}/{total}] {row['file']}: {row['status']} ({row['seconds']:.2f}s)")
+
+    if workers == 1:
+        for done, mesh_path in enumerate(mesh_paths, start=1):
+            rows[mesh_path] = process_file(mesh_path, output_root, stages, cache_dir, shape_method, section_count, lod_error)
+            report(done, rows[mesh_path])
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, max(total, 1))) as executor:
+            futures = {
+                # One fitting thread per process: the pool already keeps every core busy
+                executor.submit(process_file, mesh_path, output_root, stages, cache_dir, shape_method, section_count, lod_error,
+                                fit_workers=1): mesh_path
+                for mesh_path in mesh_paths
+            }
+            for done, future in enumerate(as_completed(futures), start=1):
+                mesh_path = futures[future]
+                try:
+                    rows[mesh_path] = future.result()
+                except Exception as error:
+                    # The worker itself died (e.g. out of memory)
+                    rows[mesh_path] = {"file": os.path.basename(mesh_path), "status": f"error: {error}", "seconds": 0.0}
+                report(done, rows[mesh_path])
+
+    curvature_stats = [rows[mesh_path].pop("curvature_stats") for mesh_path in mesh_paths
+                       if "curvature_stats" in rows[mesh_path]]
+    summary = pd.DataFrame([rows[mesh_path] for mesh_path in mesh_paths])
+    return summary, (merge_stats(curvature_stats) if curvature_stats else None)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the model pipeline over a corpus of STL files.")
+    parser.add_argument("inputs", nargs="+", help="STL files, directories or glob patterns such as 'STLs/*.stl'")
+    parser.add_argument("-o", "--output", default=os.path.join(PIPELINE_DIR, "output", "batch"),
+                        help="root output directory; each file gets its own sub-directory")
+    parser.add_argument("-s", "--stages", nargs="+", choices=STAGES, default=list(STAGES),
+                        help="stages to run (default: all)")
+    parser.add_argument("-w", "--workers", type=int, default=None,
+                        help="number of worker processes (default: all cores)")
+    parser.add_argument("--shape-method", choices=("raster", "vector", "regions"), default="raster",
+                        help="2D shapes from raster contours (pixels), exact vector silhouettes (model units) or labeled mask regions (pixels)")
+    parser.add_argument("--sections", type=int, default=5,
+                        help="number of evenly spaced Z cross-sections for the sections stage")
+    parser.add_argument("--lod-error", type=float, default=None,
+                        help="simplify to the coarsest cached LOD level within this Hausdorff error (model units)")
+    parser.add_argument("--no-cache", action="store_true", help="disable the content-addressed mesh cache")
+    parser.add_argument("--cache-dir", default=None, help="mesh cache directory (default: output/cache)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    mesh_paths = expand_inputs(args.inputs)
+    if not mesh_paths:
+        print("No STL files matched the given inputs")
+        return 1
+
+    cache_dir = None if args.no_cache else (args.cache_dir or DEFAULT_CACHE_DIR)
+
+    print(f"Processing {len(mesh_paths)} files with stages: {', '.join(args.stages)}")
+    start = time.perf_counter()
+    summary, curvature_stats = run_batch(mesh_paths, args.output, args.stages, workers=args.workers, cache_dir=cache_dir,
+                                         shape_method=args.shape_method, section_count=args.sections,
+                                         lod_error=args.lod_error)
+    elapsed = time.perf_counter() - start
+
+    print()
+    print(summary.to_string(index=False))
+    summary_path = os.path.join(args.output, "batch_summary.csv")
+    summary.to_csv(summary_path, index=False)
+
+    if curvature_stats is not None:
+        # Corpus-wide statistics from the merged per-file states
+        analyzed = summary[summary["curvature_mean"].notna()]
+        corpus_df = statistics_frame(
+            int(analyzed["vertices"].sum()), int(analyzed["faces"].sum()), curvature_stats)
+        print("\nCorpus statistics:")
+        print(corpus_df.to_string(index=False))
+        corpus_df.to_csv(os.path.join(args.output, "corpus_statistics.csv"), index=False)
+
+    if "preview" in args.stages:
+        sheet_path = write_contact_sheet(mesh_paths, args.output)
+        if sheet_path:
+            print(f"\nContact sheet of the previews saved to {sheet_path}")
+
+    failed = int((summary["status"] != "ok").sum())
+    print(f"\n{len(summary) - failed} succeeded, {failed} failed in {elapsed:.1f}s. Summary saved to {summary_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
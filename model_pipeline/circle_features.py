@@ -0,0 +1,266 @@
+# circle_features.py finds circular holes and bosses in a triangle mesh. Feature edges (boundary edges and edges whose dihedral angle is sharp) are collected from the edge graph and split into chains at the vertices where more than two of them meet; every closed loop and every chain between two junctions becomes a candidate rim or arc. A plane and a circle are then fitted to all chains at once: the plane from batched covariance eigenvectors and the circle with the algebraic (Kasa) least-squares fit, both assembled with segment sums instead of a loop per rim. Chains that fit well (closed loops, or arcs spanning enough of a turn) are reported with centre, axis, radius and fit residual, and as a hole or a boss from the direction of the adjacent wall normals.
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+from face_geometry import FaceGeometry, mesh_face_geometry
+
+# Dihedral angle (degrees) above which an edge is a feature edge
+SHARP_ANGLE = 30.0
+# Fewest vertices a loop or arc needs to be considered
+MIN_LOOP_VERTICES = 6
+# Smallest angle (degrees) an open arc must span; shallower chains are too
+# close to straight lines for their radius to mean anything
+MIN_ARC_ANGLE = 120.0
+# Largest RMS radial residual, relative to the radius, of an accepted circle. The
+# vertices of a tessellated CAD circle lie on the circle, so true rims fit far
+# better than this while ovals such as engraved digits do not
+MAX_RELATIVE_RESIDUAL = 0.002
+
+
+def edge_faces(faces):
+    """
+    Group the face corners by undirected edge.
+
+    Parameters:
+        faces (np.ndarray): (F, 3) vertex indices per face.
+
+    Returns:
+        tuple: (edges, face_ids, starts) where edges is (E, 2) sorted vertex
+        pairs, face_ids lists the faces of every edge consecutively and starts
+        (E + 1,) gives each edge's range in face_ids.
+    """
+    faces = np.asarray(faces, dtype=np.int64)
+    pairs = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    keys = pairs[:, 0] * (int(faces.max()) + 1) + pairs[:, 1]
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    first = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    starts = np.r_[first, len(keys)]
+    return pairs[order[first]], order // 3, starts
+
+
+def feature_edges(vertices, faces, sharp_angle=SHARP_ANGLE, geometry=None):
+    """
+    Return the boundary and sharp edges of a mesh.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        sharp_angle (float): Dihedral angle in degrees above which an edge is sharp.
+        geometry (FaceGeometry): Precomputed face geometry, for its normals.
+
+    Returns:
+        tuple: (edges, edge_face) where edges is (K, 2) vertex pairs and
+        edge_face is (K, 2) the first two faces of each edge (the same face
+        twice for boundary edges).
+    """
+    normals = geometry.normals if geometry is not None else FaceGeometry(vertices, faces).normals
+    edges, face_ids, starts = edge_faces(faces)
+    counts = np.diff(starts)
+    edge_face = face_ids[np.column_stack([starts[:-1], starts[:-1] + (counts > 1)])]
+
+    # Edges shared by two faces are sharp when the normals differ by more than sharp_angle;
+    # faces without a normal (degenerate slivers) never make an edge sharp
+    sharp = counts != 2
+    pairs = np.flatnonzero(counts == 2)
+    n1 = normals[face_ids[starts[pairs]]]
+    n2 = normals[face_ids[starts[pairs] + 1]]
+    cosine = (n1 * n2).sum(axis=1)
+    valid = (np.abs(n1).sum(axis=1) > 0) & (np.abs(n2).sum(axis=1) > 0)
+    sharp[pairs] = valid & (cosine < np.cos(np.radians(sharp_angle)))
+    return edges[sharp], edge_face[sharp]
+
+
+def feature_chains(edges, vertex_count):
+    """
+    Split a feature-edge graph into chains at its junctions.
+
+    Vertices with exactly two feature edges are chain interiors; all others
+    are junctions or ends. A chain is a connected run of interior vertices
+    plus the edges leading from it to the junctions at its ends, and it is
+    closed when it has no such ends.
+
+    Parameters:
+        edges (np.ndarray): (K, 2) feature edges.
+        vertex_count (int): Number of mesh vertices.
+
+    Returns:
+        tuple: (edge_chain, chain_count, closed) where edge_chain is (K,) the
+        chain of every edge (-1 for edges between two junctions) and closed is
+        (chain_count,) True for closed loops.
+    """
+    if not len(edges):
+        return np.zeros(0, dtype=np.int64), 0, np.zeros(0, dtype=bool)
+    degree = np.bincount(edges.ravel(), minlength=vertex_count)
+    interior = degree == 2
+    inner = interior[edges[:, 0]] & interior[edges[:, 1]]
+
+    # Components of the graph of edges between interior vertices; each interior
+    # vertex without such an edge becomes a component of its own
+    graph = coo_matrix((np.ones(int(inner.sum())), (edges[inner, 0], edges[inner, 1])),
+                       shape=(vertex_count, vertex_count))
+    _, components = connected_components(graph, directed=False)
+
+    # Edges touching a junction join the chain of their interior end
+    interior_end = np.where(interior[edges[:, 0]], edges[:, 0], edges[:, 1])
+    attached = interior[edges[:, 0]] | interior[edges[:, 1]]
+    labels = np.where(attached, components[interior_end], -1)
+
+    used, edge_chain = np.unique(labels[attached], return_inverse=True)
+    chain = np.full(len(edges), -1, dtype=np.int64)
+    chain[attached] = edge_chain
+    ends = np.bincount(chain[attached & ~inner], minlength=len(used))
+    return chain, len(used), ends == 0
+
+
+def fit_circles(points, segment, count):
+    """
+    Fit a plane and a circle to every group of points at once.
+
+    The plane normal of each group is the eigenvector of the smallest
+    eigenvalue of its covariance; points are projected onto the plane and the
+    circle solves x^2 + y^2 = a x + b y + c in the least-squares sense.
+
+    Parameters:
+        points (np.ndarray): (N, 3) points of all groups.
+        segment (np.ndarray): (N,) group index of every point, sorted.
+        count (int): Number of groups.
+
+    Returns:
+        dict: (count, ...) arrays center, axis, radius, residual (RMS radial
+        error), planarity (RMS distance from the plane) and span (angle in
+        degrees the points cover around the centre).
+    """
+    points = np.asarray(points, dtype=np.float64)
+    sizes = np.bincount(segment, minlength=count).astype(np.float64)
+
+    def segment_sum(values):
+        values = values.reshape(len(points), -1)
+        return np.column_stack([np.bincount(segment, weights=values[:, k], minlength=count)
+                                for k in range(values.shape[1])])
+
+    mean = segment_sum(points) / sizes[:, None]
+    centred = points - mean[segment]
+    covariance = segment_sum(centred[:, :, None] * centred[:, None, :]).reshape(count, 3, 3) / sizes[:, None, None]
+    eigenvalues, eigenvectors = np.linalg.eigh(covariance)
+    axis = eigenvectors[:, :, 0]
+    u = eigenvectors[:, :, 2]
+    v = eigenvectors[:, :, 1]
+
+    x = (centred * u[segment]).sum(axis=1)
+    y = (centred * v[segment]).sum(axis=1)
+    design = np.column_stack([x, y, np.ones(len(points))])
+    target = x * x + y * y
+    normal_matrix = segment_sum(design[:, :, None] * design[:, None, :]).reshape(count, 3, 3)
+    right_side = segment_sum(design * target[:, None])
+    # Collinear groups give a singular system; they get an infinite radius
+    singular = np.linalg.det(normal_matrix) <= 1e-12 * np.abs(normal_matrix).max(axis=(1, 2)) ** 3
+    normal_matrix[singular] = np.eye(3)
+    a, b, c = np.linalg.solve(normal_matrix, right_side[:, :, None])[:, :, 0].T
+
+    center_x, center_y = a / 2, b / 2
+    radius = np.where(singular, np.inf, np.sqrt(np.maximum(c + center_x ** 2 + center_y ** 2, 0)))
+    radial = np.hypot(x - center_x[segment], y - center_y[segment]) - radius[segment]
+    residual = np.sqrt(np.bincount(segment, weights=radial ** 2, minlength=count) / sizes)
+
+    # Covered angle = full turn minus the largest gap between consecutive point angles
+    angle = np.arctan2(y - center_y[segment], x - center_x[segment])
+    order = np.lexsort((angle, segment))
+    angle = angle[order]
+    starts = np.r_[0, np.cumsum(sizes[:-1])].astype(np.int64)
+    gaps = np.diff(angle, append=0.0)
+    last = starts + sizes.astype(np.int64) - 1
+    gaps[last] = angle[starts] + 2 * np.pi - angle[last]
+    span = np.degrees(2 * np.pi - np.maximum.reduceat(gaps, starts))
+
+    return {
+        "center": mean + center_x[:, None] * u + center_y[:, None] * v,
+        "axis": axis,
+        "radius": radius,
+        "residual": residual,
+        "planarity": np.sqrt(np.maximum(eigenvalues[:, 0], 0)),
+        "span": span,
+    }
+
+
+def detect_circles(vertices, faces, sharp_angle=SHARP_ANGLE, max_relative_residual=MAX_RELATIVE_RESIDUAL,
+                   min_arc_angle=MIN_ARC_ANGLE, geometry=None):
+    """
+    Detect circular rims of holes and bosses, closed or interrupted.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        sharp_angle (float): Dihedral angle in degrees above which an edge is a feature edge.
+        max_relative_residual (float): Largest RMS radial residual / radius accepted.
+        min_arc_angle (float): Smallest angle in degrees an open arc must span.
+        geometry (FaceGeometry): Precomputed face geometry of the mesh.
+
+    Returns:
+        list: One dict per circle or arc, largest first, with center, axis,
+        radius, diameter, circumference, residual, span (degrees), closed,
+        kind ("hole" or "boss"), vertices (rim vertex ids) and faces (faces
+        along the rim).
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    if geometry is None:
+        geometry = FaceGeometry(vertices, faces)
+    edges, edge_face = feature_edges(vertices, faces, sharp_angle, geometry)
+    edge_chain, chain_count, closed = feature_chains(edges, len(vertices))
+    if chain_count == 0:
+        return []
+
+    in_chain = edge_chain >= 0
+    edges, edge_face, edge_chain = edges[in_chain], edge_face[in_chain], edge_chain[in_chain]
+    # Each vertex of a chain once, grouped by chain
+    vertex_count = len(vertices)
+    keys = np.unique(np.repeat(edge_chain, 2) * vertex_count + edges.ravel())
+    point_chain, point_vertex = keys // vertex_count, keys % vertex_count
+    sizes = np.bincount(point_chain, minlength=chain_count)
+    fit = fit_circles(vertices[point_vertex], point_chain, chain_count)
+
+    # Holes have walls facing the axis, bosses walls facing away; both faces of
+    # each rim edge vote with the radial component of their normals (the face
+    # across the rim is roughly perpendicular and adds little)
+    normals = geometry.normals.astype(np.float64)
+    finite = np.isfinite(fit["center"][edge_chain]).all(axis=1)
+    midpoints = vertices[edges].mean(axis=1)
+    radial = midpoints - fit["center"][edge_chain]
+    radial -= (radial * fit["axis"][edge_chain]).sum(axis=1)[:, None] * fit["axis"][edge_chain]
+    face_normals = normals[edge_face].sum(axis=1)
+    votes = np.bincount(edge_chain[finite], weights=(radial[finite] * face_normals[finite]).sum(axis=1),
+                        minlength=chain_count)
+
+    accepted = (
+        (sizes >= MIN_LOOP_VERTICES)
+        & np.isfinite(fit["radius"]) & (fit["radius"] > 0)
+        & (fit["residual"] <= max_relative_residual * fit["radius"])
+        & (closed | (fit["span"] >= min_arc_angle))
+    )
+    point_groups = np.split(point_vertex, np.cumsum(sizes)[:-1])
+    order = np.argsort(edge_chain, kind='stable')
+    edge_groups = np.split(order, np.cumsum(np.bincount(edge_chain, minlength=chain_count))[:-1])
+
+    circles = []
+    for chain in np.flatnonzero(accepted)[np.argsort(-fit["radius"][accepted], kind='stable')]:
+        radius = float(fit["radius"][chain])
+        circles.append({
+            'center': fit["center"][chain],
+            'axis': fit["axis"][chain],
+            'radius': radius,
+            'diameter': 2 * radius,
+            'circumference': 2 * np.pi * radius,
+            'residual': float(fit["residual"][chain]),
+            'span': 360.0 if closed[chain] else float(fit["span"][chain]),
+            'closed': bool(closed[chain]),
+            'kind': "hole" if votes[chain] < 0 else "boss",
+            'vertices': point_groups[chain],
+            'faces': np.unique(edge_face[edge_groups[chain]]),
+        })
+    return circles
+
+
+def mesh_circles(mesh, **kwargs):
+    """detect_circles for a trimesh mesh, reusing its shared FaceGeometry."""
+    return detect_circles(mesh.vertices, mesh.faces, geometry=mesh_face_geometry(mesh), **kwargs)
@@ -0,0 +1,99 @@
+# display_lod.py picks what an interactive viewer draws for a mesh so that browser payload and render time stay bounded whatever the part size. Meshes above a triangle budget are decimated once, to the largest LOD pyramid budget that fits, and the result is cached per mesh content; unlike the pyramid, no error is measured, since only the triangle count matters for display. Vertex overlays are thinned to a point budget. Analyses keep running on the full-resolution mesh: every displayed face knows the full-resolution face it stands for (used for hover text), and every full-resolution face knows the displayed face that covers it (used to highlight selections).
+import numpy as np
+from scipy.spatial import cKDTree
+
+from face_geometry import FaceGeometry, mesh_face_geometry
+from mesh_lod import decimate, lod_budgets, mesh_arrays
+
+# Most triangles and overlay points a viewer sends to the browser by default
+DISPLAY_FACE_BUDGET = 20000
+DISPLAY_POINT_BUDGET = 5000
+# Cache stage of the decimated display meshes; bump the version whenever they change
+CACHE_STAGE = "display_mesh"
+CACHE_VERSION = 1
+
+
+class DisplayMesh:
+    """
+    The mesh a viewer draws, linked to the full-resolution mesh it stands for.
+
+    Attributes:
+        vertices (np.ndarray): (V, 3) displayed vertices.
+        faces (np.ndarray): (F, 3) displayed faces.
+        source_faces (np.ndarray): (F,) full-resolution face represented by
+            every displayed face (the one nearest to its centroid).
+        face_to_display (np.ndarray): (N,) displayed face covering every
+            full-resolution face.
+        full_triangles (int): Triangle count of the full-resolution mesh.
+    """
+
+    def __init__(self, vertices, faces, source_faces, face_to_display, full_triangles):
+        self.vertices = vertices
+        self.faces = faces
+        self.source_faces = source_faces
+        self.face_to_display = face_to_display
+        self.full_triangles = full_triangles
+
+    @property
+    def decimated(self):
+        return len(self.faces) < self.full_triangles
+
+    def display_mask(self, full_faces):
+        """Return a (F,) mask of the displayed faces covering any of the given full-resolution faces."""
+        mask = np.zeros(len(self.faces), dtype=bool)
+        mask[self.face_to_display[np.asarray(full_faces, dtype=np.int64)]] = True
+        return mask
+
+
+def display_level(mesh, face_budget=DISPLAY_FACE_BUDGET):
+    """
+    Decimate a mesh once to the largest LOD pyramid budget within face_budget.
+
+    Returns:
+        tuple: (vertices, faces) of the decimated mesh.
+    """
+    vertices, faces = mesh_arrays(mesh)
+    budget = next((budget for budget in lod_budgets(len(faces)) if budget <= face_budget), face_budget)
+    return decimate(vertices, faces, budget)
+
+
+def display_mesh(mesh, face_budget=DISPLAY_FACE_BUDGET, cache=None):
+    """
+    Choose the representation of a mesh to draw within a triangle budget.
+
+    Parameters:
+        mesh: trimesh.Trimesh or open3d.geometry.TriangleMesh.
+        face_budget (int): Most triangles to draw.
+        cache (MeshCache): Cache keeping the decimated mesh, or None to decimate every time.
+
+    Returns:
+        DisplayMesh: The full mesh when it fits (or cannot be decimated),
+        otherwise its display_level, with the face mappings between the two.
+    """
+    vertices, faces = mesh_arrays(mesh)
+    if len(faces) > face_budget:
+        if cache is None:
+            level_vertices, level_faces = display_level(mesh, face_budget)
+        else:
+            level_vertices, level_faces = cache.run(CACHE_STAGE, display_level, mesh, face_budget, version=CACHE_VERSION)
+        if len(level_faces):
+            full_centroids = mesh_face_geometry(mesh).centroids
+            level_centroids = FaceGeometry(level_vertices, level_faces).centroids
+            _, source_faces = cKDTree(full_centroids).query(level_centroids)
+            _, face_to_display = cKDTree(level_centroids).query(full_centroids)
+            return DisplayMesh(level_vertices, level_faces, source_faces, face_to_display, len(faces))
+
+    identity = np.arange(len(faces))
+    return DisplayMesh(vertices, faces, identity, identity, len(faces))
+
+
+def budget_points(points, point_budget=DISPLAY_POINT_BUDGET):
+    """
+    Thin a point overlay to at most point_budget points with an even stride.
+
+    Returns:
+        np.ndarray: Indices of the kept points.
+    """
+    if len(points) <= point_budget:
+        return np.arange(len(points))
+    return np.linspace(0, len(points) - 1, point_budget).astype(np.int64)
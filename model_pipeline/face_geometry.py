@@ -0,0 +1,98 @@
+# face_geometry.py computes the per-face quantities the visualization and classification services need (edge vectors and lengths, areas, centroids, normals, circumcentres and aspect ratios) for all faces at once. They are stored as contiguous float32 arrays in a FaceGeometry, which is built once per mesh and shared: for trimesh meshes it lives in the mesh's own cache, so it is dropped automatically when the vertices or faces change.
+import numpy as np
+
+# Key of the FaceGeometry in a trimesh mesh's cache
+CACHE_KEY = "face_geometry"
+
+
+def _float32(values):
+    return np.ascontiguousarray(values, dtype=np.float32)
+
+
+class FaceGeometry:
+    """
+    Vectorized per-face geometry of a triangle mesh.
+
+    Edge i of a face runs from corner i to corner (i + 1) % 3, the order the
+    per-face helpers used. Values are computed in float64 and stored as float32.
+    Degenerate faces get zero normals, NaN circumcentres and circumradii and an
+    infinite aspect ratio.
+
+    Attributes:
+        vertices (np.ndarray): The mesh vertices the geometry was computed from.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        edge_vectors (np.ndarray): (F, 3, 3) vector of each edge.
+        edge_lengths (np.ndarray): (F, 3) length of each edge.
+        areas (np.ndarray): (F,) face areas.
+        centroids (np.ndarray): (F, 3) mean of the three corners.
+        centroid_distances (np.ndarray): (F, 3) distance of each corner from the centroid.
+        normals (np.ndarray): (F, 3) unit normals.
+        circumcenters (np.ndarray): (F, 3) centres of the circumscribed circles.
+        circumradii (np.ndarray): (F,) radii of the circumscribed circles.
+        aspect_ratios (np.ndarray): (F,) circumradius / (2 * inradius); 1 for
+            an equilateral triangle and growing as faces become slivers.
+    """
+
+    def __init__(self, vertices, faces):
+        self.vertices = vertices
+        self.faces = np.asarray(faces, dtype=np.int64)
+        corners = np.asarray(vertices, dtype=np.float64)[self.faces]
+
+        edges = np.roll(corners, -1, axis=1) - corners
+        lengths = np.linalg.norm(edges, axis=2)
+        cross = np.cross(edges[:, 0], -edges[:, 2])
+        double_area = np.linalg.norm(cross, axis=1)
+        valid = double_area > 0
+
+        normals = np.zeros_like(cross)
+        normals[valid] = cross[valid] / double_area[valid, None]
+        centroids = corners.mean(axis=1)
+
+        # Circumcentre relative to corner 0: (|u|^2 (w x n) + |w|^2 (n x u)) / (2 |n|^2)
+        u, w = edges[:, 0], -edges[:, 2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            offset = ((u * u).sum(axis=1)[:, None] * np.cross(w, cross)
+                      + (w * w).sum(axis=1)[:, None] * np.cross(cross, u)) / (2 * double_area ** 2)[:, None]
+            circumcenters = np.where(valid[:, None], corners[:, 0] + offset, np.nan)
+            circumradii = np.where(valid, np.linalg.norm(offset, axis=1), np.nan)
+            inradii = double_area / lengths.sum(axis=1)
+            aspect_ratios = np.where(valid, circumradii / (2 * inradii), np.inf)
+
+        self.edge_vectors = _float32(edges)
+        self.edge_lengths = _float32(lengths)
+        self.areas = _float32(double_area / 2)
+        self.centroids = _float32(centroids)
+        self.centroid_distances = _float32(np.linalg.norm(corners - centroids[:, None], axis=2))
+        self.normals = _float32(normals)
+        self.circumcenters = _float32(circumcenters)
+        self.circumradii = _float32(circumradii)
+        self.aspect_ratios = _float32(aspect_ratios)
+
+    def __len__(self):
+        return len(self.faces)
+
+    def edge_midpoints(self):
+        """Return the (F, 3, 3) midpoint of every edge."""
+        corners = np.asarray(self.vertices, dtype=np.float32)[self.faces]
+        return corners + self.edge_vectors / 2
+
+
+def mesh_face_geometry(mesh):
+    """
+    Return the FaceGeometry of a mesh, computing it only once per mesh.
+
+    Parameters:
+        mesh: trimesh.Trimesh or open3d.geometry.TriangleMesh.
+
+    Returns:
+        FaceGeometry: Shared geometry of the mesh's faces.
+    """
+    if hasattr(mesh, "triangles") and not hasattr(mesh, "faces"):
+        # Open3D meshes have no cache to keep it in
+        return FaceGeometry(np.asarray(mesh.vertices), np.asarray(mesh.triangles))
+
+    # trimesh clears its cache whenever the mesh data changes
+    cache = mesh._cache
+    if CACHE_KEY not in cache:
+        cache[CACHE_KEY] = FaceGeometry(mesh.vertices, mesh.faces)
+    return cache[CACHE_KEY]
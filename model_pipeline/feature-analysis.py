@@ -1,8 +1,6 @@
 # feature-analysis.py analyzes geometric features extracted from a 3D mesh. The script computes statistical measures such as the number of vertices, faces, and mean curvatures of the mesh. The feature statistics are saved to CSV and JSON files for further analysis or visualization.
-import numpy as np
-import pandas as pd
-import json
 import os
+from feature_statistics import analyze_feature_source, curvature_statistics, statistics_frame
 
 def analyze_features(vertices, faces, curvatures):
     """
@@ -11,33 +9,12 @@ def analyze_features(vertices, faces, curvatures):
     Parameters:
     - vertices (np.ndarray): Array of vertices.
     - faces (np.ndarray): Array of faces.
-    - curvatures (np.ndarray): Mean curvatures of vertices.
+    - curvatures (np.ndarray): Mean curvatures of the faces.
 
     Returns:
     - feature_df (pd.DataFrame): DataFrame containing feature statistics.
     """
-    # Compute statistical measures
-    vertex_count = len(vertices)
-    face_count = len(faces)
-    curvature_mean = np.mean(curvatures)
-    curvature_std = np.std(curvatures)
-    curvature_min = np.min(curvatures)
-    curvature_max = np.max(curvatures)
-
-    # Prepare feature statistics
-    feature_stats = {
-        "vertex_count": vertex_count,
-        "face_count": face_count,
-        "curvature_mean": curvature_mean,
-        "curvature_std": curvature_std,
-        "curvature_min": curvature_min,
-        "curvature_max": curvature_max
-    }
-
-    # Create a DataFrame for feature statistics
-    feature_df = pd.DataFrame([feature_stats])
-
-    return feature_df
+    return statistics_frame(len(vertices), len(faces), curvature_statistics(curvatures))
 
 def save_features(feature_df, output_dir):
     """
@@ -61,17 +38,11 @@ def save_features(feature_df, output_dir):
     print(f"Feature statistics saved to {json_path}")
 
 if __name__ == "__main__":
-    # Load the extracted features from the JSON file
-    extracted_features_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\statistics\extracted_features.json'
-    with open(extracted_features_path, 'r') as json_file:
-        features = json.load(json_file)
-
-    vertices = np.array(features['vertices'])
-    faces = np.array(features['faces'])
-    curvatures = np.array(features['curvatures']) # Replace with actual curvatures
+    # Stream the extracted features from the feature store (a legacy .json export also works)
+    extracted_features_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\statistics\extracted_features'
 
     # Analyze features
-    feature_df = analyze_features(vertices, faces, curvatures)
+    feature_df, curvature_stats = analyze_feature_source(extracted_features_path)
 
     # Print feature statistics
     print("Feature Statistics:")
@@ -1,40 +1,52 @@
-#feature-extraction.py extracts geometric features from a 3D mesh. The script identifies shapes such as rectangles and squares from the mesh faces and calculates their dimensions. The extracted features are saved to a JSON file for further analysis or visualization.
-import trimesh
-import numpy as np
-import json
+#feature-extraction.py extracts geometric features from a 3D mesh. The script identifies shapes such as rectangles and squares from the mesh faces and calculates their dimensions. The extracted features are saved to a binary feature store (typed .npy arrays plus a manifest) for further analysis or visualization, with JSON available as an explicit export.
+import sys
+from feature_store import as_feature_arrays, save_feature_store, export_features_json
+from stl_reader import load_trimesh
+from mesh_curvature import mesh_curvatures
+from mesh_cache import default_cache
 
+# Cache stage of process_mesh; bump the version when the features change so
+# entries computed by older code are not served (2: cotangent curvatures)
+CACHE_STAGE = "process_mesh_features"
+CACHE_VERSION = 2
 
-def calculate_dimensions(face_vertices):
-    # Calculate dimensions of the shape
-    length = np.linalg.norm(face_vertices[0] - face_vertices[1])
-    width = np.linalg.norm(face_vertices[1] - face_vertices[2])
-    return {"length": length, "width": width}
 
 def process_mesh(file_path):
     # Load the mesh
-    mesh = trimesh.load(file_path)
+    mesh = load_trimesh(file_path)
     vertices = mesh.vertices
     faces = mesh.faces
-    estimated_mean_curvatures = np.linalg.norm(mesh.face_normals, axis=1)
-
-
-    # Prepare features dictionary
-    features = {
-        "vertices": vertices.tolist(),
-        "faces": faces.tolist(),
-        "edges": mesh.edges.tolist(),
-        "curvatures": estimated_mean_curvatures.tolist(),
-    }
+    # Discrete mean and Gaussian curvature; "curvatures" holds the per-face
+    # mean curvature so faces can be coloured by it
+    curvatures = mesh_curvatures(vertices, faces)
+
+    # Prepare features dictionary of typed arrays
+    features = as_feature_arrays({
+        "vertices": vertices,
+        "faces": faces,
+        "edges": mesh.edges,
+        "curvatures": curvatures["face_mean"],
+        "gaussian_curvatures": curvatures["face_gaussian"],
+        "vertex_curvatures": curvatures["vertex_mean"],
+        "vertex_gaussian_curvatures": curvatures["vertex_gaussian"],
+    })
 
     return features
 
 if __name__ == "__main__":
     model_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\STLs\custom-shared.stl'
-    features = process_mesh(model_path)
-
-    # Save features to a JSON file
-    output_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\statistics\extracted_features.json'
-    with open(output_path, 'w') as json_file:
-        json.dump(features, json_file, indent=4)
-
-    print(f"Extracted features saved to {output_path}")
+    # Identical geometry is served from the content-addressed cache
+    cache = default_cache()
+    features = cache.run(CACHE_STAGE, process_mesh, model_path, version=CACHE_VERSION)
+    print(f"Cache hits: {cache.hits}, misses: {cache.misses}")
+
+    # Save features to a binary feature store
+    output_dir = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\statistics\extracted_features'
+    save_feature_store(features, output_dir, source=model_path)
+    print(f"Extracted features saved to {output_dir}")
+
+    # Optionally export the legacy JSON layout as well
+    if "--json" in sys.argv:
+        output_path = output_dir + '.json'
+        export_features_json(features, output_path)
+        print(f"Extracted features exported to {output_path}")
@@ -1,16 +1,10 @@
 # This script visualizes the extracted features from a 3D mesh model.
 
-import json
 import matplotlib.pyplot as plt
 import numpy as np
-import trimesh
 from matplotlib.colors import Normalize, LinearSegmentedColormap
-
-def load_features(json_path):
-    """Load extracted features from a JSON file."""
-    with open(json_path, 'r') as f:
-        data = json.load(f)
-    return data
+from feature_store import load_features
+from stl_reader import load_trimesh
 
 def visualize_curvature_distribution(curvatures, output_path):
     """Create a histogram of curvature distribution."""
@@ -25,7 +19,7 @@ def visualize_curvature_distribution(curvatures, output_path):
 def visualize_mesh_with_curvature(mesh_path, curvatures, output_path):
     """Visualize the 3D mesh with curvature values highlighted."""
     # Load the mesh
-    mesh = trimesh.load(mesh_path)
+    mesh = load_trimesh(mesh_path)
     
     # Define a colormap for curvature values
     cmap = plt.cm.jet
@@ -47,18 +41,18 @@ def visualize_mesh_with_curvature(mesh_path, curvatures, output_path):
 
 if __name__ == "__main__":
     # Paths to input files
-    features_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\statistics\extracted_features.json'
+    features_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\statistics\extracted_features'
     normalized_mesh_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\modified-models\axis-2-digits-normalized-mesh.stl'
     
     # Paths to output files
     curvature_histogram_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\images\curvature_histogram.png'
     mesh_with_curvature_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\modified-models\visualized-mesh.stl'
 
-    # Load extracted features
+    # Load extracted features (memory-mapped from the feature store)
     features = load_features(features_path)
     
     # Extract curvatures from loaded features
-    curvatures = np.array(features['curvatures'])
+    curvatures = features['curvatures']
     
     # Visualize curvature distribution
     visualize_curvature_distribution(curvatures, curvature_histogram_path)
@@ -0,0 +1,79 @@
+# feature_statistics.py builds the feature statistics tables of the feature analysis script, the Feature Analysis page and the batch CLI. Vertex and face counts come from the stored array headers and the curvatures are streamed through mergeable StreamingStats, so one file, several uploads or a whole corpus are summarised the same way without loading the arrays whole.
+import pandas as pd
+
+from feature_store import feature_shapes, iter_feature_chunks
+from streaming_stats import DEFAULT_CHUNK_SIZE, StreamingStats, iter_chunks, merge_stats
+
+
+def curvature_statistics(curvatures, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Accumulate curvature statistics chunk by chunk.
+
+    Parameters:
+    - curvatures (np.ndarray or iterable): Curvature array (a memory-mapped one
+      is read a chunk at a time) or an iterable of curvature chunks.
+    - chunk_size (int): Values per chunk when an array is given.
+
+    Returns:
+    - stats (StreamingStats): Mergeable curvature statistics.
+    """
+    chunks = iter_chunks(curvatures, chunk_size) if hasattr(curvatures, "shape") else curvatures
+    return StreamingStats().update_chunks(chunks)
+
+def statistics_frame(vertex_count, face_count, curvature_stats):
+    """
+    Builds the feature statistics table from counts and curvature statistics.
+
+    Parameters:
+    - vertex_count (int): Number of vertices.
+    - face_count (int): Number of faces.
+    - curvature_stats (StreamingStats): Curvature statistics.
+
+    Returns:
+    - feature_df (pd.DataFrame): DataFrame containing feature statistics.
+    """
+    curvature_summary = curvature_stats.summary(prefix="curvature_")
+    curvature_summary.pop("curvature_count")
+
+    # Prepare feature statistics
+    feature_stats = {
+        "vertex_count": vertex_count,
+        "face_count": face_count,
+        **curvature_summary,
+    }
+
+    # Create a DataFrame for feature statistics
+    return pd.DataFrame([feature_stats])
+
+def analyze_feature_source(source):
+    """
+    Analyzes stored features without loading the arrays whole.
+
+    Only the array headers are read for the counts, and the curvatures are
+    streamed in chunks.
+
+    Parameters:
+    - source: Feature store directory, .npz archive (path or upload) or legacy JSON.
+
+    Returns:
+    - feature_df (pd.DataFrame): DataFrame containing feature statistics.
+    - curvature_stats (StreamingStats): Curvature statistics, mergeable across files.
+    """
+    shapes = feature_shapes(source)
+    curvature_stats = curvature_statistics(iter_feature_chunks(source, "curvatures"))
+    return statistics_frame(shapes["vertices"][0], shapes["faces"][0], curvature_stats), curvature_stats
+
+def corpus_statistics(feature_dfs, curvature_stats):
+    """
+    Combines the statistics of several files.
+
+    Parameters:
+    - feature_dfs (list): Per-file feature statistics DataFrames.
+    - curvature_stats (list): The matching per-file StreamingStats.
+
+    Returns:
+    - feature_df (pd.DataFrame): One row with total counts and merged curvature statistics.
+    """
+    vertex_count = int(sum(df["vertex_count"].sum() for df in feature_dfs))
+    face_count = int(sum(df["face_count"].sum() for df in feature_dfs))
+    return statistics_frame(vertex_count, face_count, merge_stats(curvature_stats))
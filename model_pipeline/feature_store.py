@@ -0,0 +1,279 @@
+# feature_store.py stores the features extracted from a 3D mesh as typed NumPy arrays instead of nested JSON lists. A feature store is a directory holding one raw .npy file per array plus a small manifest.json describing them, so the arrays can be memory-mapped back without parsing or copying. A single-file .npz archive is provided for uploads and downloads, and JSON stays available as an explicit export option.
+import io
+import json
+import os
+import zipfile
+
+import numpy as np
+
+FORMAT_NAME = "feature-store"
+FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+# Rows read at a time when a feature array is streamed
+CHUNK_ROWS = 1 << 16
+
+# Arrays written by process_mesh_features and the dtype each one is stored with
+FEATURE_DTYPES = {
+    "vertices": np.float64,
+    "faces": np.int32,
+    "edges": np.int32,
+    "curvatures": np.float64,
+    "gaussian_curvatures": np.float64,
+    "vertex_curvatures": np.float64,
+    "vertex_gaussian_curvatures": np.float64,
+}
+
+
+def as_feature_arrays(features):
+    """
+    Convert a features dictionary to contiguous typed arrays.
+
+    Parameters:
+        features (dict): Mapping of feature name to array-like values.
+
+    Returns:
+        dict: Mapping of feature name to np.ndarray. Known features are cast to
+        the dtypes in FEATURE_DTYPES, other entries keep their own dtype.
+    """
+    arrays = {}
+    for name, values in features.items():
+        dtype = FEATURE_DTYPES.get(name)
+        arrays[name] = np.ascontiguousarray(values, dtype=dtype)
+    return arrays
+
+
+def save_feature_store(features, store_dir, source=None):
+    """
+    Save features as a directory of .npy files plus a JSON manifest.
+
+    Parameters:
+        features (dict): Mapping of feature name to array-like values.
+        store_dir (str): Directory to write the store into.
+        source (str): Optional path of the mesh the features came from.
+
+    Returns:
+        dict: The manifest that was written.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    arrays = as_feature_arrays(features)
+
+    manifest = {
+        "format": FORMAT_NAME,
+        "version": FORMAT_VERSION,
+        "source": source,
+        "arrays": {},
+    }
+    for name, array in arrays.items():
+        file_name = f"{name}.npy"
+        np.save(os.path.join(store_dir, file_name), array, allow_pickle=False)
+        manifest["arrays"][name] = {
+            "file": file_name,
+            "dtype": array.dtype.str,
+            "shape": list(array.shape),
+        }
+
+    with open(os.path.join(store_dir, MANIFEST_NAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=4)
+
+    return manifest
+
+
+def read_manifest(store_dir):
+    """Read and validate the manifest of a feature store directory."""
+    with open(os.path.join(store_dir, MANIFEST_NAME), 'r') as manifest_file:
+        manifest = json.load(manifest_file)
+
+    if manifest.get("format") != FORMAT_NAME:
+        raise ValueError(f"{store_dir} is not a feature store")
+    if manifest.get("version", 0) > FORMAT_VERSION:
+        raise ValueError(f"Unsupported feature store version {manifest['version']}")
+    return manifest
+
+
+def load_feature_store(store_dir, mmap_mode='r'):
+    """
+    Load a feature store directory.
+
+    Parameters:
+        store_dir (str): Directory written by save_feature_store.
+        mmap_mode (str): Memory-map mode passed to np.load. The default 'r'
+            maps the files read-only without copying; None reads them into memory.
+
+    Returns:
+        dict: Mapping of feature name to np.ndarray (or np.memmap).
+    """
+    manifest = read_manifest(store_dir)
+    features = {}
+    for name, entry in manifest["arrays"].items():
+        features[name] = np.load(os.path.join(store_dir, entry["file"]), mmap_mode=mmap_mode, allow_pickle=False)
+    return features
+
+
+def save_feature_archive(features, file):
+    """
+    Save features as a single uncompressed .npz archive.
+
+    Parameters:
+        features (dict): Mapping of feature name to array-like values.
+        file (str or file-like): Destination path or writable binary file.
+    """
+    np.savez(file, **as_feature_arrays(features))
+
+
+def features_to_npz_bytes(features):
+    """Return the .npz archive of the features as bytes, e.g. for a download button."""
+    buffer = io.BytesIO()
+    save_feature_archive(features, buffer)
+    return buffer.getvalue()
+
+
+def load_feature_archive(file):
+    """
+    Load features from a .npz archive.
+
+    Parameters:
+        file (str or file-like): Path or readable binary file, such as a Streamlit upload.
+
+    Returns:
+        dict: Mapping of feature name to np.ndarray.
+    """
+    with np.load(file, allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def features_to_json(features, indent=4):
+    """Serialize features to the legacy JSON layout of nested lists."""
+    return json.dumps({name: np.asarray(values).tolist() for name, values in features.items()}, indent=indent)
+
+
+def export_features_json(features, json_path, indent=4):
+    """Export features to a JSON file in the legacy layout of nested lists."""
+    with open(json_path, 'w') as json_file:
+        json_file.write(features_to_json(features, indent=indent))
+
+
+def load_uploaded_features(uploaded_file):
+    """
+    Load features from an uploaded .npz archive or legacy JSON file.
+
+    Parameters:
+        uploaded_file: File-like object with a ``name`` attribute, such as a Streamlit upload.
+
+    Returns:
+        dict: Mapping of feature name to np.ndarray.
+    """
+    if uploaded_file.name.lower().endswith(".npz"):
+        return load_feature_archive(uploaded_file)
+    return as_feature_arrays(json.load(uploaded_file))
+
+
+def load_features(path, mmap_mode='r'):
+    """
+    Load features from a feature store directory, a .npz archive or a legacy JSON file.
+
+    Parameters:
+        path (str): Store directory, .npz file or .json file.
+        mmap_mode (str): Memory-map mode used for store directories.
+
+    Returns:
+        dict: Mapping of feature name to np.ndarray.
+    """
+    if os.path.isdir(path):
+        return load_feature_store(path, mmap_mode=mmap_mode)
+    if path.lower().endswith(".npz"):
+        return load_feature_archive(path)
+
+    with open(path, 'r') as json_file:
+        data = json.load(json_file)
+    return as_feature_arrays(data)
+
+
+def _is_archive(source):
+    """Return True when a path or upload refers to a .npz archive."""
+    name = source if isinstance(source, str) else getattr(source, "name", "")
+    return name.lower().endswith(".npz")
+
+
+def _read_npy_header(member):
+    """Read the header of a .npy stream and return (shape, fortran_order, dtype)."""
+    version = np.lib.format.read_magic(member)
+    if version == (1, 0):
+        return np.lib.format.read_array_header_1_0(member)
+    return np.lib.format.read_array_header_2_0(member)
+
+
+def feature_shapes(source):
+    """
+    Return the shape of every feature array without reading the array data.
+
+    Parameters:
+        source: Feature store directory, .npz path or upload, or legacy JSON path or upload.
+
+    Returns:
+        dict: Mapping of feature name to shape tuple.
+    """
+    if isinstance(source, str) and os.path.isdir(source):
+        manifest = read_manifest(source)
+        return {name: tuple(entry["shape"]) for name, entry in manifest["arrays"].items()}
+
+    if _is_archive(source):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        shapes = {}
+        with zipfile.ZipFile(source) as archive:
+            for member_name in archive.namelist():
+                with archive.open(member_name) as member:
+                    shapes[member_name[:-len(".npy")]] = _read_npy_header(member)[0]
+        return shapes
+
+    # JSON has no header to read, so it is parsed in full
+    return {name: values.shape for name, values in _load_json_source(source).items()}
+
+
+def _load_json_source(source):
+    """Load a legacy JSON path or upload as typed arrays."""
+    if isinstance(source, str):
+        return load_features(source)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return as_feature_arrays(json.load(source))
+
+
+def iter_feature_chunks(source, name, chunk_rows=CHUNK_ROWS):
+    """
+    Yield one feature array in chunks of rows, without loading it whole.
+
+    Store directories are memory-mapped and .npz members are decompressed and
+    read incrementally. Legacy JSON has to be parsed in full, so it is loaded
+    once and then sliced.
+
+    Parameters:
+        source: Feature store directory, .npz path or upload, or legacy JSON path or upload.
+        name (str): Feature to read, e.g. "curvatures".
+        chunk_rows (int): Maximum rows per chunk.
+
+    Yields:
+        np.ndarray: Consecutive chunks of the array.
+    """
+    if isinstance(source, str) and os.path.isdir(source):
+        values = load_feature_store(source, mmap_mode='r')[name]
+    elif _is_archive(source):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        with zipfile.ZipFile(source) as archive, archive.open(f"{name}.npy") as member:
+            shape, fortran_order, dtype = _read_npy_header(member)
+            if fortran_order and len(shape) > 1:
+                raise ValueError(f"Cannot stream Fortran-ordered array {name}")
+            row_items = int(np.prod(shape[1:], dtype=np.int64))
+            rows_left = shape[0]
+            while rows_left > 0:
+                rows = min(chunk_rows, rows_left)
+                data = member.read(rows * row_items * dtype.itemsize)
+                yield np.frombuffer(data, dtype=dtype).reshape((rows,) + tuple(shape[1:]))
+                rows_left -= rows
+        return
+    else:
+        values = _load_json_source(source)[name]
+
+    for start in range(0, len(values), chunk_rows):
+        yield np.asarray(values[start:start + chunk_rows])
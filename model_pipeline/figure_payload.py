@@ -0,0 +1,94 @@
+# figure_payload.py shrinks the Plotly figures the Streamlit pages send to the browser. Plotly ships NumPy arrays as base64 typed arrays, so geometry is handed over in the smallest type that holds it: vertex positions are quantized to uint16 steps of the bounding box (one step size for all three axes, so proportions are kept), face indices become uint16 or uint32 depending on the vertex count, and hover values travel as numeric float32 customdata formatted in the browser by a hovertemplate instead of as one preformatted string per element. The axes are labelled in model units with tick values placed on the quantized grid.
+import numpy as np
+import plotly.graph_objects as go
+
+# Largest quantized coordinate; positions use the full uint16 range
+POSITION_LEVELS = np.iinfo(np.uint16).max
+# Ticks per axis of a quantized scene
+AXIS_TICKS = 6
+
+
+class PositionQuantizer:
+    """
+    Map model coordinates to uint16 steps of a bounding box and back.
+
+    Parameters:
+        points (np.ndarray): (N, 3) points that define the bounding box.
+    """
+
+    def __init__(self, points):
+        points = np.asarray(points, dtype=np.float64)
+        self.lower = points.min(axis=0)
+        self.upper = points.max(axis=0)
+        self.step = float((self.upper - self.lower).max()) / POSITION_LEVELS or 1.0
+
+    def quantize(self, points):
+        """Return (N, 3) uint16 positions; points outside the box are clamped to it."""
+        steps = np.rint((np.asarray(points, dtype=np.float64) - self.lower) / self.step)
+        return np.clip(steps, 0, POSITION_LEVELS).astype(np.uint16)
+
+    def dequantize(self, positions):
+        """Return the model coordinates of quantized positions."""
+        return self.lower + np.asarray(positions, dtype=np.float64) * self.step
+
+    def axis(self, axis, title, ticks=AXIS_TICKS):
+        """Return a scene axis dict with ticks labelled in model units."""
+        values = np.linspace(self.lower[axis], self.upper[axis], ticks)
+        return dict(
+            title=title,
+            tickvals=np.rint((values - self.lower[axis]) / self.step),
+            ticktext=[f"{value:.4g}" for value in values],
+        )
+
+    def scene(self, titles=('X', 'Y', 'Z')):
+        """Return a layout scene for traces in quantized coordinates."""
+        return dict(
+            xaxis=self.axis(0, titles[0]),
+            yaxis=self.axis(1, titles[1]),
+            zaxis=self.axis(2, titles[2]),
+            aspectmode='data',
+        )
+
+
+def index_array(faces, vertex_count):
+    """Return face indices as uint16 when every vertex fits, otherwise as uint32."""
+    dtype = np.uint16 if vertex_count <= np.iinfo(np.uint16).max + 1 else np.uint32
+    return np.ascontiguousarray(faces, dtype=dtype)
+
+
+def compact_mesh3d(vertices, faces, quantizer, **kwargs):
+    """
+    Build a Mesh3d trace with quantized positions and narrow indices.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) vertices in model units.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        quantizer (PositionQuantizer): Shared by every trace of the figure.
+        **kwargs: Further Mesh3d properties.
+
+    Returns:
+        go.Mesh3d: The trace.
+    """
+    # One contiguous array per coordinate, so each is sent as a single typed array
+    x, y, z = np.ascontiguousarray(quantizer.quantize(vertices).T)
+    i, j, k = np.ascontiguousarray(index_array(faces, len(vertices)).T)
+    return go.Mesh3d(x=x, y=y, z=z, i=i, j=j, k=k, **kwargs)
+
+
+def compact_scatter3d(points, quantizer, customdata=None, **kwargs):
+    """
+    Build a Scatter3d trace with quantized positions and float32 customdata.
+
+    Parameters:
+        points (np.ndarray): (N, 3) points in model units.
+        quantizer (PositionQuantizer): Shared by every trace of the figure.
+        customdata (np.ndarray): (N, K) numeric hover values, or None.
+        **kwargs: Further Scatter3d properties, e.g. a hovertemplate reading customdata.
+
+    Returns:
+        go.Scatter3d: The trace.
+    """
+    x, y, z = np.ascontiguousarray(quantizer.quantize(points).T)
+    if customdata is not None:
+        kwargs['customdata'] = np.ascontiguousarray(customdata, dtype=np.float32)
+    return go.Scatter3d(x=x, y=y, z=z, **kwargs)
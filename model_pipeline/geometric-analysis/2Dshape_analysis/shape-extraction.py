@@ -1,10 +1,26 @@
 import trimesh
 import numpy as np
-from shapely.geometry import Polygon
-from shapely.geometry.polygon import orient
-from skimage import measure
 import json
-import math
+import os
+import sys
+import pandas as pd
+
+# Reuse the shared loaders that live in model_pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from stl_reader import load_trimesh
+from triangle_raster import raster_grid, rasterize_triangles, trace_contours
+from vector_silhouette import plane_silhouettes
+from polygon_table import contour_polygons, shape_table, shape_records
+from mask_regions import region_table
+from mesh_slicing import slice_mesh, slice_offsets
+from mesh_cache import default_cache
+
+# Default slicing direction and number of cross-sections
+SECTION_NORMAL = (0.0, 0.0, 1.0)
+SECTION_COUNT = 5
+# Versions of the cached shape and section tables; bump them when their results change
+SHAPES_CACHE_VERSION = 3
+SECTIONS_CACHE_VERSION = 2
 
 def project_to_2d_planes(mesh):
     vertices = mesh.vertices
@@ -13,130 +29,144 @@ def project_to_2d_planes(mesh):
     yz_plane = vertices[:, 1:]
     return xy_plane, xz_plane, yz_plane
 
-def extract_contours(plane_points, img_size=1000):
-    # Scale points to fit within image bounds
-    min_vals = plane_points.min(axis=0)
-    max_vals = plane_points.max(axis=0)
-    scale = (img_size - 1) / (max_vals - min_vals)
-    offset = min_vals * scale
-    scaled_points = (plane_points * scale - offset).astype(int)
-    
-    # Create a binary image for contour detection
-    img = np.zeros((img_size, img_size), dtype=np.uint8)
-    x, y = scaled_points.T
-    valid = (x >= 0) & (x < img_size) & (y >= 0) & (y < img_size)
-    img[x[valid], y[valid]] = 1
-
-    contours = measure.find_contours(img, level=0.5)
+def extract_contours(plane_points, img_size=1000, faces=None, feature_size=None, return_grid=False):
+    # Choose square pixels from the projection extent, capped at img_size along the longer side;
+    # the same grid (raster_grid) maps the pixel contours back to plane coordinates
+    grid = raster_grid(plane_points, img_size=img_size, feature_size=feature_size)
+
+    # Fill the projected triangles (or only the vertices when no faces are given) into a bit-packed mask
+    mask = rasterize_triangles(plane_points, faces, grid)
+
+    # Trace contours only around the tiles the silhouette passes through
+    contours = trace_contours(mask)
+    if return_grid:
+        # The grid maps the pixel contours back onto the plane (see shape_backprojection)
+        return contours, grid
     return contours
 
 def analyze_contours(contours):
-    shapes = []
-    for contour in contours:
-        if len(contour) < 3:
-            continue
-        poly = Polygon(contour)
-        if poly.is_valid:
-            shapes.append(orient(poly))
-    return shapes
-
-def identify_shape(shape):
-    if shape.is_empty:
-        return "No shape detected"
-
-    exterior_coords = list(shape.exterior.coords)
-    num_coords = len(exterior_coords)
-    
-    if num_coords == 3:
-        return "Triangle"
-    elif num_coords == 4:
-        area = shape.area
-        length = shape.length
-        if abs(area - length ** 2) < 1e-5:
-            return "Square"
-        else:
-            return "Rectangle"
-    elif num_coords > 4:
-        # Approximate circle detection based on shape's area and perimeter
-        area = shape.area
-        perimeter = shape.length
-        if perimeter ** 2 / (4 * math.pi * area) > 0.8:
-            return "Circle"
-        return "Polygon"
-    return "Unknown shape"
-
-def calculate_dimensions(shape):
-    dimensions = {}
-    coords = np.array(shape.exterior.coords)
-    
-    if len(coords) == 3:
-        # Triangle dimensions (assuming right-angled triangle for simplicity)
-        a = np.linalg.norm(coords[0] - coords[1])
-        b = np.linalg.norm(coords[1] - coords[2])
-        c = np.linalg.norm(coords[2] - coords[0])
-        dimensions = {
-            "side_1": a,
-            "side_2": b,
-            "side_3": c,
-            "height": min(a, b, c),  # Simplified assumption
-            "base": max(a, b, c)     # Simplified assumption
-        }
-    elif len(coords) == 4:
-        # Rectangle or Square dimensions
-        length = np.linalg.norm(coords[0] - coords[1])
-        width = np.linalg.norm(coords[1] - coords[2])
-        dimensions = {
-            "length": length,
-            "width": width
-        }
-    else:
-        # Circle dimensions
-        perimeter = shape.length
-        area = shape.area
-        radius = math.sqrt(area / math.pi)
-        diameter = 2 * radius
-        dimensions = {
-            "radius": radius,
-            "diameter": diameter
-        }
-    
-    return dimensions
-
-def get_shape_properties(shape):
-    shape_type = identify_shape(shape)
-    dimensions = calculate_dimensions(shape)
-    return {
-        "type": shape_type,
-        "area": shape.area,
-        "perimeter": shape.length,
-        **dimensions
-    }
-
-def process_mesh(file_path, output_json):
-    mesh = trimesh.load(file_path)
+    # Valid, counter-clockwise polygons for all contours in one vectorized pass
+    return list(contour_polygons(contours))
+
+PLANES = ("XY Plane", "XZ Plane", "YZ Plane")
+
+def extract_shape_table(file_path, feature_size=None, method="raster"):
+    """
+    Extract the 2D shapes of the three axis projections as one columnar table.
+
+    Parameters:
+        file_path: Mesh path, upload bytes or trimesh.Trimesh.
+        feature_size (float): Smallest feature the raster should resolve.
+        method (str): "raster" contours (pixel units), exact "vector"
+            silhouettes (model units) or labeled mask "regions" (pixel units).
+
+    Returns:
+        pd.DataFrame: A plane column followed by the shape_table columns (or
+        the region_table columns for "regions"), one row per shape.
+    """
+    mesh = file_path if isinstance(file_path, trimesh.Trimesh) else load_trimesh(file_path)
     xy_plane, xz_plane, yz_plane = project_to_2d_planes(mesh)
 
-    xy_contours = extract_contours(xy_plane)
-    xz_contours = extract_contours(xz_plane)
-    yz_contours = extract_contours(yz_plane)
+    if method == "regions":
+        # Label each projection mask once; no contours are traced or polygons built
+        tables = [
+            region_table(rasterize_triangles(plane_points, mesh.faces, raster_grid(plane_points, feature_size=feature_size)))
+            for plane_points in (xy_plane, xz_plane, yz_plane)
+        ]
+        return pd.concat(tables, keys=PLANES, names=["plane", None]).reset_index(level=0).reset_index(drop=True)
+
+    if method == "vector":
+        # Exact polygons in model units, the three planes computed concurrently
+        plane_shapes = plane_silhouettes([xy_plane, xz_plane, yz_plane], mesh.faces)
+    else:
+        plane_shapes = [
+            analyze_contours(extract_contours(plane_points, faces=mesh.faces, feature_size=feature_size))
+            for plane_points in (xy_plane, xz_plane, yz_plane)
+        ]
 
-    xy_shapes = analyze_contours(xy_contours)
-    xz_shapes = analyze_contours(xz_contours)
-    yz_shapes = analyze_contours(yz_contours)
+    # Every shape of every plane is described in the same vectorized calls
+    shapes = [shape for shapes in plane_shapes for shape in shapes]
+    table = shape_table(shapes)
+    table.insert(0, "plane", np.repeat(PLANES, [len(shapes) for shapes in plane_shapes]))
+    return table
 
-    # Save shapes to a JSON file
-    features = {
-        "XY Plane": [get_shape_properties(shape) for shape in xy_shapes],
-        "XZ Plane": [get_shape_properties(shape) for shape in xz_shapes],
-        "YZ Plane": [get_shape_properties(shape) for shape in yz_shapes]
-    }
+def shapes_from_table(table):
+    # Rebuild the per-plane JSON features (shape_records) from a shape table
+    return {plane: shape_records(table[table["plane"] == plane]) for plane in PLANES}
+
+def extract_shapes(file_path, feature_size=None, method="raster"):
+    return shapes_from_table(extract_shape_table(file_path, feature_size, method))
 
+def extract_sections(file_path, normal=SECTION_NORMAL, offsets=None, count=SECTION_COUNT):
+    """
+    Cut the mesh with parallel planes and describe the shapes of every cross-section.
+
+    Parameters:
+        file_path: Mesh path, upload bytes or trimesh.Trimesh.
+        normal (tuple): Slicing direction; the table is in model units.
+        offsets (list): Plane positions along the normal. By default count
+            evenly spaced offsets inside the mesh extent are used.
+        count (int): Number of sections when no offsets are given.
+
+    Returns:
+        pd.DataFrame: One row per section polygon with its offset, its index
+        within the section and the shape_table columns.
+    """
+    mesh = file_path if isinstance(file_path, trimesh.Trimesh) else load_trimesh(file_path)
+    if offsets is None:
+        offsets = slice_offsets(mesh.vertices, normal, count)
+    offsets = [float(offset) for offset in offsets]
+
+    # All sections in one vectorized pass over the faces
+    sections = slice_mesh(mesh.vertices, mesh.faces, normal, offsets)
+
+    table = shape_table([shape for shapes in sections for shape in shapes])
+    table.insert(0, "offset", np.repeat(offsets, [len(shapes) for shapes in sections]))
+    table.insert(1, "shape", [index for shapes in sections for index in range(len(shapes))])
+    return table
+
+def process_sections(file_path, output_csv, cache=None, normal=SECTION_NORMAL, offsets=None, count=SECTION_COUNT):
+    normal = tuple(float(value) for value in normal)
+    offsets = None if offsets is None else tuple(float(offset) for offset in offsets)
+    if cache is not None:
+        sections = cache.run("extract_sections", extract_sections, file_path, normal, offsets, count,
+                             version=SECTIONS_CACHE_VERSION)
+    else:
+        sections = extract_sections(file_path, normal, offsets, count)
+
+    # Save the per-height shape table
+    sections.to_csv(output_csv, index=False)
+    print(f"Cross-section shapes saved to {output_csv}")
+    return sections
+
+def process_mesh(file_path, output_json, cache=None, feature_size=None, method="raster"):
+    if cache is not None:
+        # The cache keeps the columnar table; the JSON features are rebuilt from it
+        table = cache.run("extract_shapes", extract_shape_table, file_path, feature_size, method,
+                          version=SHAPES_CACHE_VERSION)
+    else:
+        table = extract_shape_table(file_path, feature_size, method)
+    features = shapes_from_table(table)
+
+    # Save the shape table next to the JSON file
+    table.to_csv(os.path.splitext(output_json)[0] + ".csv", index=False)
+
+    # Save shapes to a JSON file
     with open(output_json, 'w') as json_file:
         json.dump(features, json_file, indent=4)
         
     print(f"Extracted shapes saved to {output_json}")
+    return features
 
 if __name__ == "__main__":
     model_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\STLs\custom-shared.stl'
     output_json_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model_pipeline\output\statistics\extracted_shapes.json'
-    process_mesh(model_path, output_json_path)
+    # --vector extracts exact polygons in millimetres instead of raster contours in pixels;
+    # --regions measures labeled mask regions (with hole counts) instead of tracing contours
+    method = "vector" if "--vector" in sys.argv else "regions" if "--regions" in sys.argv else "raster"
+    if "--sections" in sys.argv:
+        # Cross-sections along Z, e.g. shaft diameters of the axis-*-digits parts
+        output_csv_path = os.path.join(os.path.dirname(output_json_path), "section_shapes.csv")
+        print(process_sections(model_path, output_csv_path, cache=default_cache()).to_string(index=False))
+    else:
+        process_mesh(model_path, output_json_path, cache=default_cache(), method=method)
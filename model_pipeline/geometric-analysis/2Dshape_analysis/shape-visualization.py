@@ -1,9 +1,14 @@
-import trimesh
-import numpy as np
-from shapely.geometry import Polygon
-from shapely.geometry.polygon import orient
-from skimage import measure
 import json
+import os
+import sys
+
+# Reuse the shared loaders that live in model_pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from stl_reader import load_trimesh
+from triangle_raster import raster_grid, rasterize_triangles, trace_contours
+from vector_silhouette import plane_silhouettes
+from polygon_table import contour_polygons, shape_table, shape_records
+from shape_backprojection import PLANE_AXES, backproject_shapes, lift_outline
 import matplotlib.pyplot as plt
 
 def project_to_2d_planes(mesh):
@@ -13,123 +18,58 @@ def project_to_2d_planes(mesh):
     yz_plane = vertices[:, 1:]
     return xy_plane, xz_plane, yz_plane
 
-def extract_contours(plane_points, img_size=1000):
-    min_vals = plane_points.min(axis=0)
-    max_vals = plane_points.max(axis=0)
-    scale = (img_size - 1) / (max_vals - min_vals)
-    offset = min_vals * scale
-    scaled_points = (plane_points * scale - offset).astype(int)
-    
-    img = np.zeros((img_size, img_size), dtype=np.uint8)
-    x, y = scaled_points.T
-    valid = (x >= 0) & (x < img_size) & (y >= 0) & (y < img_size)
-    img[x[valid], y[valid]] = 1
+def extract_contours(plane_points, img_size=1000, faces=None, feature_size=None, return_grid=False):
+    # Choose square pixels from the projection extent, capped at img_size along the longer side;
+    # the same grid (raster_grid) maps the pixel contours back to plane coordinates
+    grid = raster_grid(plane_points, img_size=img_size, feature_size=feature_size)
+
+    # Fill the projected triangles (or only the vertices when no faces are given) into a bit-packed mask
+    mask = rasterize_triangles(plane_points, faces, grid)
 
-    contours = measure.find_contours(img, level=0.5)
+    # Trace contours only around the tiles the silhouette passes through
+    contours = trace_contours(mask)
+    if return_grid:
+        # The grid maps the pixel contours back onto the plane (see shape_backprojection)
+        return contours, grid
     return contours
 
 def analyze_contours(contours):
-    shapes = []
-    for contour in contours:
-        if len(contour) < 3:
-            continue
-        poly = Polygon(contour)
-        if poly.is_valid:
-            shapes.append(orient(poly))
-    return shapes
-
-def identify_shape(shape):
-    if shape.is_empty:
-        return "No shape detected"
-
-    exterior_coords = list(shape.exterior.coords)
-    num_coords = len(exterior_coords)
-    
-    if num_coords == 3:
-        return "Triangle"
-    elif num_coords == 4:
-        area = shape.area
-        length = shape.length
-        if abs(area - length ** 2) < 1e-5:
-            return "Square"
-        else:
-            return "Rectangle"
-    elif num_coords > 4:
-        area = shape.area
-        perimeter = shape.length
-        if perimeter ** 2 / (4 * np.pi * area) > 0.8:
-            return "Circle"
-        return "Polygon"
-    return "Unknown shape"
-
-def calculate_dimensions(shape):
-    dimensions = {}
-    coords = np.array(shape.exterior.coords)
-    
-    if len(coords) == 3:
-        a = np.linalg.norm(coords[0] - coords[1])
-        b = np.linalg.norm(coords[1] - coords[2])
-        c = np.linalg.norm(coords[2] - coords[0])
-        dimensions = {
-            "side_1": a,
-            "side_2": b,
-            "side_3": c,
-            "height": min(a, b, c),
-            "base": max(a, b, c)
-        }
-    elif len(coords) == 4:
-        length = np.linalg.norm(coords[0] - coords[1])
-        width = np.linalg.norm(coords[1] - coords[2])
-        dimensions = {
-            "length": length,
-            "width": width
-        }
-    else:
-        perimeter = shape.length
-        area = shape.area
-        radius = np.sqrt(area / np.pi)
-        diameter = 2 * radius
-        dimensions = {
-            "radius": radius,
-            "diameter": diameter
-        }
-    
-    return dimensions
-
-def get_shape_properties(shape):
-    shape_type = identify_shape(shape)
-    dimensions = calculate_dimensions(shape)
-    return {
-        "type": shape_type,
-        "area": shape.area,
-        "perimeter": shape.length,
-        **dimensions
-    }
+    # Valid, counter-clockwise polygons for all contours in one vectorized pass
+    return list(contour_polygons(contours))
 
-def process_mesh(file_path, output_json):
-    mesh = trimesh.load(file_path)
+def process_mesh(file_path, output_json, feature_size=None, method="raster"):
+    mesh = load_trimesh(file_path)
     xy_plane, xz_plane, yz_plane = project_to_2d_planes(mesh)
 
-    xy_contours = extract_contours(xy_plane)
-    xz_contours = extract_contours(xz_plane)
-    yz_contours = extract_contours(yz_plane)
+    if method == "vector":
+        # Exact polygons in model units, the three planes computed concurrently
+        xy_shapes, xz_shapes, yz_shapes = plane_silhouettes([xy_plane, xz_plane, yz_plane], mesh.faces)
+        grids = None
+    else:
+        xy_contours, xy_grid = extract_contours(xy_plane, faces=mesh.faces, feature_size=feature_size, return_grid=True)
+        xz_contours, xz_grid = extract_contours(xz_plane, faces=mesh.faces, feature_size=feature_size, return_grid=True)
+        yz_contours, yz_grid = extract_contours(yz_plane, faces=mesh.faces, feature_size=feature_size, return_grid=True)
+        grids = (xy_grid, xz_grid, yz_grid)
 
-    xy_shapes = analyze_contours(xy_contours)
-    xz_shapes = analyze_contours(xz_contours)
-    yz_shapes = analyze_contours(yz_contours)
+        xy_shapes = analyze_contours(xy_contours)
+        xz_shapes = analyze_contours(xz_contours)
+        yz_shapes = analyze_contours(yz_contours)
 
+    # Type, area, perimeter and dimension records, computed for all shapes at once
     features = {
-        "XY Plane": [get_shape_properties(shape) for shape in xy_shapes],
-        "XZ Plane": [get_shape_properties(shape) for shape in xz_shapes],
-        "YZ Plane": [get_shape_properties(shape) for shape in yz_shapes]
+        "XY Plane": shape_records(shape_table(xy_shapes)),
+        "XZ Plane": shape_records(shape_table(xz_shapes)),
+        "YZ Plane": shape_records(shape_table(yz_shapes))
     }
 
     with open(output_json, 'w') as json_file:
         json.dump(features, json_file, indent=4)
 
-    visualize_shapes_on_model(mesh, xy_shapes, xz_shapes, yz_shapes)
+    visualize_shapes_on_model(mesh, xy_shapes, xz_shapes, yz_shapes, grids)
 
-def visualize_shapes_on_model(mesh, xy_shapes, xz_shapes, yz_shapes):
+def visualize_shapes_on_model(mesh, xy_shapes, xz_shapes, yz_shapes, grids=None):
+    # grids holds the RasterGrid of each plane for raster contours (pixel coordinates);
+    # without it the shapes are taken to be in model units already
     fig = plt.figure()
     ax = fig.add_subplot(111, projection='3d')
     
@@ -137,19 +77,24 @@ def visualize_shapes_on_model(mesh, xy_shapes, xz_shapes, yz_shapes):
     ax.plot_trisurf(mesh.vertices[:, 0], mesh.vertices[:, 1], mesh.vertices[:, 2], triangles=mesh.faces, color='lightgrey', alpha=0.5)
 
     # Function to plot 3D shapes on the model
-    def plot_shapes(shapes, z_offset=0, color='red'):
-        for shape in shapes:
-            coords = np.array(shape.exterior.coords)
-            ax.plot(coords[:, 0], coords[:, 1], zs=z_offset, color=color, lw=2)
+    def plot_shapes(shapes, plane, grid=None, color='red'):
+        # Match each shape to the faces it came from and draw it at the near side of their 3D extent
+        axes = PLANE_AXES[plane]
+        for match in backproject_shapes(shapes, mesh.vertices, mesh.faces, axes, grid=grid):
+            points = lift_outline(match, axes)
+            ax.plot(points[:, 0], points[:, 1], points[:, 2], color=color, lw=2)
 
     # Plot the identified shapes on the 3D model
-    plot_shapes(xy_shapes, z_offset=0, color='red')  # XY plane shapes
-    plot_shapes(xz_shapes, z_offset=0, color='green')  # XZ plane shapes
-    plot_shapes(yz_shapes, z_offset=0, color='blue')  # YZ plane shapes
+    xy_grid, xz_grid, yz_grid = grids if grids is not None else (None, None, None)
+    plot_shapes(xy_shapes, "XY Plane", xy_grid, color='red')  # XY plane shapes
+    plot_shapes(xz_shapes, "XZ Plane", xz_grid, color='green')  # XZ plane shapes
+    plot_shapes(yz_shapes, "YZ Plane", yz_grid, color='blue')  # YZ plane shapes
 
     plt.show()
 
 if __name__ == "__main__":
     model_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\STLs\custom-shared.stl'
     output_json_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model_pipeline\output\statistics\extracted_shapes.json'
-    process_mesh(model_path, output_json_path)
+    # --vector extracts exact polygons in millimetres instead of raster contours in pixels
+    method = "vector" if "--vector" in sys.argv else "raster"
+    process_mesh(model_path, output_json_path, method=method)
@@ -1,8 +1,21 @@
 import numpy as np
-import trimesh
 import json
+import os
+import sys
+from functools import partial
+
+# Reuse the shared loaders that live in model_pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from stl_reader import load_trimesh
+from mesh_cache import default_cache
+from batch_classification import classify_faces, classify_shapes
+from mesh_segmentation import segment_mesh
+from primitive_fitting import SAMPLE_COUNT, mesh_primitives, primitive_records
 import open3d as o3d
 
+# Version of the cached primitives; bump it when the sampling or the fitting changes
+PRIMITIVES_CACHE_VERSION = 2
+
 def is_cylinder(vertices, threshold=0.1):
     bounds = np.ptp(vertices, axis=0)
     height = bounds[2]
@@ -12,13 +25,13 @@ def is_cylinder(vertices, threshold=0.1):
 def is_rectangle(vertices, threshold=0.1):
     if len(vertices) != 4:
         return False
-    edges = np.linalg.norm(np.diff(vertices, axis=0), axis=1)
+    edges = np.linalg.norm(np.roll(vertices, -1, axis=0) - vertices, axis=1)
     return np.allclose(edges[0], edges[2], rtol=threshold) and np.allclose(edges[1], edges[3], rtol=threshold)
 
 def is_square(vertices, threshold=0.1):
     if not is_rectangle(vertices, threshold):
         return False
-    edges = np.linalg.norm(np.diff(vertices, axis=0), axis=1)
+    edges = np.linalg.norm(np.roll(vertices, -1, axis=0) - vertices, axis=1)
     return np.allclose(edges[0], edges[1], rtol=threshold)
 
 def is_circle(vertices, threshold=0.1):
@@ -27,62 +40,73 @@ def is_circle(vertices, threshold=0.1):
     return np.allclose(distances, distances[0], rtol=threshold)
 
 def refine_shapes(shapes, vertices, faces):
-    refined_shapes = []
-
-    for shape in shapes:
-        face_indices = shape['faces']
-        face_vertices = vertices[np.unique(faces[face_indices])]
-
-        if is_cylinder(face_vertices):
-            refined_shapes.append({
-                'shape': 'cylinder',
-                'vertices': face_vertices.tolist(),
-                'dimensions': {'height': np.ptp(face_vertices[:, 2]), 'radius': np.mean(np.ptp(face_vertices[:, :2], axis=0))}
-            })
-        elif is_square(face_vertices):
-            refined_shapes.append({
-                'shape': 'square',
-                'vertices': face_vertices.tolist(),
-                'dimensions': {'side_length': np.ptp(face_vertices[:, 0])}
-            })
-        elif is_rectangle(face_vertices):
-            refined_shapes.append({
-                'shape': 'rectangle',
-                'vertices': face_vertices.tolist(),
-                'dimensions': {'width': np.ptp(face_vertices[:, 0]), 'height': np.ptp(face_vertices[:, 1])}
-            })
-        elif is_circle(face_vertices):
-            refined_shapes.append({
-                'shape': 'circle',
-                'vertices': face_vertices.tolist(),
-                'dimensions': {'radius': np.mean(np.linalg.norm(face_vertices - np.mean(face_vertices, axis=0), axis=1))}
-            })
-        else:
-            refined_shapes.append({
-                'shape': 'triangle',
-                'vertices': face_vertices.tolist()
-            })
-
-    return refined_shapes
+    # Classify all shapes in one vectorized pass; the result is a lazy ShapeTable
+    # that yields the same shape dictionaries as the former per-shape loop
+    return classify_shapes(vertices, faces, shapes)
 
-def process_mesh(file_path):
-    mesh = trimesh.load(file_path)
+def process_mesh(file_path, cache=None, per_face=False):
+    mesh = load_trimesh(file_path)
     vertices = mesh.vertices
     faces = mesh.faces
     print(f"Loaded mesh with {len(vertices)} vertices and {len(faces)} faces")
 
-    shapes = [{'faces': [i]} for i in range(len(faces))]
-    shapes = refine_shapes(shapes, vertices, faces)
+    if per_face:
+        # Every face is its own shape; classify them all at once
+        if cache is not None:
+            shapes = cache.run("classify_faces", classify_faces, vertices, faces)
+        else:
+            shapes = classify_faces(vertices, faces)
+    else:
+        # Group connected triangles into surface patches and classify the patches
+        if cache is not None:
+            patches = cache.run("segment_mesh", segment_mesh, vertices, faces)
+        else:
+            patches = segment_mesh(vertices, faces)
+        print(f"Grouped faces into {len(patches)} surface patches")
+        shapes = refine_shapes(patches, vertices, faces)
     
     
     return shapes
 
+def detect_primitives(file_path, count=SAMPLE_COUNT, seed=0, workers=None):
+    """
+    Fit planes, cylinders, spheres and cones to surface samples of a mesh file.
+
+    Parameters:
+        file_path (str): Path to the STL file.
+        count (int): Number of surface samples.
+        seed (int): Seed of the sampling and the RANSAC.
+        workers (int): Threads scoring the RANSAC hypotheses; all cores by default.
+
+    Returns:
+        list: JSON-ready primitive dictionaries with their parameters and inlier faces.
+    """
+    return primitive_records(mesh_primitives(load_trimesh(file_path), count, seed, workers=workers))
+
+def process_primitives(file_path, output_path, cache=None, count=SAMPLE_COUNT, seed=0, workers=None):
+    if cache is not None:
+        # The thread count does not change the primitives, so it stays out of the cache key
+        primitives = cache.run("fit_primitives", partial(detect_primitives, workers=workers), file_path, count, seed,
+                               version=PRIMITIVES_CACHE_VERSION)
+    else:
+        primitives = detect_primitives(file_path, count, seed, workers)
+
+    with open(output_path, 'w') as json_file:
+        json.dump(primitives, json_file, indent=4)
+    print(f"{len(primitives)} primitives saved to {output_path}")
+    return primitives
+
 if __name__ == "__main__":
     model_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\modified-models\axis-2-digits-normalized-mesh.stl'
-    shapes = process_mesh(model_path)
+    if "--primitives" in sys.argv:
+        primitives_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model_pipeline\output\statistics\primitives.json'
+        process_primitives(model_path, primitives_path, cache=default_cache())
+        sys.exit(0)
+
+    shapes = process_mesh(model_path, cache=default_cache())
     output_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model_pipeline\output\statistics\classified_shapes.json'
 
     with open(output_path, 'w') as json_file:
-        json.dump(shapes, json_file, indent=4)
+        json.dump(shapes.to_list(), json_file, indent=4)
 
     print(f"Classified shapes saved to {output_path}")
@@ -1,16 +1,17 @@
 import plotly.graph_objects as go
-import numpy as np
-import trimesh
+import os
+import sys
+
+# Reuse the shared loaders that live in model_pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from stl_reader import load_trimesh
+from face_geometry import mesh_face_geometry
+from plotly_annotations import centroid_trace
 
 def load_mesh(model_path):
-    mesh = trimesh.load(model_path)
+    mesh = load_trimesh(model_path)
     return mesh
 
-def calculate_edge_lengths(vertices, face):
-    face_vertices = vertices[face]
-    edge_lengths = [np.linalg.norm(face_vertices[i] - face_vertices[(i+1) % len(face_vertices)]) for i in range(len(face_vertices))]
-    return edge_lengths
-
 def visualize_mesh_with_annotations(model_path):
     mesh = load_mesh(model_path)
     points = mesh.vertices
@@ -28,35 +29,10 @@ def visualize_mesh_with_annotations(model_path):
         colorscale='Blues'
     )
 
-    # Create annotations
-    annotations = []
-    for face in faces:
-        face_vertices = points[face]
-        edge_lengths = calculate_edge_lengths(points, face)
-        centroid = face_vertices.mean(axis=0)
-        annotation_text = ", ".join(f"Edge {i+1}: {length:.2f}" for i, length in enumerate(edge_lengths))
-        
-        annotations.append(dict(
-            x=centroid[0],
-            y=centroid[1],
-            z=centroid[2],
-            text=annotation_text,
-            showarrow=True,
-            arrowhead=2
-        ))
-
-    # Create the figure
-    fig = go.Figure(data=[mesh3d])
-    for annotation in annotations:
-        fig.add_trace(go.Scatter3d(
-            x=[annotation['x']],
-            y=[annotation['y']],
-            z=[annotation['z']],
-            mode='markers+text',
-            marker=dict(size=4),
-            text=[annotation['text']],
-            textposition='top center'
-        ))
+    # Annotate every face centroid in a single trace; the edge lengths are
+    # shown on hover from customdata instead of one text trace per face
+    geometry = mesh_face_geometry(mesh)
+    fig = go.Figure(data=[mesh3d, centroid_trace(geometry)])
 
     fig.update_layout(scene=dict(
         xaxis_title='X',
@@ -1,20 +1,26 @@
 import pyvista as pv
 import numpy as np
-import trimesh
+import os
+import sys
+
+# Reuse the shared loaders that live in model_pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from stl_reader import load_trimesh
+from face_geometry import mesh_face_geometry
 
 def load_mesh(model_path):
-    mesh = trimesh.load(model_path)
+    mesh = load_trimesh(model_path)
     return mesh
 
-def calculate_edge_lengths(vertices, face):
-    face_vertices = vertices[face]
-    edge_lengths = [np.linalg.norm(face_vertices[i] - face_vertices[(i+1) % len(face_vertices)]) for i in range(len(face_vertices))]
-    return edge_lengths
+def calculate_edge_lengths(geometry, face_index):
+    # Edge lengths come from the shared per-face geometry of the mesh
+    return geometry.edge_lengths[face_index].tolist()
 
 def visualize_mesh_with_annotations(model_path):
     mesh = load_mesh(model_path)
     points = mesh.vertices
     faces = mesh.faces.reshape(-1, 3)  # Ensure faces are correctly shaped
+    geometry = mesh_face_geometry(mesh)
 
     # PyVista expects faces to be formatted as [n, v0, v1, ..., vn, n, v0, v1, ..., vn, ...]
     # Where n is the number of points in the face
@@ -34,8 +40,7 @@ def visualize_mesh_with_annotations(model_path):
             plotter.remove_actor(annotation)  # Remove the previous annotation
         if idx < 0:
             return
-        face = faces[idx]
-        edge_lengths = calculate_edge_lengths(points, face)
+        edge_lengths = calculate_edge_lengths(geometry, idx)
         annotation_text = ", ".join(f"Edge {i+1}: {length:.2f}" for i, length in enumerate(edge_lengths))
         annotation = plotter.add_text(annotation_text, position='lower_left', font_size=10, color='black')
         plotter.render()
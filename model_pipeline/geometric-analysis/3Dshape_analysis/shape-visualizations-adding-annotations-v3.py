@@ -1,51 +1,27 @@
 import plotly.graph_objects as go
-import numpy as np
-import trimesh
+import os
+import sys
+
+# Reuse the shared loaders that live in model_pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from stl_reader import load_trimesh
+from face_geometry import mesh_face_geometry
+from plotly_annotations import centroid_trace, edge_trace
 
 def load_mesh(model_path):
-    mesh = trimesh.load(model_path)
+    mesh = load_trimesh(model_path)
     return mesh
 
-def calculate_edge_lengths(vertices, face):
-    face_vertices = vertices[face]
-    edge_lengths = [np.linalg.norm(face_vertices[i] - face_vertices[(i+1) % len(face_vertices)]) for i in range(len(face_vertices))]
-    return edge_lengths
-
 def visualize_mesh_with_annotations(model_path):
     mesh = load_mesh(model_path)
     points = mesh.vertices
     faces = mesh.faces
 
-    # Create a Plotly scatter3d trace for edges
-    edge_lines = []
-    for face in faces:
-        face_vertices = points[face]
-        for i in range(len(face_vertices)):
-            start = face_vertices[i]
-            end = face_vertices[(i + 1) % len(face_vertices)]
-            edge_lines.append([start, end])
-
-    # Convert edge lines to separate x, y, z lists for plotting
-    edge_x = []
-    edge_y = []
-    edge_z = []
-    for line in edge_lines:
-        edge_x.extend([line[0][0], line[1][0], None])
-        edge_y.extend([line[0][1], line[1][1], None])
-        edge_z.extend([line[0][2], line[1][2], None])
-
     # Create the figure
     fig = go.Figure()
 
-    # Add edges as scatter3d with black lines for sketch appearance
-    fig.add_trace(go.Scatter3d(
-        x=edge_x,
-        y=edge_y,
-        z=edge_z,
-        mode='lines',
-        line=dict(color='black', width=2),
-        showlegend=False
-    ))
+    # Add all edges as one NaN-separated black line trace for sketch appearance
+    fig.add_trace(edge_trace(points, faces, color='black', width=2))
 
     # Add points for vertices (optional)
     fig.add_trace(go.Scatter3d(
@@ -57,35 +33,8 @@ def visualize_mesh_with_annotations(model_path):
         showlegend=False
     ))
 
-    # Create annotations
-    annotations = []
-    for i, face in enumerate(faces):
-        face_vertices = points[face]
-        edge_lengths = calculate_edge_lengths(points, face)
-        centroid = face_vertices.mean(axis=0)
-        annotation_text = ", ".join(f"Edge {i+1}: {length:.2f}" for i, length in enumerate(edge_lengths))
-        
-        annotations.append(dict(
-            x=centroid[0],
-            y=centroid[1],
-            z=centroid[2],
-            text=annotation_text,
-            showarrow=True,
-            arrowhead=2,
-            arrowcolor='black'
-        ))
-
-    # Add annotations to the figure
-    for annotation in annotations:
-        fig.add_trace(go.Scatter3d(
-            x=[annotation['x']],
-            y=[annotation['y']],
-            z=[annotation['z']],
-            mode='markers+text',
-            marker=dict(size=4, color='black'),
-            text=[annotation['text']],
-            textposition='top center'
-        ))
+    # Annotate every face centroid in a single trace, edge lengths on hover
+    fig.add_trace(centroid_trace(mesh_face_geometry(mesh), color='black'))
 
     # Update layout
     fig.update_layout(scene=dict(
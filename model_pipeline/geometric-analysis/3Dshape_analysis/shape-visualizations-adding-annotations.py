@@ -1,20 +1,16 @@
 import plotly.graph_objects as go
-import numpy as np
-import trimesh
+import os
+import sys
+
+# Reuse the shared loaders that live in model_pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from stl_reader import load_trimesh
+from face_geometry import mesh_face_geometry
 
 def load_mesh(model_path):
-    mesh = trimesh.load(model_path)
+    mesh = load_trimesh(model_path)
     return mesh
 
-def calculate_face_dimensions(vertices, face):
-    face_vertices = vertices[face]
-    edges = [np.linalg.norm(face_vertices[i] - face_vertices[(i+1) % len(face_vertices)]) for i in range(len(face_vertices))]
-    dimensions = {
-        'width': edges[0],
-        'height': edges[1] if len(edges) > 1 else edges[0],
-    }
-    return dimensions
-
 def create_hover_template(face_dimensions):
     return f"Width: {face_dimensions['width']:.2f}<br>Height: {face_dimensions['height']:.2f}"
 
@@ -24,19 +20,11 @@ def visualize_mesh_with_face_annotations(model_path):
     faces = mesh.faces
 
     # Create face dimension annotations
-    face_x = []
-    face_y = []
-    face_z = []
-    face_texts = []
-
-    for face in faces:
-        face_vertices = points[face]
-        dimensions = calculate_face_dimensions(points, face)
-        centroid = face_vertices.mean(axis=0)
-        face_x.append(centroid[0])
-        face_y.append(centroid[1])
-        face_z.append(centroid[2])
-        face_texts.append(create_hover_template(dimensions))
+    geometry = mesh_face_geometry(mesh)
+    face_texts = [
+        create_hover_template({'width': width, 'height': height})
+        for width, height in geometry.edge_lengths[:, :2].tolist()
+    ]
 
     # Generate a color array for the points (e.g., a gradient based on z-coordinate)
     colors = points[:, 2]  # Example: color based on the z-coordinate
@@ -3,57 +3,56 @@ import numpy as np
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d.art3d import Line3DCollection
 import matplotlib.colors as mcolors
+import os
+import sys
+
+# Reuse the shared loaders that live in model_pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from stl_reader import load_open3d
+from point_sampling import SEED, sample_mesh
+from circle_features import detect_circles
+from sketch_drawing import key_dimensions, mesh_sketch, plot_sketch, sketch_svg
 
 
 
 def load_model(file_path):
     # Load the model using Open3D
-    mesh = o3d.io.read_triangle_mesh(file_path)
+    mesh = load_open3d(file_path)
     return mesh
 
-def create_hand_drawn_effect(mesh, output_image_path):
-    vertices = np.asarray(mesh.vertices)
-    faces = np.asarray(mesh.triangles)
-
-    fig = plt.figure()
-    ax = fig.add_subplot(111, projection='3d')
-
-    for face in faces:
-        for i in range(3):
-            start = vertices[face[i]]
-            end = vertices[face[(i + 1) % 3]]
-            line = np.vstack([start, end])
-            ax.plot(line[:, 0], line[:, 1], line[:, 2], c='k', linestyle='--')
-
-    ax.set_xlabel('X axis')
-    ax.set_ylabel('Y axis')
-    ax.set_zlabel('Z axis')
+def create_hand_drawn_effect(mesh, output_image_path, svg_path=None, show_hidden=True, show=True):
+    # Feature edges only, split into visible and dashed hidden runs, in one line collection,
+    # with the key dimensions labelled
+    drawing = mesh_sketch(mesh)
+    plot_sketch(drawing, show_hidden=show_hidden)
     plt.savefig(output_image_path)
-    plt.show()
+    if svg_path is not None:
+        sketch_svg(drawing, svg_path, show_hidden=show_hidden)
+    # Batch jobs pass show=False so nothing waits for a window
+    if show:
+        plt.show()
+    return drawing
 
 
 def draw_dimensions(vertices, faces, ax):
-    for face in faces:
-        for i in range(3):
-            start = vertices[face[i]]
-            end = vertices[face[(i + 1) % 3]]
-            mid_point = (start + end) / 2
-            ax.text(mid_point[0], mid_point[1], mid_point[2], f'{np.linalg.norm(end - start):.2f}', color='red')
-
-def create_point_cloud_from_mesh(mesh, density=10000):
+    # Label the overall extents and the distinct hole and boss diameters, not every edge
+    for label in key_dimensions(vertices, detect_circles(vertices, faces)):
+        ax.text(*label['position'], label['text'], color='red')
+
+def create_point_cloud_from_mesh(mesh, density=10000, method="area", seed=SEED):
     """
     Create a point cloud from a mesh by sampling points from its surface.
     
     Parameters:
         mesh (trimesh.Trimesh): The input mesh.
         density (int): Number of points to sample from the mesh surface.
+        method (str): "area" (uniform random), "poisson" (evenly spread) or "voxel" sampling.
+        seed (int): Seed of the sampling, so the same mesh always gives the same cloud.
         
     Returns:
         numpy.ndarray: Array of sampled points.
     """
-    # Sample points from the mesh surface
-    points, _ = mesh.sample(density)
-    return points
+    return sample_mesh(mesh, method, count=density, seed=seed).points
 
 def visualize_point_cloud(points):
     """
@@ -82,7 +81,8 @@ if __name__ == "__main__":
     
     
     hand_drawn_image_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model_pipeline\output\images\axis-3-digits-hand-drawn.png'
-    create_hand_drawn_effect(mesh, hand_drawn_image_path)
+    drawing = create_hand_drawn_effect(mesh, hand_drawn_image_path)
+    print(f"Sketch: {len(drawing)} edge runs drawn, {int(drawing.hidden.sum())} hidden")
 
 
 
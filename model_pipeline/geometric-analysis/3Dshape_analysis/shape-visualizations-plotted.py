@@ -1,30 +1,44 @@
 import numpy as np
-import trimesh
 import open3d as o3d
+import os
+import sys
 
-def create_point_cloud_from_mesh(mesh, density=10000):
+# Reuse the shared loaders that live in model_pipeline
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+from stl_reader import load_trimesh
+from point_sampling import SEED, sample_mesh
+from mesh_thumbnails import save_points_png
+
+def create_point_cloud_from_mesh(mesh, density=10000, method="area", seed=SEED):
     """
-    Create a point cloud from a mesh by sampling points from its surface using trimesh.
+    Create a point cloud from a mesh by sampling points from its surface.
     
     Parameters:
         mesh (trimesh.Trimesh): The input mesh.
         density (int): Number of points to sample from the mesh surface.
+        method (str): "area" (uniform random), "poisson" (evenly spread) or "voxel" sampling.
+        seed (int): Seed of the sampling, so the same mesh always gives the same cloud.
         
     Returns:
         numpy.ndarray: Array of sampled points.
     """
-    # Sample points from the mesh surface using trimesh
-    points = mesh.sample(density)
-    return points
+    return sample_mesh(mesh, method, count=density, seed=seed).points
 
-def visualize_point_cloud(points, image_path):
+def visualize_point_cloud(points, image_path, show=True):
     """
-    Visualize a point cloud with red dots using Open3D and save the visualization as an image.
+    Save an off-screen rendering of a point cloud with red dots and optionally open it in Open3D.
     
     Parameters:
         points (numpy.ndarray): Array of points to visualize.
         image_path (str): Path to save the image.
+        show (bool): Open the interactive Open3D viewer after saving; batch jobs pass False.
     """
+    # The image is rendered in software, so saving works without a display
+    save_points_png(points, image_path)
+    print(f"Point cloud visualization saved to {image_path}")
+    if not show:
+        return
+
     # Create an Open3D point cloud object
     pcd = o3d.geometry.PointCloud()
     pcd.points = o3d.utility.Vector3dVector(points)
@@ -42,13 +56,7 @@ def visualize_point_cloud(points, image_path):
     render_option = vis.get_render_option()
     render_option.point_size = 5
     
-    # Capture the screenshot
-    vis.poll_events()
-    vis.update_renderer()
-    vis.capture_screen_image(image_path)
-    print(f"Point cloud visualization saved to {image_path}")
-    
-    # Run the visualizer and save the image
+    # Run the visualizer
     vis.run()
     vis.destroy_window()
 
@@ -57,7 +65,7 @@ if __name__ == "__main__":
     model_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\STLs\custom-shared.stl'
     image_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\images\axis-3-digits-point-cloud.png'
     # Load the mesh
-    mesh = trimesh.load(model_path)
+    mesh = load_trimesh(model_path)
 
     # Create a point cloud from the mesh
     point_cloud = create_point_cloud_from_mesh(mesh, density=10000)
@@ -1,10 +1,10 @@
 # load_model.py loads a 3D CAD model from an STL file and displays it in a 3D viewer using the open3d library. This script can be used to quickly visualize 3D models and inspect their geometry. The load_and_display_model function takes the path to the STL file as input, loads the model, and displays it in a 3D viewer.
-import open3d as o3d
+from stl_reader import load_open3d
 
 
 def load_and_display_model(model_path):
     # Load the STL model
-    mesh = o3d.io.read_triangle_mesh(model_path)
+    mesh = load_open3d(model_path)
     
     # Check if the mesh is loaded successfully
     if not mesh.has_vertices():
@@ -0,0 +1,70 @@
+# mask_regions.py measures the shapes of a projection mask by labeling it once. Connected regions are found with skimage.measure.label and every measure (area, perimeter, bounding box, equivalent diameter, eccentricity, solidity and Euler number) comes from a single regionprops_table call, so no contour is traced and no polygon is built. The regions are classified with rules in the spirit of the polygon shape types, and the result has the same type and dimension columns as polygon_table.shape_table, so shape_records turns it into the usual JSON records.
+import math
+
+import numpy as np
+import pandas as pd
+from skimage import measure
+
+from triangle_raster import unpack_mask
+
+# Filled fraction of the bounding box above which a region counts as an axis-aligned rectangle
+RECTANGLE_EXTENT = 0.95
+# Relative difference of the bounding box sides below which a rectangle is a square
+SQUARE_TOLERANCE = 0.05
+# Minimum circularity (4*pi*area / perimeter**2) and maximum eccentricity of a circle
+CIRCLE_CIRCULARITY = 0.85
+CIRCLE_ECCENTRICITY = 0.5
+
+REGION_PROPERTIES = (
+    "label", "area", "area_filled", "perimeter", "bbox",
+    "equivalent_diameter_area", "eccentricity", "solidity", "euler_number",
+)
+
+
+def region_table(mask, connectivity=2):
+    """
+    Label a mask and measure all of its regions in one pass.
+
+    Parameters:
+        mask (np.ndarray): 2D boolean mask, or a bit-packed mask from rasterize_triangles.
+        connectivity (int): 1 for 4-connected, 2 for 8-connected regions.
+
+    Returns:
+        pd.DataFrame: One row per region, largest first, with label, area,
+        perimeter, bbox_row_min/bbox_col_min/bbox_row_max/bbox_col_max,
+        equivalent_diameter, eccentricity, solidity, euler_number, holes,
+        circularity, type and the length/width or radius/diameter dimension
+        columns (NaN where they do not apply). All values are in pixels.
+    """
+    if mask.dtype == np.uint8:
+        mask = unpack_mask(mask)
+    labels = measure.label(mask, connectivity=connectivity)
+    table = pd.DataFrame(measure.regionprops_table(labels, properties=REGION_PROPERTIES))
+    table = table.rename(columns={
+        "bbox-0": "bbox_row_min", "bbox-1": "bbox_col_min", "bbox-2": "bbox_row_max", "bbox-3": "bbox_col_max",
+        "equivalent_diameter_area": "equivalent_diameter",
+    })
+
+    area = table["area"].to_numpy(dtype=np.float64)
+    perimeter = table["perimeter"].to_numpy(dtype=np.float64)
+    rows = (table["bbox_row_max"] - table["bbox_row_min"]).to_numpy(dtype=np.float64)
+    cols = (table["bbox_col_max"] - table["bbox_col_min"]).to_numpy(dtype=np.float64)
+
+    # A region's Euler number is 1 minus its number of holes
+    table["holes"] = 1 - table["euler_number"]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        table["circularity"] = 4 * math.pi * area / perimeter ** 2
+        extent = table["area_filled"].to_numpy(dtype=np.float64) / (rows * cols)
+
+    rectangle = extent >= RECTANGLE_EXTENT
+    square = rectangle & (np.abs(rows - cols) <= SQUARE_TOLERANCE * np.maximum(rows, cols))
+    circle = ~rectangle & (table["circularity"] >= CIRCLE_CIRCULARITY) & (table["eccentricity"] <= CIRCLE_ECCENTRICITY)
+    table["type"] = np.select([square, rectangle, circle], ["Square", "Rectangle", "Circle"], default="Polygon")
+
+    table["length"] = np.where(rectangle, np.maximum(rows, cols), np.nan)
+    table["width"] = np.where(rectangle, np.minimum(rows, cols), np.nan)
+    table["radius"] = np.where(rectangle, np.nan, table["equivalent_diameter"] / 2)
+    table["diameter"] = np.where(rectangle, np.nan, table["equivalent_diameter"])
+
+    table = table.drop(columns="area_filled")
+    return table.sort_values("area", ascending=False, kind="stable").reset_index(drop=True)
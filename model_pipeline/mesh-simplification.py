@@ -1,7 +1,11 @@
-# mesh_simplification.py simplifies a mesh by reducing the number of triangles in the mesh. The simplified mesh is saved as an STL file and displayed in a 3D viewer. The mesh simplification is done using the Quadric Edge Collapse Decimation algorithm. The target number of triangles in the simplified mesh is set to 1000 in this example. You can adjust this value based on your requirements.
+# mesh_simplification.py simplifies a mesh by reducing the number of triangles in the mesh. The simplified mesh is saved as an STL file and displayed in a 3D viewer. The mesh simplification is done using the Quadric Edge Collapse Decimation algorithm. The target number of triangles in the simplified mesh is set to 1000 in this example. You can adjust this value based on your requirements, or pass --max-error to pick the coarsest level of the cached LOD pyramid whose Hausdorff error stays below a tolerance.
 import open3d as o3d
 from load_view_model import load_and_display_model
+from stl_reader import load_open3d
+from mesh_cache import default_cache
+from mesh_lod import coarsest_mesh, mesh_lod_pyramid, to_open3d
 import os
+import sys
 
 def simplify_mesh(mesh, target_number_of_triangles=1000):
     simplified_mesh = mesh.simplify_quadric_decimation(target_number_of_triangles)
@@ -13,6 +17,20 @@ def simplify_mesh(mesh, target_number_of_triangles=1000):
 
     return simplified_mesh
 
+def simplify_to_error(mesh, max_error, cache=None):
+    """
+    Simplify a mesh as far as possible while its Hausdorff error stays below max_error.
+
+    Parameters:
+        mesh (open3d.geometry.TriangleMesh): The input mesh.
+        max_error (float): Largest accepted deviation from the original, in model units.
+        cache (MeshCache): Cache holding the mesh's LOD pyramid, built on first use.
+
+    Returns:
+        open3d.geometry.TriangleMesh: The coarsest pyramid level within max_error.
+    """
+    return coarsest_mesh(mesh, max_error, cache)
+
 if __name__ == "__main__":
     model_path = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\STLs\custom-shared.stl'
     output_dir = r'C:\Users\BezylMophatOtieno\source\repos\FreeCAD-models\combination-lock\model-pipeline\output\modified-models'
@@ -21,9 +39,20 @@ if __name__ == "__main__":
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
 
-    mesh = o3d.io.read_triangle_mesh(model_path)
+    mesh = load_open3d(model_path)
     mesh.compute_vertex_normals()
-    simplified_mesh = simplify_mesh(mesh)
+    cache = default_cache()
+    if "--max-error" in sys.argv:
+        max_error = float(sys.argv[sys.argv.index("--max-error") + 1])
+        pyramid = mesh_lod_pyramid(mesh, cache)
+        for level, triangles, error, mean_error in pyramid.summary():
+            print(f"Level {level}: {triangles} triangles, Hausdorff error {error:.4g} (mean {mean_error:.4g})")
+        level = pyramid.coarsest(max_error)
+        print(f"Using {level['triangles']} triangles (Hausdorff error {level['error']:.4g} <= {max_error})")
+        simplified_mesh = to_open3d(level)
+    else:
+        simplified_mesh = cache.run("simplify_mesh", simplify_mesh, mesh)
+    print(f"Cache hits: {cache.hits}, misses: {cache.misses}")
     
     # Save the simplified mesh as an STL file
     o3d.io.write_triangle_mesh(output_path, simplified_mesh)
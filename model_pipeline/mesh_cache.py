@@ -0,0 +1,279 @@
+# mesh_cache.py is a content-addressed result cache for the mesh processing stages. Results are keyed by the SHA-256 of the mesh content plus the stage name, the stage version and its parameters, so identical parts (such as the ten wheel-digit STLs) and previously seen geometry are served from local disk instead of being recomputed. Stages bump their version when their algorithm or result format changes, which retires the entries computed by older code. The cache is bounded in size and evicts the least recently used entries first, and it keeps hit/miss counters for reporting.
+import hashlib
+import os
+import pickle
+import tempfile
+
+import numpy as np
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "MESH_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "output", "cache"),
+)
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+ENTRY_SUFFIX = ".pkl"
+_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path):
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as source_file:
+        for chunk in iter(lambda: source_file.read(_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_bytes(data):
+    """Return the SHA-256 hex digest of a bytes-like object."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _update_digest(digest, value):
+    """Feed a stage argument into a running hash, by value."""
+    if isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        digest.update(f"ndarray:{array.dtype.str}:{array.shape}:".encode())
+        digest.update(array.data)
+    elif isinstance(value, (bytes, bytearray, memoryview)):
+        digest.update(b"bytes:")
+        digest.update(value)
+    elif isinstance(value, dict):
+        digest.update(f"dict:{len(value)}:".encode())
+        for key in sorted(value, key=repr):
+            _update_digest(digest, key)
+            _update_digest(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        digest.update(f"{type(value).__name__}:{len(value)}:".encode())
+        for item in value:
+            _update_digest(digest, item)
+    elif hasattr(value, "vertices") and (hasattr(value, "faces") or hasattr(value, "triangles")):
+        # trimesh.Trimesh or open3d.geometry.TriangleMesh: hash the geometry itself
+        faces = value.faces if hasattr(value, "faces") else value.triangles
+        digest.update(b"mesh:")
+        _update_digest(digest, np.asarray(value.vertices))
+        _update_digest(digest, np.asarray(faces))
+    else:
+        digest.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def mesh_digest(mesh):
+    """
+    Return the content hash of a mesh source.
+
+    Parameters:
+        mesh: Path to a mesh file, its raw bytes, a trimesh/Open3D mesh or an array.
+
+    Returns:
+        str: SHA-256 hex digest of the mesh content. Paths are hashed by the
+        bytes of the file, not by name, so copies of the same part share a digest.
+    """
+    if isinstance(mesh, (str, os.PathLike)) and os.path.isfile(mesh):
+        return hash_file(mesh)
+    if isinstance(mesh, (bytes, bytearray, memoryview)):
+        return hash_bytes(mesh)
+    digest = hashlib.sha256()
+    _update_digest(digest, mesh)
+    return digest.hexdigest()
+
+
+def stage_key(stage, mesh_hash, *args, version=1, **kwargs):
+    """Build the cache key of a stage from its name and version, the mesh hash and the stage parameters."""
+    digest = hashlib.sha256()
+    digest.update(f"{stage}:v{version}:{mesh_hash}:".encode())
+    _update_digest(digest, args)
+    _update_digest(digest, kwargs)
+    return digest.hexdigest()
+
+
+def _encode(value):
+    """Convert mesh objects to plain arrays so cache entries do not depend on pickling support."""
+    module = type(value).__module__
+    if module.startswith("trimesh") and hasattr(value, "faces"):
+        return ("trimesh", np.asarray(value.vertices), np.asarray(value.faces))
+    if module.startswith("open3d") and hasattr(value, "triangles"):
+        return ("open3d", np.asarray(value.vertices), np.asarray(value.triangles))
+    return ("pickle", value)
+
+
+def _decode(entry):
+    """Rebuild a value stored by _encode."""
+    kind = entry[0]
+    if kind == "trimesh":
+        import trimesh
+        return trimesh.Trimesh(vertices=entry[1], faces=entry[2], process=False)
+    if kind == "open3d":
+        import open3d as o3d
+        mesh = o3d.geometry.TriangleMesh(
+            o3d.utility.Vector3dVector(entry[1]),
+            o3d.utility.Vector3iVector(entry[2]),
+        )
+        mesh.compute_vertex_normals()
+        return mesh
+    return entry[1]
+
+
+class MeshCache:
+    """
+    On-disk, size-bounded LRU cache of stage results keyed by mesh content.
+
+    Entries are pickled files named after their key. Reading an entry refreshes
+    its modification time, and when the total size exceeds max_bytes the
+    entries with the oldest modification time are evicted first. Several
+    processes may share the same directory.
+
+    Parameters:
+        cache_dir (str): Directory holding the cache entries.
+        max_bytes (int): Size limit of the cache directory.
+    """
+
+    def __init__(self, cache_dir=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.stage_counts = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ENTRY_SUFFIX)
+
+    def _count(self, stage, outcome):
+        counts = self.stage_counts.setdefault(stage, {"hits": 0, "misses": 0})
+        counts[outcome] += 1
+
+    def get(self, key, default=None):
+        """Return the cached value for a key, or default when it is missing."""
+        path = self._entry_path(key)
+        try:
+            with open(path, 'rb') as entry_file:
+                entry = pickle.load(entry_file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return default
+        # Mark the entry as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return _decode(entry)
+
+    def put(self, key, value):
+        """Store a value under a key and evict old entries if the cache is over its limit."""
+        path = self._entry_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Write to a temporary file first so readers never see a partial entry
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as entry_file:
+                pickle.dump(_encode(value), entry_file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+        self.stores += 1
+        self.evict()
+
+    def run(self, stage, func, mesh, *args, version=1, **kwargs):
+        """
+        Run a stage through the cache.
+
+        Parameters:
+            stage (str): Stage name, part of the cache key.
+            func (callable): Stage function, called as func(mesh, *args, **kwargs) on a miss.
+            mesh: Mesh source hashed by content (path, bytes, mesh object or arrays).
+            *args, **kwargs: Stage parameters, hashed by value.
+            version (int): Version of the stage's algorithm and result format, part of
+                the cache key; bump it whenever either changes.
+
+        Returns:
+            The cached or freshly computed stage result.
+        """
+        key = stage_key(stage, mesh_digest(mesh), *args, version=version, **kwargs)
+        missing = object()
+        result = self.get(key, missing)
+        if result is not missing:
+            self.hits += 1
+            self._count(stage, "hits")
+            return result
+
+        self.misses += 1
+        self._count(stage, "misses")
+        result = func(mesh, *args, **kwargs)
+        self.put(key, result)
+        return result
+
+    def _entries(self):
+        """Return (mtime, size, path) for every entry in the cache directory."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(ENTRY_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((info.st_mtime, info.st_size, path))
+        return entries
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits within max_bytes."""
+        entries = self._entries()
+        total = sum(size for _, size, _ in entries)
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        """Remove every entry from the cache."""
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns:
+            dict: hits, misses, hit_rate, stores, evictions, entries, size_bytes
+            and per-stage hit/miss counts.
+        """
+        entries = self._entries()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "entries": len(entries),
+            "size_bytes": sum(size for _, size, _ in entries),
+            "stages": {stage: dict(counts) for stage, counts in self.stage_counts.items()},
+        }
+
+
+_default_cache = None
+
+
+def default_cache():
+    """Return the process-wide MeshCache using DEFAULT_CACHE_DIR."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = MeshCache()
+    return _default_cache
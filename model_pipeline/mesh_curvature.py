@@ -0,0 +1,186 @@
+# mesh_curvature.py computes discrete mean and Gaussian curvature of a triangle mesh. Mean curvature comes from the cotangent Laplacian, built as a SciPy sparse matrix, and Gaussian curvature from the angle defect at each vertex. Both are normalised by the mixed Voronoi area of Meyer et al. ("Discrete Differential-Geometry Operators for Triangulated 2-Manifolds"). Everything is vectorized over faces, so the 30,000-face wheel meshes take a few tens of milliseconds. Per-vertex values are averaged onto faces for face colouring.
+import numpy as np
+import scipy.sparse as sp
+
+
+def corner_cotangents(vertices, faces):
+    """
+    Compute the interior angle cotangents and doubled areas of every face.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+
+    Returns:
+        tuple: (cotangents, double_areas, squared_lengths) where cotangents[f, i]
+        is the cotangent of the angle at corner i of face f, double_areas[f] is
+        twice the area of face f and squared_lengths[f, i] is the squared length
+        of the edge opposite corner i. Degenerate faces get zero cotangents.
+    """
+    triangles = vertices[faces]
+    # Edge opposite each corner: e0 = v2 - v1, e1 = v0 - v2, e2 = v1 - v0
+    edges = np.roll(triangles, -1, axis=1) - np.roll(triangles, 1, axis=1)
+    squared_lengths = np.einsum('fij,fij->fi', edges, edges)
+
+    double_areas = np.linalg.norm(np.cross(edges[:, 0], edges[:, 1]), axis=1)
+
+    # cot(angle i) = (|a|^2 + |b|^2 - |opposite|^2) / (4 * area) for the two edges a, b at corner i
+    cotangents = np.zeros(faces.shape, dtype=np.float64)
+    valid = double_areas > 0
+    total = squared_lengths.sum(axis=1, keepdims=True)
+    cotangents[valid] = (total[valid] - 2 * squared_lengths[valid]) / (2 * double_areas[valid, None])
+    return cotangents, double_areas, squared_lengths
+
+
+def cotangent_laplacian(vertices, faces, cotangents=None):
+    """
+    Build the sparse cotangent Laplacian of a mesh.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        cotangents (np.ndarray): Optional (F, 3) output of corner_cotangents.
+
+    Returns:
+        scipy.sparse.csr_matrix: (V, V) matrix L with L[i, j] = (cot a + cot b) / 2
+        for every edge (i, j) and rows summing to zero, so (L @ X)[i] is
+        sum_j w_ij (x_j - x_i).
+    """
+    if cotangents is None:
+        cotangents = corner_cotangents(vertices, faces)[0]
+
+    # The cotangent at corner i weighs the edge between the other two corners
+    rows = np.roll(faces, -1, axis=1).ravel()
+    cols = np.roll(faces, 1, axis=1).ravel()
+    weights = cotangents.ravel() / 2
+
+    count = len(vertices)
+    off_diagonal = sp.coo_matrix(
+        (np.concatenate([weights, weights]), (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+        shape=(count, count),
+    ).tocsr()
+    diagonal = sp.diags(np.asarray(off_diagonal.sum(axis=1)).ravel())
+    return off_diagonal - diagonal
+
+
+def mixed_voronoi_areas(faces, count, cotangents, double_areas, squared_lengths):
+    """
+    Compute the mixed Voronoi area of every vertex.
+
+    Non-obtuse faces contribute the Voronoi region of each corner. Obtuse faces
+    contribute half of their area to the obtuse corner and a quarter to the others.
+
+    Parameters:
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        count (int): Number of vertices.
+        cotangents, double_areas, squared_lengths: Output of corner_cotangents.
+
+    Returns:
+        np.ndarray: (V,) area per vertex.
+    """
+    areas = double_areas / 2
+
+    # Voronoi area of corner i: (|e_j|^2 cot j + |e_k|^2 cot k) / 8 over the other two corners
+    weighted = squared_lengths * cotangents
+    voronoi = (np.roll(weighted, -1, axis=1) + np.roll(weighted, 1, axis=1)) / 8
+
+    obtuse_corner = cotangents < 0
+    obtuse_face = np.any(obtuse_corner, axis=1)
+    corner_areas = np.where(
+        obtuse_face[:, None],
+        np.where(obtuse_corner, areas[:, None] / 2, areas[:, None] / 4),
+        voronoi,
+    )
+    return np.bincount(faces.ravel(), weights=corner_areas.ravel(), minlength=count)
+
+
+def vertex_normals(vertices, faces):
+    """Return area-weighted unit vertex normals."""
+    triangles = vertices[faces]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    summed = np.column_stack([
+        np.bincount(faces.ravel(), weights=np.repeat(normals[:, axis], 3), minlength=len(vertices))
+        for axis in range(3)
+    ])
+    lengths = np.linalg.norm(summed, axis=1)
+    valid = lengths > 0
+    summed[valid] /= lengths[valid, None]
+    return summed
+
+
+def boundary_vertices(faces, count):
+    """Return a (V,) boolean mask of vertices on an open boundary edge."""
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1).astype(np.int64)
+    # One integer key per undirected edge is much faster to count than rows
+    keys, edge_counts = np.unique(edges[:, 0] * count + edges[:, 1], return_counts=True)
+    open_keys = keys[edge_counts == 1]
+    mask = np.zeros(count, dtype=bool)
+    mask[open_keys // count] = True
+    mask[open_keys % count] = True
+    return mask
+
+
+def vertex_curvatures(vertices, faces):
+    """
+    Compute discrete mean and Gaussian curvature at every vertex.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+
+    Returns:
+        tuple: (mean, gaussian) arrays of shape (V,). Mean curvature is signed,
+        positive where the surface bends away from its outward normal (1/r on a
+        sphere of radius r); Gaussian curvature is 1/r^2 on a sphere. Vertices
+        without area (unreferenced or only in degenerate faces) get zero.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    count = len(vertices)
+
+    cotangents, double_areas, squared_lengths = corner_cotangents(vertices, faces)
+    areas = mixed_voronoi_areas(faces, count, cotangents, double_areas, squared_lengths)
+    has_area = areas > 0
+
+    # Mean curvature normal: K = -(L @ X) / A = 2 H n
+    laplacian = cotangent_laplacian(vertices, faces, cotangents)
+    curvature_normals = laplacian @ vertices
+    projected = -np.einsum('ij,ij->i', curvature_normals, vertex_normals(vertices, faces))
+    mean = np.zeros(count)
+    mean[has_area] = projected[has_area] / (2 * areas[has_area])
+
+    # Gaussian curvature: angle defect over area (pi instead of 2 pi on boundaries)
+    angles = np.arctan2(double_areas[:, None], cotangents * double_areas[:, None])
+    angles[double_areas == 0] = 0
+    angle_sums = np.bincount(faces.ravel(), weights=angles.ravel(), minlength=count)
+    full_angle = np.where(boundary_vertices(faces, count), np.pi, 2 * np.pi)
+    gaussian = np.zeros(count)
+    gaussian[has_area] = (full_angle[has_area] - angle_sums[has_area]) / areas[has_area]
+
+    return mean, gaussian
+
+
+def face_values(vertex_values, faces):
+    """Average a per-vertex quantity over the three corners of every face."""
+    return np.asarray(vertex_values)[np.asarray(faces)].mean(axis=1)
+
+
+def mesh_curvatures(vertices, faces):
+    """
+    Compute per-vertex and per-face mean and Gaussian curvature.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+
+    Returns:
+        dict: 'vertex_mean' and 'vertex_gaussian' of shape (V,), 'face_mean' and
+        'face_gaussian' of shape (F,).
+    """
+    mean, gaussian = vertex_curvatures(vertices, faces)
+    return {
+        "vertex_mean": mean,
+        "vertex_gaussian": gaussian,
+        "face_mean": face_values(mean, faces),
+        "face_gaussian": face_values(gaussian, faces),
+    }
@@ -0,0 +1,351 @@
+# mesh_lod.py builds a level-of-detail pyramid of a mesh with quadric edge collapse decimation. Each level keeps a fixed fraction of the triangles of the previous one, and its Hausdorff error against the original surface is measured both ways as exact distances from seeded surface samples of one mesh to the triangles of the other. The pyramid is computed once per mesh content and stored in the mesh cache, so viewers and analyses can ask for the coarsest level whose error stays below a tolerance and get it without decimating again.
+import math
+from itertools import chain
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from face_geometry import FaceGeometry
+from point_sampling import area_weighted_samples
+
+# Triangle budget of each level relative to the previous one
+LOD_RATIO = 0.25
+# Levels stop once the budget drops below this many triangles
+MIN_LOD_TRIANGLES = 100
+# Surface samples per mesh used to measure the error of a level
+ERROR_SAMPLES = 20000
+# Candidate triangles per point found through the centroid KD-tree of a TriangleIndex
+NEAREST_CENTROIDS = 8
+# Slivers are split for a TriangleIndex down to this edge length, relative to the model extent,
+# or until their longest edge is at most SLIVER_RATIO * sqrt(area)
+INDEX_EDGE_FRACTION = 0.01
+SLIVER_RATIO = 4.0
+# Cache stage of the pyramid; bump the version whenever the levels or their errors change
+CACHE_STAGE = "lod_pyramid"
+CACHE_VERSION = 1
+
+
+def mesh_arrays(mesh):
+    """Return the (vertices, faces) arrays of a trimesh or Open3D mesh."""
+    faces = mesh.faces if hasattr(mesh, "faces") else mesh.triangles
+    return np.asarray(mesh.vertices, dtype=np.float64), np.asarray(faces, dtype=np.int64)
+
+
+def decimate(vertices, faces, target_number_of_triangles):
+    """
+    Simplify a mesh with Open3D's quadric edge collapse decimation.
+
+    Returns:
+        tuple: (vertices, faces) of the simplified mesh.
+    """
+    # Open3D is only needed to build the pyramid, not to read it
+    import open3d as o3d
+    mesh = o3d.geometry.TriangleMesh(o3d.utility.Vector3dVector(vertices), o3d.utility.Vector3iVector(faces))
+    simplified = mesh.simplify_quadric_decimation(int(target_number_of_triangles))
+    return mesh_arrays(simplified)
+
+
+def lod_budgets(face_count, ratio=LOD_RATIO, min_triangles=MIN_LOD_TRIANGLES):
+    """Return the geometric series of triangle budgets below face_count, largest first."""
+    budgets = []
+    budget = face_count * ratio
+    while budget >= min_triangles:
+        budgets.append(int(budget))
+        budget *= ratio
+    return budgets
+
+
+def point_triangle_distances(points, corners):
+    """
+    Return the distance of every point to its own triangle.
+
+    Parameters:
+        points (np.ndarray): (N, 3) points.
+        corners (np.ndarray): (N, 3, 3) triangle corners, one triangle per point.
+
+    Returns:
+        np.ndarray: (N,) exact Euclidean distances.
+    """
+    a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+    normal = np.cross(b - a, c - a)
+    length = np.linalg.norm(normal, axis=1)
+    valid = length > 0
+    unit = normal / np.where(valid, length, 1.0)[:, None]
+    height = ((points - a) * unit).sum(axis=1)
+    projected = points - height[:, None] * unit
+
+    # The projection lies inside when it is on the inner side of all three edges
+    inside = valid.copy()
+    for start, end in ((a, b), (b, c), (c, a)):
+        inside &= (np.cross(end - start, projected - start) * normal).sum(axis=1) >= 0
+
+    # Otherwise the nearest point lies on one of the edges
+    nearest_edge = np.full(len(points), np.inf)
+    for start, end in ((a, b), (b, c), (c, a)):
+        direction = end - start
+        squared = (direction * direction).sum(axis=1)
+        t = np.clip(((points - start) * direction).sum(axis=1) / np.where(squared > 0, squared, 1.0), 0, 1)
+        nearest_edge = np.minimum(nearest_edge, np.linalg.norm(points - start - t[:, None] * direction, axis=1))
+    return np.where(inside, np.abs(height), nearest_edge)
+
+
+def split_slivers(corners, max_edge, ratio=SLIVER_RATIO):
+    """
+    Cut sliver triangles into short pieces.
+
+    A triangle is a sliver when its longest edge exceeds both max_edge and
+    ratio * sqrt(area). Each sliver is cut at the foot of its altitude onto
+    the longest edge into two right triangles, and each of those is cut into
+    strips no longer than max_edge along its long leg. The pieces cover
+    exactly the same surface, so distances to them are distances to the
+    original triangles.
+
+    Parameters:
+        corners (np.ndarray): (F, 3, 3) triangle corners.
+        max_edge (float): Edge length below which triangles are never cut.
+        ratio (float): Largest longest-edge / sqrt(area) ratio left uncut.
+
+    Returns:
+        np.ndarray: (G, 3, 3) corners of the pieces.
+    """
+    lengths = np.linalg.norm(np.roll(corners, -1, axis=1) - corners, axis=2)
+    longest = lengths.argmax(axis=1)
+    longest_length = lengths[np.arange(len(corners)), longest]
+    area = np.linalg.norm(np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0]), axis=1) / 2
+    sliver = (longest_length > max_edge) & (longest_length > ratio * np.sqrt(area))
+    if not sliver.any():
+        return corners
+
+    # Longest edge A-B, opposite corner C and the foot F of the altitude from C, which
+    # lies on A-B because the angles at both ends of the longest edge are at most 90 degrees
+    order = (np.arange(3) + longest[sliver, None]) % 3
+    a, b, c = np.moveaxis(np.take_along_axis(corners[sliver], order[:, :, None], axis=1), 1, 0)
+    direction = b - a
+    t = ((c - a) * direction).sum(axis=1) / (direction * direction).sum(axis=1)
+    foot = a + np.clip(t, 0, 1)[:, None] * direction
+
+    # Right triangles (apex, foot, C): strips run from the apex along apex-foot and apex-C
+    apex = np.concatenate([a, b])
+    foot, top = np.concatenate([foot, foot]), np.concatenate([c, c])
+    strips = np.maximum(np.ceil(np.linalg.norm(foot - apex, axis=1) / max_edge), 1).astype(np.int64)
+    owner = np.repeat(np.arange(len(apex)), strips)
+    index = np.arange(int(strips.sum())) - np.repeat(np.cumsum(strips) - strips, strips)
+    near, far = (index / strips[owner])[:, None], ((index + 1) / strips[owner])[:, None]
+    leg, hypotenuse = foot[owner] - apex[owner], top[owner] - apex[owner]
+    base = apex[owner]
+    pieces = np.concatenate([
+        np.stack([base + near * leg, base + far * leg, base + far * hypotenuse], axis=1),
+        np.stack([base + near * leg, base + far * hypotenuse, base + near * hypotenuse], axis=1),
+    ])
+    return np.concatenate([corners[~sliver], pieces])
+
+
+class TriangleIndex:
+    """
+    Exact distances from points to the surface of a triangle mesh.
+
+    Slivers are cut (see split_slivers), and the pieces are grouped by
+    reach, the distance from the centroid to the farthest corner, in powers of
+    two. The NEAREST_CENTROIDS nearest centroids of a point give an upper
+    bound on its distance. In every group, a piece that could still be closer
+    has its centroid within that bound plus the group's reach, so one ball
+    query per group finds all of them. Only a few triangles can have a large
+    reach without being slivers, so the wide queries stay small.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+    """
+
+    def __init__(self, vertices, faces):
+        vertices = np.asarray(vertices, dtype=np.float64)
+        corners = vertices[np.asarray(faces, dtype=np.int64)]
+        extent = float(np.ptp(vertices, axis=0).max()) if len(vertices) else 0.0
+        self.corners = split_slivers(corners, INDEX_EDGE_FRACTION * extent) if len(corners) else corners
+        centroids = self.corners.mean(axis=1)
+        reach = np.linalg.norm(self.corners - centroids[:, None], axis=2).max(axis=1)
+        self.tree = cKDTree(centroids)
+
+        # (pieces, reach, tree) per group of similar reach
+        levels = np.floor(np.log2(np.maximum(reach, 1e-300))).astype(np.int64)
+        self.groups = []
+        for level in np.unique(levels):
+            pieces = np.flatnonzero(levels == level)
+            self.groups.append((pieces, float(reach[pieces].max()), cKDTree(centroids[pieces])))
+        self.reach = max((group_reach for _, group_reach, _ in self.groups), default=0.0)
+
+    def distances(self, points):
+        """Return the (N,) distance of every point to the nearest triangle."""
+        points = np.asarray(points, dtype=np.float64)
+        count = len(self.corners)
+        if not count:
+            return np.full(len(points), np.inf)
+        k = min(NEAREST_CENTROIDS, count)
+        centroid_distances, nearest = self.tree.query(points, k=k)
+        centroid_distances, nearest = centroid_distances.reshape(len(points), -1), nearest.reshape(len(points), -1)
+        best = point_triangle_distances(np.repeat(points, k, axis=0), self.corners[nearest.ravel()])
+        best = best.reshape(len(points), k).min(axis=1)
+        if k == count:
+            return best
+
+        # Only points whose k-th centroid is within best + reach can have a closer piece
+        unresolved = np.flatnonzero(centroid_distances[:, -1] <= best + self.reach)
+        bound = best[unresolved].copy()
+        # Groups of wide pieces are small and settle the points lying on large faces
+        # first, which keeps the balls in the crowded narrow groups tight
+        for pieces, group_reach, tree in reversed(self.groups):
+            if not len(unresolved):
+                break
+            found = tree.query_ball_point(points[unresolved], bound + group_reach)
+            sizes = np.fromiter((len(group) for group in found), dtype=np.int64, count=len(found))
+            if not sizes.sum():
+                continue
+            rows = np.repeat(np.arange(len(unresolved)), sizes)
+            candidates = pieces[np.fromiter(chain.from_iterable(found), dtype=np.int64, count=int(sizes.sum()))]
+            pair = point_triangle_distances(points[unresolved[rows]], self.corners[candidates])
+            np.minimum.at(bound, rows, pair)
+        best[unresolved] = bound
+        return best
+
+
+def hausdorff_error(samples, index, vertices, faces, count=ERROR_SAMPLES, seed=0):
+    """
+    Estimate the symmetric Hausdorff distance between a reference surface and a simplified one.
+
+    Samples of each surface are measured against the triangles of the other.
+    These are exact point-to-surface distances, so identical meshes give 0
+    and the estimate only misses deviations that fall between samples.
+
+    Parameters:
+        samples (np.ndarray): (N, 3) samples of the reference surface.
+        index (TriangleIndex): Triangles of the reference surface.
+        vertices (np.ndarray): (V, 3) vertices of the simplified mesh.
+        faces (np.ndarray): (F, 3) faces of the simplified mesh.
+        count (int): Samples drawn on the simplified mesh.
+        seed (int): Seed of that sampling.
+
+    Returns:
+        tuple: (max_error, mean_error) in model units.
+    """
+    if not len(faces):
+        return math.inf, math.inf
+    simplified = area_weighted_samples(FaceGeometry(vertices, faces), count, seed).points
+    to_reference = index.distances(simplified)
+    from_reference = TriangleIndex(vertices, faces).distances(samples)
+    distances = np.concatenate([to_reference, from_reference])
+    return float(distances.max()), float(distances.mean())
+
+
+class LODPyramid:
+    """
+    Simplified versions of one mesh with their measured errors.
+
+    Level 0 is the original mesh (error 0); every further level has about
+    LOD_RATIO times the triangles of the previous one.
+
+    Attributes:
+        levels (list): One dict per level with vertices, faces, triangles,
+            target (triangle budget), error (Hausdorff distance to the
+            original) and mean_error.
+    """
+
+    def __init__(self, levels):
+        self.levels = levels
+
+    def __len__(self):
+        return len(self.levels)
+
+    def __getitem__(self, index):
+        return self.levels[index]
+
+    def summary(self):
+        """Return (level, triangles, error, mean_error) rows for reporting."""
+        return [(index, level["triangles"], level["error"], level["mean_error"]) for index, level in enumerate(self.levels)]
+
+    def coarsest(self, max_error):
+        """
+        Return the level with the fewest triangles whose error is at most max_error.
+
+        Falls back to the original mesh (level 0) when no simplified level is
+        accurate enough.
+        """
+        within = [level for level in self.levels if level["error"] <= max_error]
+        return min(within, key=lambda level: level["triangles"]) if within else self.levels[0]
+
+
+def build_lod_pyramid(mesh, ratio=LOD_RATIO, min_triangles=MIN_LOD_TRIANGLES, samples=ERROR_SAMPLES, seed=0):
+    """
+    Decimate a mesh to a geometric series of triangle budgets and measure every level.
+
+    Each level is decimated from the previous one, which is much cheaper than
+    starting from the original every time; the error is always measured
+    against the original surface. The pyramid ends early when decimation to a
+    budget yields no triangles.
+
+    Parameters:
+        mesh: trimesh.Trimesh or open3d.geometry.TriangleMesh.
+        ratio (float): Triangle budget of each level relative to the previous one.
+        min_triangles (int): Smallest budget of a level.
+        samples (int): Surface samples per mesh for the error estimate.
+        seed (int): Seed of the sampling.
+
+    Returns:
+        LODPyramid: The levels, finest first.
+    """
+    vertices, faces = mesh_arrays(mesh)
+    reference = area_weighted_samples(FaceGeometry(vertices, faces), samples, seed).points
+    index = TriangleIndex(vertices, faces)
+    levels = [{"vertices": vertices, "faces": faces, "triangles": len(faces), "target": len(faces),
+               "error": 0.0, "mean_error": 0.0}]
+
+    level_vertices, level_faces = vertices, faces
+    for budget in lod_budgets(len(faces), ratio, min_triangles):
+        level_vertices, level_faces = decimate(level_vertices, level_faces, budget)
+        if not len(level_faces):
+            break
+        error, mean_error = hausdorff_error(reference, index, level_vertices, level_faces, samples, seed)
+        levels.append({"vertices": level_vertices, "faces": level_faces, "triangles": len(level_faces),
+                       "target": budget, "error": error, "mean_error": mean_error})
+
+    return LODPyramid(levels)
+
+
+def mesh_lod_pyramid(mesh, cache=None, **kwargs):
+    """
+    Return the LOD pyramid of a mesh, building it only once per mesh content.
+
+    Parameters:
+        mesh: Mesh source accepted by build_lod_pyramid.
+        cache (MeshCache): Cache to keep the pyramid in, or None to always build it.
+        **kwargs: Options of build_lod_pyramid.
+
+    Returns:
+        LODPyramid: The pyramid.
+    """
+    if cache is None:
+        return build_lod_pyramid(mesh, **kwargs)
+    return cache.run(CACHE_STAGE, build_lod_pyramid, mesh, version=CACHE_VERSION, **kwargs)
+
+
+def to_open3d(level):
+    """Build an Open3D mesh with vertex normals from a pyramid level."""
+    import open3d as o3d
+    mesh = o3d.geometry.TriangleMesh(o3d.utility.Vector3dVector(level["vertices"]),
+                                     o3d.utility.Vector3iVector(level["faces"]))
+    mesh.compute_vertex_normals()
+    return mesh
+
+
+def coarsest_mesh(mesh, max_error, cache=None):
+    """
+    Return the coarsest pyramid level of a mesh within max_error as an Open3D mesh.
+
+    Parameters:
+        mesh: trimesh.Trimesh or open3d.geometry.TriangleMesh.
+        max_error (float): Largest accepted Hausdorff distance in model units.
+        cache (MeshCache): Cache holding the pyramid.
+
+    Returns:
+        open3d.geometry.TriangleMesh: The simplified mesh.
+    """
+    return to_open3d(mesh_lod_pyramid(mesh, cache).coarsest(max_error))
@@ -1,9 +1,13 @@
 # normalize_model_trimesh.py normalizes a mesh by centering it and scaling it to fit within a unit cube. The normalized mesh is saved as an STL file and displayed in a 3D viewer. The mesh normalization is done using the trimesh library. The normalized mesh is centered at the origin and scaled to fit within a unit cube. This ensures that the mesh is in a consistent and standardized form for further processing or analysis.
-import trimesh
 import numpy as np
 import os
+from stl_reader import load_trimesh
+from mesh_cache import default_cache
 
 def normalize_mesh(mesh):
+    # Work on a copy so the input is left as it was, as it is when the result comes from the cache
+    mesh = mesh.copy()
+
     # Center the mesh
     mesh.apply_translation(-mesh.centroid)
     
@@ -23,10 +27,12 @@ if __name__ == "__main__":
     os.makedirs(output_dir, exist_ok=True)
 
     print("Loading mesh")
-    mesh = trimesh.load(model_path)
+    mesh = load_trimesh(model_path)
     print("Mesh loaded")
     
-    normalized_mesh = normalize_mesh(mesh)
+    cache = default_cache()
+    normalized_mesh = cache.run("normalize_mesh", normalize_mesh, mesh)
+    print(f"Cache hits: {cache.hits}, misses: {cache.misses}")
     
     # Save the normalized mesh as an STL file
     normalized_mesh.export(output_path, file_type='stl')
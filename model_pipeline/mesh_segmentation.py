@@ -0,0 +1,147 @@
+# mesh_segmentation.py groups the triangles of a mesh into surface patches before shape classification. Faces sharing an edge are merged with a vectorized union-find when they are coplanar or when the normal changes smoothly across the edge (below an angle threshold), so a flat side or a cylindrical wall becomes one patch instead of hundreds of triangle "shapes". The patches are returned in the {'faces': [...]} format that refine_shapes expects.
+import numpy as np
+
+# Maximum angle (degrees) between neighbouring face normals for a smooth join
+SMOOTH_ANGLE = 20.0
+# Maximum angle (degrees) for faces to count as coplanar, used for planar-only patches
+PLANAR_ANGLE = 0.5
+
+
+def face_normals(vertices, faces):
+    """Return unit normals of all faces (zero vectors for degenerate faces)."""
+    triangles = vertices[faces]
+    normals = np.cross(triangles[:, 1] - triangles[:, 0], triangles[:, 2] - triangles[:, 0])
+    lengths = np.linalg.norm(normals, axis=1)
+    valid = lengths > 0
+    normals[valid] /= lengths[valid, None]
+    return normals
+
+
+def face_adjacency(faces):
+    """
+    Find pairs of faces that share an edge.
+
+    Parameters:
+        faces (np.ndarray): (F, 3) vertex indices per face.
+
+    Returns:
+        np.ndarray: (E, 2) array of adjacent face index pairs. Non-manifold edges
+        shared by more than two faces link every consecutive pair of those faces.
+    """
+    faces = np.asarray(faces)
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    edge_faces = np.repeat(np.arange(len(faces)), 3)
+
+    # Sort edges so faces sharing an edge become neighbours in the list
+    order = np.lexsort((edges[:, 1], edges[:, 0]))
+    edges = edges[order]
+    edge_faces = edge_faces[order]
+    same = np.all(edges[1:] == edges[:-1], axis=1)
+
+    pairs = np.column_stack([edge_faces[:-1][same], edge_faces[1:][same]])
+    return pairs[pairs[:, 0] != pairs[:, 1]]
+
+
+def union_find(count, pairs):
+    """
+    Compute connected components of a graph with a vectorized union-find.
+
+    Every round hooks each root onto the smallest root among its neighbours and
+    then compresses paths by pointer jumping, so the number of Python-level
+    iterations grows with the logarithm of the component diameter, not with
+    the number of edges.
+
+    Parameters:
+        count (int): Number of nodes.
+        pairs (np.ndarray): (E, 2) array of node index pairs to join.
+
+    Returns:
+        np.ndarray: (count,) component label per node, numbered 0..K-1 in order
+        of each component's smallest node index.
+    """
+    parent = np.arange(count)
+    pairs = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+
+    while len(pairs):
+        roots_a = parent[pairs[:, 0]]
+        roots_b = parent[pairs[:, 1]]
+        active = roots_a != roots_b
+        if not np.any(active):
+            break
+        roots_a = roots_a[active]
+        roots_b = roots_b[active]
+        pairs = pairs[active]
+
+        # Hook the larger root under the smaller one
+        low = np.minimum(roots_a, roots_b)
+        high = np.maximum(roots_a, roots_b)
+        np.minimum.at(parent, high, low)
+
+        # Path compression by pointer jumping
+        while True:
+            grand = parent[parent]
+            if np.array_equal(grand, parent):
+                break
+            parent = grand
+
+    _, labels = np.unique(parent, return_inverse=True)
+    return labels.ravel()
+
+
+def segment_faces(vertices, faces, max_angle=SMOOTH_ANGLE):
+    """
+    Label every face with the surface patch it belongs to.
+
+    Two faces sharing an edge join the same patch when the angle between their
+    normals is at most max_angle. With max_angle=PLANAR_ANGLE only coplanar
+    faces are joined; the default SMOOTH_ANGLE also follows curved walls whose
+    tessellation turns by a few degrees per triangle.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        max_angle (float): Maximum normal angle in degrees across a joined edge.
+
+    Returns:
+        np.ndarray: (F,) patch label per face.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces)
+    normals = face_normals(vertices, faces)
+    pairs = face_adjacency(faces)
+
+    cosine = np.einsum('ij,ij->i', normals[pairs[:, 0]], normals[pairs[:, 1]])
+    joined = cosine >= np.cos(np.radians(max_angle))
+
+    return union_find(len(faces), pairs[joined])
+
+
+def patches_from_labels(labels):
+    """
+    Convert per-face patch labels into refine_shapes input.
+
+    Parameters:
+        labels (np.ndarray): (F,) patch label per face.
+
+    Returns:
+        list: One {'faces': [face indices]} dictionary per patch, ordered by label.
+    """
+    order = np.argsort(labels, kind='stable')
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    return [{'faces': group.tolist()} for group in np.split(order, boundaries)] if len(order) else []
+
+
+def segment_mesh(vertices, faces, max_angle=SMOOTH_ANGLE):
+    """
+    Group connected triangles into surface patches.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        max_angle (float): Maximum normal angle in degrees across a joined edge.
+
+    Returns:
+        list: One {'faces': [face indices]} dictionary per patch, ready for refine_shapes.
+    """
+    labels = segment_faces(vertices, faces, max_angle=max_angle)
+    return patches_from_labels(labels)
@@ -0,0 +1,173 @@
+# mesh_slicing.py cuts a mesh with a family of parallel planes and returns the cross-sections as Shapely polygons. All offsets are handled in one vectorized pass: the offsets are sorted and every face is paired only with the offsets between its lowest and highest vertex along the normal, found with a binary search. Crossing points are computed once per mesh edge and shared by both faces of the edge, so the section segments join exactly and are merged into closed rings.
+import numpy as np
+import shapely
+from shapely.geometry import Polygon
+from shapely.geometry.polygon import orient
+
+# In-plane axes for the coordinate normals, matching project_to_2d_planes
+AXIS_PLANES = {0: (1, 2), 1: (0, 2), 2: (0, 1)}
+
+
+def plane_basis(normal):
+    """
+    Return the unit normal and two in-plane axes for a slicing direction.
+
+    Coordinate normals use the remaining coordinate axes (e.g. X and Y for a Z
+    normal), so section coordinates are plain model coordinates.
+
+    Parameters:
+        normal (array-like): (3,) slicing direction.
+
+    Returns:
+        tuple: (normal, u, v) unit vectors.
+    """
+    normal = np.asarray(normal, dtype=np.float64)
+    normal = normal / np.linalg.norm(normal)
+    axis = int(np.argmax(np.abs(normal)))
+    if np.isclose(abs(normal[axis]), 1.0):
+        u, v = np.eye(3)[list(AXIS_PLANES[axis])]
+        return normal, u, v
+
+    helper = np.eye(3)[int(np.argmin(np.abs(normal)))]
+    u = np.cross(normal, helper)
+    u /= np.linalg.norm(u)
+    return normal, u, np.cross(normal, u)
+
+
+def slice_offsets(vertices, normal, count):
+    """
+    Return count evenly spaced offsets strictly inside the mesh extent along normal.
+
+    The first and last offsets sit half a step inside the extent, so no section
+    lies exactly on an end cap.
+    """
+    normal = plane_basis(normal)[0]
+    heights = np.asarray(vertices, dtype=np.float64) @ normal
+    low, high = heights.min(), heights.max()
+    return low + (np.arange(count) + 0.5) * (high - low) / count
+
+
+def section_segments(vertices, faces, normal, offsets):
+    """
+    Intersect every face with every plane it crosses.
+
+    A vertex exactly on a plane counts as lying above it, so each crossed face
+    contributes exactly two crossing edges and one segment.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        normal (array-like): (3,) slicing direction.
+        offsets (array-like): (N,) plane offsets along the normal.
+
+    Returns:
+        tuple: (slice_ids, segments) where slice_ids is (S,) indices into
+        offsets and segments is (S, 2, 2) segment end points in plane
+        coordinates.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    offsets = np.asarray(offsets, dtype=np.float64)
+    normal, u, v = plane_basis(normal)
+
+    heights = vertices @ normal
+    face_heights = heights[faces]
+
+    # Offsets each face spans, as a range into the sorted offsets
+    order = np.argsort(offsets)
+    sorted_offsets = offsets[order]
+    first = np.searchsorted(sorted_offsets, face_heights.min(axis=1), side='left')
+    last = np.searchsorted(sorted_offsets, face_heights.max(axis=1), side='right')
+    counts = np.maximum(last - first, 0)
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros((0, 2, 2))
+
+    owner = np.repeat(np.arange(len(faces)), counts)
+    rank = first[owner] + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    level = sorted_offsets[rank]
+
+    # Edges with a canonical direction (lower vertex index first), so both
+    # faces of an edge compute bit-identical crossing points
+    corners = faces[owner]
+    starts = corners
+    ends = np.roll(corners, -1, axis=1)
+    low = np.minimum(starts, ends)
+    high = np.maximum(starts, ends)
+    above_low = heights[low] >= level[:, None]
+    above_high = heights[high] >= level[:, None]
+    crossing = above_low != above_high
+
+    # Faces touching a plane at a single vertex or lying in it have no crossing edges
+    valid = crossing.sum(axis=1) == 2
+    low, high, level, crossing = low[valid], high[valid], level[valid], crossing[valid]
+    rank = rank[valid]
+
+    edge_index = np.flatnonzero(crossing.ravel()).reshape(-1, 2) % 3
+    rows = np.arange(len(low))[:, None]
+    a = low[rows, edge_index]
+    b = high[rows, edge_index]
+    t = (level[:, None] - heights[a]) / (heights[b] - heights[a])
+    points = vertices[a] + t[..., None] * (vertices[b] - vertices[a])
+
+    segments = np.stack([points @ u, points @ v], axis=-1)
+    return order[rank], segments
+
+
+def rings_to_polygons(rings):
+    """
+    Assemble closed rings into polygons with holes by even-odd nesting.
+
+    Parameters:
+        rings (list): Closed shapely LineStrings.
+
+    Returns:
+        list: Counter-clockwise Polygons, largest first.
+    """
+    faces = [Polygon(ring) for ring in rings if len(ring.coords) >= 4]
+    faces = [face for face in faces if face.area > 0]
+    faces.sort(key=lambda face: face.area, reverse=True)
+
+    # Depth of every ring = number of larger rings containing it
+    parents = []
+    for index, face in enumerate(faces):
+        point = face.representative_point()
+        containers = [other for other in range(index) if faces[other].contains(point)]
+        parents.append(containers)
+
+    shells = {}
+    for index, containers in enumerate(parents):
+        if len(containers) % 2 == 0:
+            shells[index] = []
+        else:
+            # A hole belongs to the smallest shell around it
+            shells[containers[-1]].append(faces[index].exterior)
+    return [orient(Polygon(faces[index].exterior, holes)) for index, holes in shells.items()]
+
+
+def slice_mesh(vertices, faces, normal, offsets):
+    """
+    Compute cross-sections of a mesh at several offsets along a normal.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        normal (array-like): (3,) slicing direction.
+        offsets (array-like): (N,) plane offsets along the normal.
+
+    Returns:
+        list: For each offset, a list of section Polygons in plane coordinates.
+    """
+    slice_ids, segments = section_segments(vertices, faces, normal, offsets)
+    sections = [[] for _ in range(len(offsets))]
+    if not len(slice_ids):
+        return sections
+
+    order = np.argsort(slice_ids, kind='stable')
+    boundaries = np.flatnonzero(np.diff(slice_ids[order])) + 1
+    for group in np.split(order, boundaries):
+        lines = shapely.linestrings(segments[group])
+        merged = shapely.line_merge(shapely.multilinestrings(lines))
+        rings = [line for line in shapely.get_parts(merged) if line.is_closed]
+        sections[int(slice_ids[group[0]])] = rings_to_polygons(rings)
+    return sections
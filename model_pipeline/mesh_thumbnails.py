@@ -0,0 +1,239 @@
+# mesh_thumbnails.py renders PNG previews of meshes and point clouds without a display. Triangles are rasterized in software with the vectorized depth buffer of sketch_drawing, which also reports the face seen in every pixel, and shaded flat with a headlight; point clouds are splatted into the same kind of buffer. Views are supersampled and combined with Pillow into labelled contact sheets. Previews are stored in the mesh cache under the mesh's content hash, so batch jobs and the UI render every part only once and never open an Open3D or Matplotlib window.
+import io
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from face_geometry import FaceGeometry
+from mesh_lod import mesh_arrays
+from sketch_drawing import depth_buffer, view_axes
+from stl_reader import load_stl
+
+# Camera angles (elevation, azimuth) of the named views, as for Axes3D.view_init
+VIEWS = {
+    "iso": (30.0, -60.0),
+    "front": (0.0, -90.0),
+    "right": (0.0, 0.0),
+    "top": (90.0, -90.0),
+}
+PREVIEW_VIEWS = ("iso", "front", "right", "top")
+THUMBNAIL_SIZE = 256
+# Views are rendered at this multiple of their size and averaged down, for smooth edges
+SUPERSAMPLING = 2
+# Empty border around the model, as a fraction of the image size
+MARGIN = 0.05
+BACKGROUND = (255, 255, 255)
+MESH_COLOR = (70, 110, 160)
+POINT_COLOR = (220, 30, 30)
+OUTLINE_COLOR = (30, 30, 30)
+# Share of the light that reaches faces turned away from the headlight
+AMBIENT = 0.25
+# Cache stage of the previews; bump the version whenever their look changes
+CACHE_STAGE = "preview_png"
+CACHE_VERSION = 1
+
+
+def _camera(points, elevation, azimuth, size):
+    """Return the pixel positions (column, row) and viewer distances of points framed in a square image."""
+    right, up, eye = view_axes(elevation, azimuth)
+    screen = np.column_stack([points @ right, points @ up])
+    center = (screen.min(axis=0) + screen.max(axis=0)) / 2
+    extent = float(np.ptp(screen, axis=0).max()) or 1.0
+    scale = size * (1 - 2 * MARGIN) / extent
+    return (screen - center) * scale + (size - 1) / 2, -(points @ eye), eye, up, right
+
+
+def _blank(size):
+    """Return an empty view, for meshes and point clouds with nothing to draw."""
+    return np.full((size, size, 3), BACKGROUND, dtype=np.uint8)
+
+
+def _finish(image, covered, size):
+    """Outline the covered region, flip the rows to run downwards and average the supersampled pixels."""
+    edge = covered & ~(np.roll(covered, 1, 0) & np.roll(covered, -1, 0) & np.roll(covered, 1, 1) & np.roll(covered, -1, 1))
+    image[edge] = OUTLINE_COLOR
+    image = image[::-1].reshape(size, SUPERSAMPLING, size, SUPERSAMPLING, 3).mean(axis=(1, 3))
+    return np.rint(image).astype(np.uint8)
+
+
+def render_mesh(vertices, faces, elevation=VIEWS["iso"][0], azimuth=VIEWS["iso"][1], size=THUMBNAIL_SIZE,
+                normals=None, color=MESH_COLOR):
+    """
+    Render a flat-shaded view of a mesh with an orthographic camera.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        elevation, azimuth (float): View angles in degrees.
+        size (int): Width and height of the image in pixels.
+        normals (np.ndarray): (F, 3) unit face normals, computed when None.
+        color (tuple): RGB color of a fully lit face.
+
+    Returns:
+        np.ndarray: (size, size, 3) uint8 RGB image.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    if len(faces) == 0:
+        return _blank(size)
+    if normals is None:
+        normals = FaceGeometry(vertices, faces).normals
+    full = size * SUPERSAMPLING
+    pixels, depth, eye, up, right = _camera(vertices, elevation, azimuth, full)
+    _, face_ids = depth_buffer(pixels, depth, faces, (full, full), return_faces=True)
+
+    # Two-sided lambert shading from a light slightly above and left of the viewer
+    light = eye + 0.4 * up - 0.3 * right
+    light /= np.linalg.norm(light)
+    shade = AMBIENT + (1 - AMBIENT) * np.abs(np.asarray(normals, dtype=np.float64) @ light)
+    covered = face_ids >= 0
+    image = np.empty((full, full, 3))
+    image[:] = BACKGROUND
+    image[covered] = shade[face_ids[covered], None] * np.asarray(color, dtype=np.float64)
+    return _finish(image, covered, size)
+
+
+def render_points(points, elevation=VIEWS["iso"][0], azimuth=VIEWS["iso"][1], size=THUMBNAIL_SIZE,
+                  point_size=3, color=POINT_COLOR):
+    """
+    Render a point cloud as square splats with hidden points removed.
+
+    Parameters:
+        points (np.ndarray): (N, 3) points.
+        elevation, azimuth (float): View angles in degrees.
+        size (int): Width and height of the image in pixels.
+        point_size (int): Side of a splat in output pixels.
+        color (tuple): RGB color of the points.
+
+    Returns:
+        np.ndarray: (size, size, 3) uint8 RGB image.
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    if len(points) == 0:
+        return _blank(size)
+    full = size * SUPERSAMPLING
+    pixels, depth = _camera(points, elevation, azimuth, full)[:2]
+
+    # Every point covers a square of pixels; the nearest point wins each pixel
+    radius = max(point_size * SUPERSAMPLING // 2, 0)
+    offsets = np.arange(-radius, radius + 1)
+    dx, dy = (offset.ravel() for offset in np.meshgrid(offsets, offsets))
+    column = np.clip(np.rint(pixels[:, 0])[:, None] + dx, 0, full - 1).astype(np.int64).ravel()
+    row = np.clip(np.rint(pixels[:, 1])[:, None] + dy, 0, full - 1).astype(np.int64).ravel()
+    index = row * full + column
+    values = np.repeat(depth, len(dx))
+    buffer = np.full(full * full, np.inf)
+    np.minimum.at(buffer, index, values)
+
+    covered = np.isfinite(buffer).reshape(full, full)
+    # Nearer points are drawn a little brighter so the cloud keeps its depth
+    shade = 1 - 0.5 * (buffer - depth.min()) / (float(np.ptp(depth)) or 1.0)
+    image = np.empty((full, full, 3))
+    image[:] = BACKGROUND
+    image[covered] = shade.reshape(full, full)[covered, None] * np.asarray(color, dtype=np.float64)
+    return _finish(image, covered, size)
+
+
+def contact_sheet(images, labels=None, columns=None, padding=4):
+    """
+    Arrange images in a grid with an optional caption under each.
+
+    Parameters:
+        images (list): RGB images as (H, W, 3) uint8 arrays or PIL images.
+        labels (list): Caption per image, or None.
+        columns (int): Images per row; about square by default.
+        padding (int): Gap around every tile in pixels.
+
+    Returns:
+        PIL.Image.Image: The sheet.
+    """
+    tiles = [image if isinstance(image, Image.Image) else Image.fromarray(image) for image in images]
+    if not tiles:
+        return Image.new("RGB", (1, 1), BACKGROUND)
+    columns = columns or int(np.ceil(np.sqrt(len(tiles))))
+    rows = -(-len(tiles) // columns)
+    width = max(tile.width for tile in tiles)
+    caption = 14 if labels else 0
+    height = max(tile.height for tile in tiles) + caption
+
+    sheet = Image.new("RGB", (columns * (width + padding) + padding, rows * (height + padding) + padding), BACKGROUND)
+    draw = ImageDraw.Draw(sheet)
+    for index, tile in enumerate(tiles):
+        left = padding + (index % columns) * (width + padding)
+        top = padding + (index // columns) * (height + padding)
+        sheet.paste(tile, (left, top))
+        if labels:
+            draw.text((left + 2, top + tile.height + 1), str(labels[index]), fill=OUTLINE_COLOR)
+    return sheet
+
+
+def png_bytes(image):
+    """Encode an image (array or PIL image) as PNG bytes."""
+    if not isinstance(image, Image.Image):
+        image = Image.fromarray(image)
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _mesh_source_arrays(mesh):
+    """Return (vertices, faces) of a mesh object, or of an STL given as a path or bytes."""
+    if not hasattr(mesh, "vertices"):
+        mesh = load_stl(mesh)
+    return mesh_arrays(mesh)
+
+
+def preview_png(mesh, views=PREVIEW_VIEWS, size=THUMBNAIL_SIZE):
+    """
+    Render the preview of a mesh: one view, or a labelled contact sheet of several.
+
+    Parameters:
+        mesh: STL path or bytes, trimesh.Trimesh or open3d.geometry.TriangleMesh.
+        views (tuple): Names from VIEWS.
+        size (int): Size of every view in pixels.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    vertices, faces = _mesh_source_arrays(mesh)
+    normals = FaceGeometry(vertices, faces).normals
+    images = [render_mesh(vertices, faces, *VIEWS[view], size=size, normals=normals) for view in views]
+    if len(images) == 1:
+        return png_bytes(images[0])
+    return png_bytes(contact_sheet(images, list(views), columns=min(len(images), 2)))
+
+
+def mesh_preview(mesh, views=PREVIEW_VIEWS, size=THUMBNAIL_SIZE, cache=None):
+    """
+    Return the preview PNG of a mesh, rendering it only once per mesh content.
+
+    Parameters:
+        mesh: Mesh source accepted by preview_png.
+        views (tuple): Names from VIEWS.
+        size (int): Size of every view in pixels.
+        cache (MeshCache): Cache to keep the preview in, or None to always render it.
+
+    Returns:
+        bytes: The PNG image.
+    """
+    views = tuple(views)
+    if cache is None:
+        return preview_png(mesh, views, size)
+    return cache.run(CACHE_STAGE, preview_png, mesh, views, size, version=CACHE_VERSION)
+
+
+def save_points_png(points, image_path, size=THUMBNAIL_SIZE * 2, point_size=3, views=("iso",)):
+    """
+    Write a point cloud preview to a PNG file without opening a window.
+
+    Parameters:
+        points (np.ndarray): (N, 3) points.
+        image_path (str): PNG file to write.
+        size (int): Size of every view in pixels.
+        point_size (int): Side of a point splat in pixels.
+        views (tuple): Names from VIEWS; several give a labelled contact sheet.
+    """
+    images = [render_points(points, *VIEWS[view], size=size, point_size=point_size) for view in views]
+    image = images[0] if len(images) == 1 else contact_sheet(images, list(views), columns=min(len(images), 2))
+    with open(image_path, "wb") as image_file:
+        image_file.write(png_bytes(image))
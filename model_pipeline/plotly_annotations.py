@@ -0,0 +1,89 @@
+# plotly_annotations.py builds the traces of the Plotly mesh annotators with a fixed number of traces, whatever the size of the mesh. All face centroids go into one Scatter3d whose hover text is filled in by the browser from numeric customdata and a hovertemplate, and all mesh edges go into one line trace whose segments are separated by NaN rows, built with NumPy. Rendering cost therefore grows with the length of the arrays, not with the number of traces.
+import numpy as np
+import plotly.graph_objects as go
+
+# Hover text of a face centroid; customdata holds the three edge lengths
+EDGE_LENGTH_TEMPLATE = (
+    "Face %{pointNumber}<br>"
+    "Edge 1: %{customdata[0]:.2f}<br>"
+    "Edge 2: %{customdata[1]:.2f}<br>"
+    "Edge 3: %{customdata[2]:.2f}<extra></extra>"
+)
+
+
+def mesh_edges(faces):
+    """Return the (E, 2) unique undirected edges of a triangle mesh."""
+    faces = np.asarray(faces, dtype=np.int64)
+    edges = np.sort(faces[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1)
+    return np.unique(edges, axis=0)
+
+
+def line_segments(starts, ends):
+    """
+    Interleave segment end points with NaN rows so one line trace draws them all.
+
+    Parameters:
+        starts (np.ndarray): (E, 3) first end of every segment.
+        ends (np.ndarray): (E, 3) second end of every segment.
+
+    Returns:
+        np.ndarray: (3E, 3) coordinates: start, end, NaN for every segment.
+    """
+    coordinates = np.full((len(starts), 3, 3), np.nan)
+    coordinates[:, 0] = starts
+    coordinates[:, 1] = ends
+    return coordinates.reshape(-1, 3)
+
+
+def edge_trace(vertices, faces, edges=None, color='black', width=2):
+    """
+    Draw all edges of a mesh as a single Scatter3d line trace.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        edges (np.ndarray): (E, 2) edges to draw instead of every mesh edge.
+        color (str): Line color.
+        width (float): Line width.
+
+    Returns:
+        go.Scatter3d: The edge trace.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    if edges is None:
+        edges = mesh_edges(faces)
+    coordinates = line_segments(vertices[edges[:, 0]], vertices[edges[:, 1]])
+    return go.Scatter3d(
+        x=coordinates[:, 0],
+        y=coordinates[:, 1],
+        z=coordinates[:, 2],
+        mode='lines',
+        line=dict(color=color, width=width),
+        hoverinfo='skip',
+        showlegend=False
+    )
+
+
+def centroid_trace(geometry, color=None, size=4):
+    """
+    Mark every face centroid in one Scatter3d that shows the face's edge lengths on hover.
+
+    Parameters:
+        geometry (FaceGeometry): Shared per-face geometry of the mesh.
+        color (str): Marker color, or None for Plotly's default.
+        size (float): Marker size.
+
+    Returns:
+        go.Scatter3d: The centroid trace.
+    """
+    centroids = geometry.centroids
+    return go.Scatter3d(
+        x=centroids[:, 0],
+        y=centroids[:, 1],
+        z=centroids[:, 2],
+        mode='markers',
+        marker=dict(size=size, color=color),
+        customdata=geometry.edge_lengths,
+        hovertemplate=EDGE_LENGTH_TEMPLATE,
+        showlegend=False
+    )
@@ -0,0 +1,259 @@
+# point_sampling.py draws seeded, reproducible point samples from a mesh surface. Three modes trade cost against evenness: area-weighted random sampling (every face drawn in proportion to its area, all samples in one vectorized pass), Poisson-disk blue-noise sampling (no two points closer than a spacing, built from an oversampled candidate pool with a phased cell grid so whole batches of non-interfering cells are decided at once) and voxel-grid downsampling (one representative sample per occupied voxel). Every mode takes a point budget or a spacing and returns the points together with their face normals and source face ids, so fitting and rendering code can pick the cheapest representation that is accurate enough for it.
+import math
+
+import numpy as np
+
+from face_geometry import FaceGeometry, mesh_face_geometry
+
+SAMPLING_METHODS = ("area", "poisson", "voxel")
+# Default point budget and seed, matching the former create_point_cloud_from_mesh
+SAMPLE_COUNT = 10000
+SEED = 0
+# A maximal Poisson-disk set with spacing r covers about this many points per r^2 of surface
+POISSON_DENSITY = 0.6
+# Candidates drawn per Poisson-disk point, and most tried per grid cell
+CANDIDATES_PER_POINT = 6
+MAX_CELL_TRIALS = 30
+# Dense samples drawn per output point before voxel downsampling
+VOXEL_OVERSAMPLING = 8
+# Bisection steps used to find the voxel size of a point budget
+VOXEL_SEARCH_STEPS = 16
+
+
+class PointSamples:
+    """
+    Points sampled on a mesh surface.
+
+    Attributes:
+        points (np.ndarray): (N, 3) sample positions.
+        normals (np.ndarray): (N, 3) unit normals of the faces they lie on.
+        face_ids (np.ndarray): (N,) index of the face each sample came from.
+    """
+
+    def __init__(self, points, normals, face_ids):
+        self.points = points
+        self.normals = normals
+        self.face_ids = face_ids
+
+    def __len__(self):
+        return len(self.points)
+
+    def subset(self, index):
+        """Return the samples selected by an index array or boolean mask."""
+        return PointSamples(self.points[index], self.normals[index], self.face_ids[index])
+
+
+def area_weighted_samples(geometry, count, seed=SEED):
+    """
+    Draw points uniformly over the surface.
+
+    Faces are picked with probability proportional to their area and points
+    are placed with uniformly distributed barycentric coordinates.
+
+    Parameters:
+        geometry (FaceGeometry): Face geometry of the mesh.
+        count (int): Number of points.
+        seed (int): Seed of the random generator.
+
+    Returns:
+        PointSamples: The samples in draw order.
+    """
+    rng = np.random.default_rng(seed)
+    cumulative = np.cumsum(geometry.areas, dtype=np.float64)
+    face_ids = np.searchsorted(cumulative, rng.random(count) * cumulative[-1], side='right')
+    face_ids = np.minimum(face_ids, len(cumulative) - 1)
+
+    # sqrt(r1) spreads the points evenly instead of bunching them at corner 0
+    root, fraction = np.sqrt(rng.random(count)), rng.random(count)
+    weights = np.column_stack([1 - root, root * (1 - fraction), root * fraction])
+    corners = np.asarray(geometry.vertices, dtype=np.float64)[geometry.faces[face_ids]]
+    points = np.einsum('nk,nkd->nd', weights, corners)
+    return PointSamples(points, geometry.normals[face_ids].astype(np.float64), face_ids)
+
+
+def poisson_spacing(area, count):
+    """Return the Poisson-disk spacing that gives about count points on a surface of the given area."""
+    return math.sqrt(POISSON_DENSITY * area / max(count, 1))
+
+
+def poisson_disk_samples(geometry, spacing, seed=SEED):
+    """
+    Pick a blue-noise subset of dense candidates in which no two points are closer than spacing.
+
+    Candidates are bucketed in cells of side spacing / sqrt(3), so a cell
+    holds at most one accepted point. Cells whose coordinates agree modulo 3
+    are at least two cells (more than spacing) apart, so each of the 27 such
+    phases is decided in bulk: all of its cells try their next candidate at
+    once against the points accepted in the surrounding 5x5x5 cells.
+
+    Parameters:
+        geometry (FaceGeometry): Face geometry of the mesh.
+        spacing (float): Smallest distance between two points.
+        seed (int): Seed of the candidate sampling.
+
+    Returns:
+        PointSamples: The accepted samples.
+    """
+    area = float(geometry.areas.sum())
+    candidate_count = max(int(CANDIDATES_PER_POINT * area / (POISSON_DENSITY * spacing ** 2)), 1)
+    candidates = area_weighted_samples(geometry, candidate_count, seed)
+    points = candidates.points
+
+    cell_size = spacing / math.sqrt(3)
+    cells = np.floor((points - points.min(axis=0)) / cell_size).astype(np.int64) + 2
+    dims = cells.max(axis=0) + 3
+    keys = (cells[:, 0] * dims[1] + cells[:, 1]) * dims[2] + cells[:, 2]
+    cell_keys, cell_ids = np.unique(keys, return_inverse=True)
+    cell_ids = cell_ids.ravel()
+    phases = ((cells % 3) * [9, 3, 1]).sum(axis=1)
+
+    # The occupied cells within two cells of every occupied cell (-1 where empty)
+    offsets = np.stack(np.meshgrid(*[np.arange(-2, 3)] * 3, indexing='ij'), axis=-1).reshape(-1, 3)
+    neighbour_keys = cell_keys[:, None] + (offsets[:, 0] * dims[1] + offsets[:, 1]) * dims[2] + offsets[:, 2]
+    slots = np.minimum(np.searchsorted(cell_keys, neighbour_keys), len(cell_keys) - 1)
+    neighbours = np.where(cell_keys[slots] == neighbour_keys, slots, -1)
+
+    # Rank the candidates of every cell in their (random) draw order, then group
+    # them by (phase, rank) so every step is one contiguous slice
+    by_cell = np.argsort(cell_ids, kind='stable')
+    cell_starts = np.searchsorted(cell_ids[by_cell], np.arange(len(cell_keys)))
+    ranks = np.empty(len(points), dtype=np.int64)
+    ranks[by_cell] = np.arange(len(points)) - cell_starts[cell_ids[by_cell]]
+    order = np.flatnonzero(ranks < MAX_CELL_TRIALS)
+    order = order[np.lexsort((ranks[order], phases[order]))]
+    group = phases[order] * MAX_CELL_TRIALS + ranks[order]
+    bounds = np.r_[0, np.flatnonzero(np.diff(group)) + 1, len(order)]
+
+    # Accepted candidate of every cell; the extra last entry stands for empty neighbours
+    accepted = np.full(len(cell_keys) + 1, -1, dtype=np.int64)
+
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        batch = order[start:stop]
+        batch = batch[accepted[cell_ids[batch]] < 0]
+        if not len(batch):
+            continue
+        # Only the neighbour cells that already hold a point need a distance test
+        nearby = accepted[neighbours[cell_ids[batch]]]
+        rows, columns = np.nonzero(nearby >= 0)
+        gaps = points[nearby[rows, columns]] - points[batch[rows]]
+        too_close = np.einsum('ij,ij->i', gaps, gaps) < spacing ** 2
+        batch = batch[np.bincount(rows[too_close], minlength=len(batch)) == 0]
+        accepted[cell_ids[batch]] = batch
+
+    accepted = accepted[:-1]
+    return candidates.subset(np.sort(accepted[accepted >= 0]))
+
+
+def _voxel_keys(points, voxel_size):
+    """Return one int64 key per point identifying its voxel."""
+    voxels = np.floor((points - points.min(axis=0)) / voxel_size).astype(np.int64)
+    dims = voxels.max(axis=0) + 1
+    return (voxels[:, 0] * dims[1] + voxels[:, 1]) * dims[2] + voxels[:, 2]
+
+
+def voxel_downsample(samples, voxel_size):
+    """
+    Keep one sample per occupied voxel: the one nearest to the mean of the voxel's samples.
+
+    Keeping a real sample rather than the mean keeps every point on the
+    surface with a valid face id and normal.
+
+    Parameters:
+        samples (PointSamples): Dense samples.
+        voxel_size (float): Edge length of the voxels.
+
+    Returns:
+        PointSamples: The representatives, in the order of the input samples.
+    """
+    _, labels = np.unique(_voxel_keys(samples.points, voxel_size), return_inverse=True)
+    labels = labels.ravel()
+    counts = np.bincount(labels)
+    means = np.column_stack([np.bincount(labels, weights=samples.points[:, axis]) for axis in range(3)]) / counts[:, None]
+    distances = np.linalg.norm(samples.points - means[labels], axis=1)
+
+    order = np.lexsort((distances, labels))
+    first = order[np.r_[0, np.flatnonzero(np.diff(labels[order])) + 1]]
+    return samples.subset(np.sort(first))
+
+
+def voxel_size_for_count(points, count):
+    """
+    Find by bisection a voxel size that leaves at most count occupied voxels, as close to count as possible.
+
+    Parameters:
+        points (np.ndarray): (N, 3) points.
+        count (int): Point budget.
+
+    Returns:
+        float: Voxel edge length.
+    """
+    extent = float(np.linalg.norm(np.ptp(points, axis=0))) or 1.0
+
+    def occupied(size):
+        return len(np.unique(_voxel_keys(points, size)))
+
+    small, large = extent * 1e-6, extent
+    for _ in range(VOXEL_SEARCH_STEPS):
+        middle = math.sqrt(small * large)
+        if occupied(middle) > count:
+            small = middle
+        else:
+            large = middle
+    return large
+
+
+def sample_surface(geometry, method="area", count=None, spacing=None, seed=SEED):
+    """
+    Sample a surface with a point budget or a spacing.
+
+    Parameters:
+        geometry (FaceGeometry): Face geometry of the mesh.
+        method (str): "area" (uniform random), "poisson" (blue noise) or "voxel" (one point per voxel).
+        count (int): Point budget; SAMPLE_COUNT when neither count nor spacing is given.
+            Poisson-disk sampling meets it approximately and trims any excess.
+        spacing (float): Target distance between points instead of a budget.
+        seed (int): Seed of every random choice; the same inputs always give the same samples.
+
+    Returns:
+        PointSamples: The samples.
+    """
+    if method not in SAMPLING_METHODS:
+        raise ValueError(f"Unknown sampling method {method!r}; expected one of {', '.join(SAMPLING_METHODS)}")
+    area = float(geometry.areas.sum())
+    if count is None and spacing is None:
+        count = SAMPLE_COUNT
+
+    if method == "area":
+        if count is None:
+            count = max(int(math.ceil(area / spacing ** 2)), 1)
+        return area_weighted_samples(geometry, count, seed)
+
+    if method == "poisson":
+        samples = poisson_disk_samples(geometry, spacing or poisson_spacing(area, count), seed)
+        if count is not None and len(samples) > count:
+            keep = np.random.default_rng(seed).choice(len(samples), count, replace=False)
+            samples = samples.subset(np.sort(keep))
+        return samples
+
+    dense_count = count * VOXEL_OVERSAMPLING if count is not None else int(math.ceil(area / spacing ** 2)) * VOXEL_OVERSAMPLING
+    dense = area_weighted_samples(geometry, max(dense_count, 1), seed)
+    return voxel_downsample(dense, spacing or voxel_size_for_count(dense.points, count))
+
+
+def sample_mesh(mesh, method="area", count=None, spacing=None, seed=SEED):
+    """
+    Sample a mesh's surface, reusing its shared FaceGeometry.
+
+    Parameters:
+        mesh: trimesh.Trimesh or open3d.geometry.TriangleMesh.
+        method, count, spacing, seed: As for sample_surface.
+
+    Returns:
+        PointSamples: The samples with their normals and face ids.
+    """
+    return sample_surface(mesh_face_geometry(mesh), method, count, spacing, seed)
+
+
+def sample_arrays(vertices, faces, method="area", count=None, spacing=None, seed=SEED):
+    """sample_surface for raw vertex and face arrays."""
+    return sample_surface(FaceGeometry(vertices, faces), method, count, spacing, seed)
@@ -0,0 +1,168 @@
+# polygon_table.py describes many 2D shapes at once with Shapely 2's vectorized geometry functions. Contours become polygons in one call, and validity, orientation, area, perimeter, vertex counts, minimum rotated rectangles and circularity are computed for the whole array of shapes, giving a columnar table (one row per shape). The per-shape JSON records of the 2D shape scripts (type, area, perimeter and dimensions) are derived from the table, so they can always be reproduced from it.
+import math
+
+import numpy as np
+import pandas as pd
+import shapely
+
+# Dimension columns of the JSON record of each shape type, in output order;
+# every other type is described by its radius and diameter
+DIMENSION_COLUMNS = {
+    "Triangle": ["side_1", "side_2", "side_3", "height", "base"],
+    "Square": ["length", "width"],
+    "Rectangle": ["length", "width"],
+}
+ROUND_COLUMNS = ["radius", "diameter"]
+
+
+def contour_polygons(contours):
+    """
+    Turn traced contours into valid, counter-clockwise polygons in one pass.
+
+    Equivalent to building Polygon(contour) for every contour with at least
+    three points, keeping the valid ones and orienting them with orient().
+
+    Parameters:
+        contours (list): (K, 2) point arrays, e.g. from trace_contours.
+
+    Returns:
+        np.ndarray: Array of shapely Polygons.
+    """
+    contours = [contour for contour in contours if len(contour) >= 3]
+    if not contours:
+        return np.array([], dtype=object)
+
+    lengths = np.array([len(contour) for contour in contours])
+    coords = np.concatenate(contours).astype(np.float64)
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    # A ring needs three distinct corners once it is closed
+    closed = np.all(coords[starts] == coords[ends - 1], axis=1)
+    keep = lengths - closed >= 3
+    indices = np.repeat(np.arange(len(contours)), lengths)
+    in_kept = keep[indices]
+    polygons = shapely.polygons(shapely.linearrings(coords[in_kept], indices=np.cumsum(keep)[indices[in_kept]] - 1))
+    polygons = polygons[shapely.is_valid(polygons)]
+
+    # Contour polygons have no holes, so reversing a clockwise ring orients the polygon
+    clockwise = ~shapely.is_ccw(shapely.get_exterior_ring(polygons))
+    polygons[clockwise] = shapely.reverse(polygons[clockwise])
+    return polygons
+
+
+def _exterior_corners(exteriors, counts):
+    """Return the first three coordinates of every exterior ring (NaN where missing)."""
+    coords = shapely.get_coordinates(exteriors)
+    starts = np.cumsum(counts) - counts
+    corners = np.full((len(exteriors), 3, 2), np.nan)
+    for corner in range(3):
+        present = counts > corner
+        corners[present, corner] = coords[starts[present] + corner]
+    return corners
+
+
+def _rectangle_sides(polygons):
+    """Return the (long, short) side lengths of each polygon's minimum rotated rectangle."""
+    rectangles = shapely.minimum_rotated_rectangle(polygons)
+    sides = np.zeros((len(polygons), 2))
+    # Degenerate shapes collapse to a line or point rather than a rectangle, and empty
+    # polygons stay empty polygons without corners
+    is_rectangle = (shapely.get_type_id(rectangles) == shapely.GeometryType.POLYGON) & ~shapely.is_empty(rectangles)
+    if np.any(is_rectangle):
+        corners = _exterior_corners(shapely.get_exterior_ring(rectangles[is_rectangle]),
+                                    np.full(int(is_rectangle.sum()), 5))
+        first = np.linalg.norm(corners[:, 1] - corners[:, 0], axis=1)
+        second = np.linalg.norm(corners[:, 2] - corners[:, 1], axis=1)
+        sides[is_rectangle] = np.column_stack([np.maximum(first, second), np.minimum(first, second)])
+    lines = ~is_rectangle & ~shapely.is_empty(rectangles)
+    sides[lines, 0] = shapely.length(rectangles[lines])
+    return sides
+
+
+def shape_table(shapes):
+    """
+    Describe an array of polygons as a columnar table.
+
+    Parameters:
+        shapes (array-like): Shapely Polygons.
+
+    Returns:
+        pd.DataFrame: One row per shape with valid, ccw, area, perimeter,
+        vertices (closed exterior coordinate count), holes, rect_length and
+        rect_width (minimum rotated rectangle), circularity (4*pi*area /
+        perimeter**2, 1 for a circle), the shape type and its dimension
+        columns (NaN where they do not apply).
+    """
+    shapes = np.asarray(shapes, dtype=object).ravel()
+    exteriors = shapely.get_exterior_ring(shapes)
+    area = shapely.area(shapes)
+    perimeter = shapely.length(shapes)
+    counts = shapely.get_num_coordinates(exteriors)
+    empty = shapely.is_empty(shapes)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        circularity = 4 * math.pi * area / perimeter ** 2
+        # The scripts' original circle rule, kept verbatim so the records stay unchanged
+        roundish = perimeter ** 2 / (4 * math.pi * area) > 0.8
+
+    shape_type = np.select(
+        [empty, counts == 3, (counts == 4) & (np.abs(area - perimeter ** 2) < 1e-5), counts == 4, (counts > 4) & roundish, counts > 4],
+        ["No shape detected", "Triangle", "Square", "Rectangle", "Circle", "Polygon"],
+        default="Unknown shape",
+    )
+
+    corners = _exterior_corners(exteriors, counts)
+    side_1 = np.linalg.norm(corners[:, 0] - corners[:, 1], axis=1)
+    side_2 = np.linalg.norm(corners[:, 1] - corners[:, 2], axis=1)
+    side_3 = np.linalg.norm(corners[:, 2] - corners[:, 0], axis=1)
+    triangle = counts == 3
+    quad = counts == 4
+    round_ = ~triangle & ~quad
+    radius = np.sqrt(area / math.pi)
+    rectangle_sides = _rectangle_sides(shapes)
+
+    def only(values, rows):
+        return np.where(rows, values, np.nan)
+
+    return pd.DataFrame({
+        "valid": shapely.is_valid(shapes),
+        "ccw": shapely.is_ccw(exteriors) & ~empty,
+        "area": area,
+        "perimeter": perimeter,
+        "vertices": counts,
+        "holes": shapely.get_num_interior_rings(shapes),
+        "rect_length": rectangle_sides[:, 0],
+        "rect_width": rectangle_sides[:, 1],
+        "circularity": circularity,
+        "type": shape_type,
+        "side_1": only(side_1, triangle),
+        "side_2": only(side_2, triangle),
+        "side_3": only(side_3, triangle),
+        "height": only(np.minimum(np.minimum(side_1, side_2), side_3), triangle),
+        "base": only(np.maximum(np.maximum(side_1, side_2), side_3), triangle),
+        "length": only(side_1, quad),
+        "width": only(side_2, quad),
+        "radius": only(radius, round_),
+        "diameter": only(2 * radius, round_),
+    })
+
+
+def shape_records(table):
+    """
+    Rebuild the per-shape JSON records of the 2D shape scripts from a shape table.
+
+    Parameters:
+        table (pd.DataFrame): Output of shape_table or mask_regions.region_table
+            (extra columns are ignored).
+
+    Returns:
+        list: One dict per row with type, area, perimeter and the dimensions
+        of its shape type.
+    """
+    records = []
+    for row in table.itertuples(index=False):
+        record = {"type": row.type, "area": float(row.area), "perimeter": float(row.perimeter)}
+        for column in DIMENSION_COLUMNS.get(row.type, ROUND_COLUMNS):
+            record[column] = float(getattr(row, column))
+        records.append(record)
+    return records
@@ -0,0 +1,448 @@
+# primitive_fitting.py recognises the planes, cylinders, spheres and cones a CAD part is made of with an efficient RANSAC over points sampled from its surface. Points are ordered along a Morton-code octree so minimal samples can be drawn from one octree cell (nearby points are far more likely to lie on the same primitive), hypotheses are generated and scored in batches with array operations (one (hypotheses, points) distance matrix per batch) and the independent batches run on a thread pool. The best primitive of every round is refitted by least squares, its inlier faces are collected from the mesh and its points are removed before the next round.
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from face_geometry import mesh_face_geometry
+from mesh_segmentation import face_adjacency, union_find
+from point_sampling import sample_mesh
+
+PRIMITIVES = ("plane", "cylinder", "sphere", "cone")
+# Points in a minimal sample of each primitive (all of them also use the normals)
+SAMPLE_SIZES = {"plane": 3, "cylinder": 2, "sphere": 2, "cone": 3}
+
+# Surface points sampled from the mesh
+SAMPLE_COUNT = 10000
+# Largest distance from the surface of an inlier, as a fraction of the bounding box diagonal
+DISTANCE_THRESHOLD = 0.005
+# Largest angle (degrees) between an inlier's normal and the primitive's normal
+NORMAL_ANGLE = 15.0
+# Fewest inliers of an accepted primitive, as a fraction of the sampled points
+MIN_SUPPORT = 0.01
+# Hypotheses scored together, and batches of them per primitive type and round
+BATCH_SIZE = 128
+BATCHES_PER_ROUND = 2
+# Levels of the octree used for local sampling
+OCTREE_DEPTH = 8
+# Rounds in a row without an accepted primitive before the search stops
+MAX_FAILURES = 3
+# Cone half-angles (degrees) outside this range are better described by a plane or a cylinder
+CONE_ANGLES = (3.0, 87.0)
+
+
+def _normalize(vectors):
+    """Scale vectors to unit length along the last axis (zero vectors become NaN)."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)
+
+
+def _dot(a, b):
+    return np.einsum('...i,...i->...', a, b)
+
+
+class PointOctree:
+    """
+    Octree over a point cloud stored as points sorted by Morton code.
+
+    Every cell at every level is a contiguous range of the sorted points, so
+    the points of the cell around a point are found with two binary searches.
+
+    Parameters:
+        points (np.ndarray): (N, 3) points.
+        depth (int): Number of levels below the root.
+    """
+
+    def __init__(self, points, depth=OCTREE_DEPTH):
+        self.depth = depth
+        lower = points.min(axis=0)
+        size = float(np.ptp(points, axis=0).max()) or 1.0
+        resolution = 1 << depth
+        cells = np.minimum(((points - lower) / size * resolution).astype(np.int64), resolution - 1)
+        codes = np.zeros(len(points), dtype=np.int64)
+        for bit in range(depth):
+            for axis in range(3):
+                codes |= ((cells[:, axis] >> bit) & 1) << (3 * bit + axis)
+        self.order = np.argsort(codes, kind='stable')
+        self.codes = codes[self.order]
+
+    def cell_ranges(self, positions):
+        """
+        Return the sorted-order ranges of the cells containing some points at every level.
+
+        Parameters:
+            positions (np.ndarray): (B,) positions of the points in sorted order.
+
+        Returns:
+            tuple: (starts, stops), each (B, depth + 1) with level 0 the root.
+        """
+        shifts = 3 * (self.depth - np.arange(self.depth + 1))
+        cells = self.codes[positions][:, None] >> shifts
+        starts = np.searchsorted(self.codes, cells << shifts, side='left')
+        stops = np.searchsorted(self.codes, (cells + 1) << shifts, side='left')
+        return starts, stops
+
+    def sample(self, rng, count, size):
+        """
+        Draw local minimal samples: a random point and size - 1 more from one octree cell around it.
+
+        The level of the cell is random among those holding at least twice
+        size points, so samples mix small and large neighbourhoods.
+
+        Parameters:
+            rng (np.random.Generator): Random generator.
+            count (int): Number of samples.
+            size (int): Points per sample.
+
+        Returns:
+            np.ndarray: (count, size) indices into the original point array.
+        """
+        first = rng.integers(len(self.codes), size=count)
+        starts, stops = self.cell_ranges(first)
+        populated = stops - starts >= 2 * size
+        populated[:, 0] = True
+        level = np.argmax(np.where(populated, rng.random(populated.shape), -1.0), axis=1)
+        rows = np.arange(count)
+        start, stop = starts[rows, level], stops[rows, level]
+        others = start[:, None] + (rng.random((count, size - 1)) * (stop - start)[:, None]).astype(np.int64)
+        return self.order[np.column_stack([first, others])]
+
+
+def _closest_points(p0, n0, p1, n1):
+    """Return the midpoints of the closest points of the lines p0 + t n0 and p1 + s n1."""
+    w = p0 - p1
+    b = _dot(n0, n1)
+    d = _dot(n0, w)
+    e = _dot(n1, w)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        denominator = 1 - b * b
+        t = (b * e - d) / denominator
+        s = (e - b * d) / denominator
+        return (p0 + t[:, None] * n0 + p1 + s[:, None] * n1) / 2
+
+
+def hypotheses(kind, points, normals):
+    """
+    Build primitives from minimal samples.
+
+    Parameters:
+        kind (str): One of PRIMITIVES.
+        points (np.ndarray): (B, k, 3) sample points, k = SAMPLE_SIZES[kind].
+        normals (np.ndarray): (B, k, 3) their unit normals.
+
+    Returns:
+        dict: (B, ...) parameter arrays; NaN where a sample is degenerate.
+        Planes have normal and point, spheres center and radius, cylinders
+        axis, center (a point on the axis) and radius, cones apex, axis
+        (pointing into the cone) and angle (half-angle in radians).
+    """
+    if kind == "plane":
+        normal = _normalize(np.cross(points[:, 1] - points[:, 0], points[:, 2] - points[:, 0]))
+        return {"normal": normal, "point": points.mean(axis=1)}
+
+    if kind == "sphere":
+        center = _closest_points(points[:, 0], normals[:, 0], points[:, 1], normals[:, 1])
+        radius = np.linalg.norm(points - center[:, None], axis=2).mean(axis=1)
+        return {"center": center, "radius": radius}
+
+    if kind == "cylinder":
+        # The axis is perpendicular to both normals; in the plane across it the
+        # normal lines meet at the centre
+        axis = _normalize(np.cross(normals[:, 0], normals[:, 1]))
+        flat_points = points - _dot(points, axis[:, None])[..., None] * axis[:, None]
+        flat_normals = _normalize(normals - _dot(normals, axis[:, None])[..., None] * axis[:, None])
+        center = _closest_points(flat_points[:, 0], flat_normals[:, 0], flat_points[:, 1], flat_normals[:, 1])
+        radius = np.linalg.norm(flat_points - center[:, None], axis=2).mean(axis=1)
+        return {"axis": axis, "center": center, "radius": radius}
+
+    # Cone: the apex lies on all three tangent planes, and the unit directions
+    # from the apex to the samples lie on a circle around the axis
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        singular = np.abs(np.linalg.det(normals)) < 1e-6
+        safe_normals = np.where(singular[:, None, None], np.eye(3), normals)
+        apex = np.linalg.solve(safe_normals, _dot(normals, points)[..., None])[..., 0]
+        apex[singular] = np.nan
+        directions = _normalize(points - apex[:, None])
+        axis = _normalize(np.cross(directions[:, 1] - directions[:, 0], directions[:, 2] - directions[:, 0]))
+        axis *= np.where(_dot(axis, directions[:, 0]) < 0, -1.0, 1.0)[:, None]
+        angle = np.arccos(np.clip(_dot(directions, axis[:, None]), -1, 1)).mean(axis=1)
+    return {"apex": apex, "axis": axis, "angle": angle}
+
+
+def residuals(kind, params, points, normals):
+    """
+    Measure points against a batch of primitives.
+
+    Parameters:
+        kind (str): One of PRIMITIVES.
+        params (dict): (B, ...) parameter arrays from hypotheses.
+        points (np.ndarray): (N, 3) points.
+        normals (np.ndarray): (N, 3) their unit normals.
+
+    Returns:
+        tuple: (distance, alignment), each (B, N): the distance of every point
+        from every surface and |cos| of the angle between the point normal and
+        the surface normal there.
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        if kind == "plane":
+            normal = params["normal"]
+            distance = np.abs(normal @ points.T - _dot(normal, params["point"])[:, None])
+            return distance, np.abs(normal @ normals.T)
+
+        if kind == "sphere":
+            offsets = points[None] - params["center"][:, None]
+            lengths = np.linalg.norm(offsets, axis=2)
+            alignment = np.abs(_dot(offsets, normals[None])) / lengths
+            return np.abs(lengths - params["radius"][:, None]), alignment
+
+        axis = params["axis"]
+        if kind == "cylinder":
+            offsets = points[None] - params["center"][:, None]
+            radial = offsets - _dot(offsets, axis[:, None])[..., None] * axis[:, None]
+            lengths = np.linalg.norm(radial, axis=2)
+            alignment = np.abs(_dot(radial, normals[None])) / lengths
+            return np.abs(lengths - params["radius"][:, None]), alignment
+
+        # Cone: in the plane of the axis and the point, the surface is a line
+        # through the apex at the half-angle from the axis
+        offsets = points[None] - params["apex"][:, None]
+        height = _dot(offsets, axis[:, None])
+        radial = offsets - height[..., None] * axis[:, None]
+        lengths = np.linalg.norm(radial, axis=2)
+        cos_angle, sin_angle = np.cos(params["angle"])[:, None], np.sin(params["angle"])[:, None]
+        distance = np.where(height > 0, np.abs(lengths * cos_angle - height * sin_angle), np.inf)
+        surface_normals = (radial / lengths[..., None]) * cos_angle[..., None] - axis[:, None] * sin_angle[..., None]
+        return distance, np.abs(_dot(surface_normals, normals[None]))
+
+
+def _valid(kind, params, max_radius):
+    """Reject degenerate hypotheses and ones better described by a simpler primitive."""
+    valid = np.all([np.isfinite(value).reshape(len(value), -1).all(axis=1) for value in params.values()], axis=0)
+    if kind in ("sphere", "cylinder"):
+        valid &= (params["radius"] > 0) & (params["radius"] < max_radius)
+    elif kind == "cone":
+        low, high = np.radians(CONE_ANGLES)
+        valid &= (params["angle"] > low) & (params["angle"] < high)
+    return valid
+
+
+def inlier_mask(kind, params, points, normals, distance_threshold, min_alignment):
+    """Return the (B, N) inlier mask of a batch of primitives."""
+    distance, alignment = residuals(kind, params, points, normals)
+    return (distance <= distance_threshold) & (alignment >= min_alignment)
+
+
+def _score_batch(kind, points, normals, octree, seed, batch_size, distance_threshold, min_alignment, max_radius):
+    """
+    Generate and score one batch of hypotheses.
+
+    Returns:
+        tuple: (score, params) of the best hypothesis of the batch, params
+        holding (1, ...) arrays, or (0, None) when none is valid.
+    """
+    rng = np.random.default_rng(seed)
+    samples = octree.sample(rng, batch_size, SAMPLE_SIZES[kind])
+    params = hypotheses(kind, points[samples], normals[samples])
+
+    # A hypothesis must agree with the normals of its own sample
+    valid = _valid(kind, params, max_radius)
+    valid &= inlier_mask(kind, params, points[samples].reshape(-1, 3), normals[samples].reshape(-1, 3),
+                         distance_threshold, min_alignment).reshape(batch_size, batch_size, -1)[
+        np.arange(batch_size), np.arange(batch_size)].all(axis=1)
+    if not np.any(valid):
+        return 0, None
+    params = {name: value[valid] for name, value in params.items()}
+
+    scores = inlier_mask(kind, params, points, normals, distance_threshold, min_alignment).sum(axis=1)
+    best = int(np.argmax(scores))
+    return int(scores[best]), {name: value[best:best + 1] for name, value in params.items()}
+
+
+def refit(kind, params, points, normals):
+    """
+    Refine a primitive by least squares on its inliers.
+
+    Planes are refitted through the centroid along the smallest principal
+    direction, spheres with the algebraic sphere fit, and cylinders get the
+    axis most perpendicular to the inlier normals and an algebraic circle fit
+    across it. Cones keep their hypothesis parameters.
+
+    Parameters:
+        kind (str): One of PRIMITIVES.
+        params (dict): (1, ...) parameter arrays.
+        points (np.ndarray): (N, 3) inlier points.
+        normals (np.ndarray): (N, 3) their unit normals.
+
+    Returns:
+        dict: (1, ...) refined parameter arrays.
+    """
+    if kind == "plane":
+        centroid = points.mean(axis=0)
+        normal = np.linalg.eigh(np.cov((points - centroid).T))[1][:, 0]
+        return {"normal": normal[None], "point": centroid[None]}
+
+    if kind == "sphere":
+        # |p|^2 = 2 c.p + (r^2 - |c|^2)
+        design = np.column_stack([2 * points, np.ones(len(points))])
+        solution = np.linalg.lstsq(design, (points ** 2).sum(axis=1), rcond=None)[0]
+        center = solution[:3]
+        radius = np.sqrt(max(solution[3] + center @ center, 0.0))
+        return {"center": center[None], "radius": np.array([radius])}
+
+    if kind == "cylinder":
+        axis = np.linalg.eigh(normals.T @ normals)[1][:, 0]
+        u = _normalize(np.cross(axis, np.eye(3)[np.argmin(np.abs(axis))]))
+        v = np.cross(axis, u)
+        x, y = points @ u, points @ v
+        design = np.column_stack([x, y, np.ones(len(points))])
+        a, b, c = np.linalg.lstsq(design, x * x + y * y, rcond=None)[0]
+        radius = np.sqrt(max(c + (a / 2) ** 2 + (b / 2) ** 2, 0.0))
+        center = a / 2 * u + b / 2 * v + (points @ axis).mean() * axis
+        return {"axis": axis[None], "center": center[None], "radius": np.array([radius])}
+
+    return params
+
+
+def _face_set(kind, params, geometry, adjacency, available, seed_faces, distance_threshold, min_alignment):
+    """
+    Collect the faces of a primitive: the unassigned faces whose centroid and
+    normal fit it and which are connected to a face of one of its inlier points.
+    """
+    fits = available & inlier_mask(kind, params, geometry.centroids.astype(np.float64),
+                                   geometry.normals.astype(np.float64), distance_threshold, min_alignment)[0]
+    linked = adjacency[fits[adjacency[:, 0]] & fits[adjacency[:, 1]]]
+    labels = union_find(len(fits), linked)
+    seeded = np.zeros(labels.max() + 1, dtype=bool)
+    seeded[labels[seed_faces[fits[seed_faces]]]] = True
+    return np.flatnonzero(fits & seeded[labels])
+
+
+def _describe(kind, params, points, face_ids, geometry):
+    """Turn a fitted primitive into a result dictionary."""
+    primitive = {'type': kind}
+    for name, value in params.items():
+        value = value[0]
+        primitive[name] = float(value) if np.ndim(value) == 0 else value
+    if kind == "cone":
+        primitive['angle'] = float(np.degrees(primitive['angle']))
+    if kind in ("cylinder", "cone"):
+        origin = primitive['center'] if kind == "cylinder" else primitive['apex']
+        heights = (points - origin) @ primitive['axis']
+        primitive['height'] = float(np.ptp(heights)) if len(heights) else 0.0
+    primitive['points'] = len(points)
+    primitive['faces'] = face_ids
+    primitive['area'] = float(geometry.areas[face_ids].sum())
+    return primitive
+
+
+def fit_primitives(points, normals, face_ids, geometry, kinds=PRIMITIVES, distance_threshold=None,
+                   normal_angle=NORMAL_ANGLE, min_support=MIN_SUPPORT, batch_size=BATCH_SIZE,
+                   batches=BATCHES_PER_ROUND, workers=None, seed=0):
+    """
+    Extract primitives from surface samples one at a time with RANSAC.
+
+    Every round scores batches of local-sample hypotheses of every primitive
+    type on a thread pool, keeps the best one, refits it, assigns it the
+    connected faces that fit it and removes the points on those faces.
+    Batches get their own seeds, so the result does not depend on workers.
+
+    Parameters:
+        points (np.ndarray): (N, 3) surface points.
+        normals (np.ndarray): (N, 3) unit normals of the points.
+        face_ids (np.ndarray): (N,) face each point was sampled from.
+        geometry (FaceGeometry): Face geometry of the mesh.
+        kinds (tuple): Primitive types to look for.
+        distance_threshold (float): Inlier distance in model units; by default
+            DISTANCE_THRESHOLD of the bounding box diagonal.
+        normal_angle (float): Largest inlier normal deviation in degrees.
+        min_support (float): Fewest inliers as a fraction of the points.
+        batch_size (int): Hypotheses per batch.
+        batches (int): Batches per primitive type and round.
+        workers (int): Threads scoring batches; all cores by default.
+        seed (int): Seed of the random sampling.
+
+    Returns:
+        list: One dict per primitive in order of extraction with type, its
+        parameters (see hypotheses; cone angles in degrees, cylinders and
+        cones also with height), points (inlier count), faces (face ids) and area.
+    """
+    points = np.asarray(points, dtype=np.float64)
+    normals = np.asarray(normals, dtype=np.float64)
+    face_ids = np.asarray(face_ids, dtype=np.int64)
+    diagonal = float(np.linalg.norm(np.ptp(points, axis=0)))
+    if distance_threshold is None:
+        distance_threshold = DISTANCE_THRESHOLD * diagonal
+    min_alignment = np.cos(np.radians(normal_angle))
+    min_points = max(int(min_support * len(points)), max(SAMPLE_SIZES.values()) * 2)
+
+    adjacency = face_adjacency(geometry.faces)
+    available = np.ones(len(geometry), dtype=bool)
+    remaining = np.arange(len(points))
+    seeds = np.random.SeedSequence(seed)
+    primitives = []
+    failures = 0
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        while len(remaining) >= min_points and failures < MAX_FAILURES:
+            round_points, round_normals = points[remaining], normals[remaining]
+            octree = PointOctree(round_points)
+            tasks = [(kind, batch_seed) for kind in kinds for batch_seed in seeds.spawn(batches)]
+            results = list(executor.map(
+                lambda task: _score_batch(task[0], round_points, round_normals, octree, task[1], batch_size,
+                                          distance_threshold, min_alignment, diagonal),
+                tasks))
+
+            best = int(np.argmax([score for score, _ in results]))
+            score, params = results[best]
+            kind = tasks[best][0]
+            if score < min_points:
+                failures += 1
+                continue
+
+            inliers = inlier_mask(kind, params, round_points, round_normals, distance_threshold, min_alignment)[0]
+            refined = refit(kind, params, round_points[inliers], round_normals[inliers])
+            refined_inliers = inlier_mask(kind, refined, round_points, round_normals, distance_threshold, min_alignment)[0]
+            if _valid(kind, refined, diagonal)[0] and refined_inliers.sum() >= inliers.sum():
+                params, inliers = refined, refined_inliers
+
+            faces = _face_set(kind, params, geometry, adjacency, available, face_ids[remaining[inliers]],
+                              distance_threshold, min_alignment)
+            on_faces = np.isin(face_ids[remaining], faces)
+            if on_faces.sum() < min_points:
+                failures += 1
+                continue
+
+            available[faces] = False
+            primitives.append(_describe(kind, params, round_points[on_faces], faces, geometry))
+            remaining = remaining[~on_faces]
+            failures = 0
+
+    return primitives
+
+
+def primitive_records(primitives):
+    """Convert primitives to JSON-serializable dictionaries (arrays become lists)."""
+    return [
+        {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in primitive.items()}
+        for primitive in primitives
+    ]
+
+
+def mesh_primitives(mesh, count=SAMPLE_COUNT, seed=0, method="area", **kwargs):
+    """
+    Sample a trimesh mesh and fit primitives to it.
+
+    Parameters:
+        mesh (trimesh.Trimesh): The mesh.
+        count (int): Number of surface samples.
+        seed (int): Seed of the sampling and of the RANSAC.
+        method (str): Sampling method of point_sampling.sample_mesh; "poisson"
+            spreads the budget evenly so small features get their share.
+        **kwargs: Further options of fit_primitives.
+
+    Returns:
+        list: Primitives as returned by fit_primitives.
+    """
+    samples = sample_mesh(mesh, method, count=count, seed=seed)
+    return fit_primitives(samples.points, samples.normals, samples.face_ids, mesh_face_geometry(mesh), seed=seed, **kwargs)
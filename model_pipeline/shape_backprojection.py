@@ -0,0 +1,148 @@
+# shape_backprojection.py links 2D shapes found in a projection back to the mesh faces that produced them. The projected triangles' bounding boxes are indexed in an STRtree, so all shapes are matched with one bulk query that only visits nearby faces, and the candidates are confirmed with exact triangle intersection tests. Raster contours are first mapped from pixels back to plane coordinates with the RasterGrid used to trace them. Each shape then gets its contributing face ids and true 3D extent, and its outline can be lifted into 3D for overlays on the model.
+import numpy as np
+import shapely
+from shapely import STRtree
+
+# Model axes kept by each projection of project_to_2d_planes
+PLANE_AXES = {"XY Plane": (0, 1), "XZ Plane": (0, 2), "YZ Plane": (1, 2)}
+
+
+class ProjectedFaceIndex:
+    """
+    Spatial index over the triangles of a mesh projected onto an axis plane.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        axes (tuple): The two model axes of the plane, e.g. (0, 2) for XZ.
+    """
+
+    def __init__(self, vertices, faces, axes):
+        self.vertices = np.asarray(vertices, dtype=np.float64)
+        self.faces = np.asarray(faces, dtype=np.int64)
+        self.axes = tuple(axes)
+        self.triangles = self.vertices[self.faces][:, :, list(self.axes)]
+        lower = self.triangles.min(axis=1)
+        upper = self.triangles.max(axis=1)
+        self.tree = STRtree(shapely.box(lower[:, 0], lower[:, 1], upper[:, 0], upper[:, 1]))
+
+    def match(self, shapes, tolerance=0.0):
+        """
+        Find the faces whose projection intersects (or lies within tolerance of) each shape.
+
+        Parameters:
+            shapes (array-like): Shapely geometries in plane coordinates.
+            tolerance (float): Distance in plane units within which a face
+                still counts, e.g. one pixel for raster contours, which run
+                half a pixel inside the silhouette.
+
+        Returns:
+            np.ndarray: (2, M) pairs of (shape index, face index), sorted by shape.
+        """
+        shapes = np.asarray(shapes, dtype=object).ravel()
+        if not len(shapes):
+            return np.zeros((2, 0), dtype=np.int64)
+        shapely.prepare(shapes)
+
+        # Bounding box candidates for all shapes in one query
+        if tolerance > 0:
+            shape_ids, face_ids = self.tree.query(shapes, predicate='dwithin', distance=tolerance)
+        else:
+            shape_ids, face_ids = self.tree.query(shapes, predicate='intersects')
+        if not len(face_ids):
+            return np.zeros((2, 0), dtype=np.int64)
+
+        # Exact test against the candidate triangles only; triangles seen edge-on
+        # have no area but their edges still give the right distance
+        candidates = self.triangles[face_ids]
+        triangles = shapely.polygons(np.concatenate([candidates, candidates[:, :1]], axis=1))
+        if tolerance > 0:
+            hit = shapely.dwithin(shapes[shape_ids], triangles, tolerance)
+        else:
+            hit = shapely.intersects(shapes[shape_ids], triangles)
+        pairs = np.stack([shape_ids[hit], face_ids[hit]])
+        return pairs[:, np.lexsort((pairs[1], pairs[0]))]
+
+
+def shapes_to_plane(shapes, grid):
+    """Map shapes traced in pixel coordinates back to plane coordinates with their RasterGrid."""
+    return shapely.transform(np.asarray(shapes, dtype=object), grid.to_plane)
+
+
+def backproject_shapes(shapes, vertices, faces, axes, grid=None, index=None, tolerance=None):
+    """
+    Match 2D shapes to the faces that produced them.
+
+    Parameters:
+        shapes (list): Shapely Polygons in plane coordinates, or in pixel
+            coordinates of grid when one is given.
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        axes (tuple): The two model axes of the projection plane.
+        grid (RasterGrid): Raster the shapes were traced on, or None.
+        index (ProjectedFaceIndex): Reused index for the same mesh and plane.
+        tolerance (float): Match distance in plane units; one pixel of grid by default.
+
+    Returns:
+        list: One dict per shape with "shape" (in plane coordinates),
+        "face_ids" (np.ndarray) and "min"/"max" (3D extent of those faces,
+        None when no face matched).
+    """
+    shapes = np.asarray(shapes, dtype=object).ravel()
+    if grid is not None:
+        shapes = shapes_to_plane(shapes, grid)
+    if tolerance is None:
+        tolerance = grid.pixel_size if grid is not None else 0.0
+    if index is None:
+        index = ProjectedFaceIndex(vertices, faces, axes)
+
+    shape_ids, face_ids = index.match(shapes, tolerance)
+    corners = index.vertices[index.faces[face_ids]]
+    boundaries = np.searchsorted(shape_ids, np.arange(len(shapes) + 1))
+
+    matches = []
+    for shape_id, shape in enumerate(shapes):
+        start, stop = boundaries[shape_id], boundaries[shape_id + 1]
+        shape_corners = corners[start:stop].reshape(-1, 3)
+        matches.append({
+            "shape": shape,
+            "face_ids": face_ids[start:stop],
+            "min": shape_corners.min(axis=0) if stop > start else None,
+            "max": shape_corners.max(axis=0) if stop > start else None,
+        })
+    return matches
+
+
+def face_labels(matches, face_count):
+    """
+    Label every face with the shape it belongs to.
+
+    Where shapes overlap (an outline and the holes inside it), the smaller
+    shape wins. Faces outside every shape get -1.
+    """
+    labels = np.full(face_count, -1, dtype=np.int64)
+    areas = [match["shape"].area for match in matches]
+    for shape_id in np.argsort(areas, kind='stable')[::-1]:
+        labels[matches[shape_id]["face_ids"]] = shape_id
+    return labels
+
+
+def lift_outline(match, axes, side="max"):
+    """
+    Place a shape's exterior in 3D on the near or far side of its faces.
+
+    Parameters:
+        match (dict): Entry of backproject_shapes.
+        axes (tuple): The two model axes of the projection plane.
+        side (str): "max" or "min" along the projection direction.
+
+    Returns:
+        np.ndarray: (K, 3) outline points in model coordinates.
+    """
+    coords = np.asarray(match["shape"].exterior.coords)
+    depth_axis = 3 - sum(axes)
+    points = np.zeros((len(coords), 3))
+    points[:, list(axes)] = coords
+    extent = match[side]
+    points[:, depth_axis] = extent[depth_axis] if extent is not None else 0.0
+    return points
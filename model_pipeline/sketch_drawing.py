@@ -0,0 +1,408 @@
+# sketch_drawing.py turns a mesh into a line drawing in the style of a technical sketch. Only the edges a draughtsman would draw are kept (boundary edges, sharp creases and the silhouette edges between front- and back-facing triangles), and each is split into visible and hidden runs by sampling it against a depth buffer rasterized with NumPy for the whole mesh at once. The runs go into a single Line3DCollection (solid when visible, dashed when hidden) or a two-path SVG, and only the dimensions that describe the part are labelled: its overall extents and the distinct hole and boss diameters.
+import numpy as np
+from scipy import ndimage
+
+from circle_features import SHARP_ANGLE, detect_circles, edge_faces
+from face_geometry import FaceGeometry, mesh_face_geometry
+
+# Matplotlib's default 3D view
+ELEVATION = 30.0
+AZIMUTH = -60.0
+# Pixels along the longer side of the depth buffer
+DEPTH_RESOLUTION = 1024
+# Candidate pixels rasterized per pass, which bounds the temporary arrays
+RASTER_CHUNK = 4_000_000
+# Edges are tested for visibility about once per pixel of their projected length
+SAMPLES_PER_PIXEL = 1.0
+# Depth slack, relative to the model extent, before a surface counts as in front of an edge
+DEPTH_BIAS = 1e-3
+# Distinct hole and boss diameters labelled, largest first
+MAX_CIRCLE_LABELS = 5
+EDGE_KINDS = ("boundary", "sharp", "silhouette")
+
+
+class SketchDrawing:
+    """
+    Visible and hidden feature-edge runs of a mesh seen from one direction.
+
+    Attributes:
+        segments (np.ndarray): (M, 2, 3) end points of every run in model coordinates.
+        screen (np.ndarray): (M, 2, 2) the same end points in view coordinates
+            (right, up), in model units.
+        hidden (np.ndarray): (M,) True for runs behind the surface.
+        kinds (np.ndarray): (M,) index into EDGE_KINDS of the edge each run belongs to.
+        dimensions (list): Dicts with the position (model coordinates) and
+            text of every dimension label.
+        elevation, azimuth (float): View angles in degrees, as for Axes3D.view_init.
+    """
+
+    def __init__(self, segments, screen, hidden, kinds, dimensions, elevation, azimuth):
+        self.segments = segments
+        self.screen = screen
+        self.hidden = hidden
+        self.kinds = kinds
+        self.dimensions = dimensions
+        self.elevation = elevation
+        self.azimuth = azimuth
+
+    def __len__(self):
+        return len(self.segments)
+
+
+def view_axes(elevation=ELEVATION, azimuth=AZIMUTH):
+    """
+    Return the orthographic camera of an Axes3D view.
+
+    Returns:
+        tuple: (right, up, eye) unit vectors; eye points from the model
+        towards the viewer, so larger eye components are nearer.
+    """
+    elevation, azimuth = np.radians(elevation), np.radians(azimuth)
+    eye = np.array([np.cos(elevation) * np.cos(azimuth), np.cos(elevation) * np.sin(azimuth), np.sin(elevation)])
+    right = np.array([-np.sin(azimuth), np.cos(azimuth), 0.0])
+    return right, np.cross(eye, right), eye
+
+
+def drawing_edges(faces, normals, eye, sharp_angle=SHARP_ANGLE):
+    """
+    Select the edges of a line drawing.
+
+    Parameters:
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        normals (np.ndarray): (F, 3) unit face normals.
+        eye (np.ndarray): (3,) direction towards the viewer.
+        sharp_angle (float): Dihedral angle in degrees above which an edge is a crease.
+
+    Returns:
+        tuple: (edges, kinds) with (K, 2) vertex pairs and (K,) indices into
+        EDGE_KINDS. Non-manifold edges count as boundary edges.
+    """
+    edges, face_ids, starts = edge_faces(faces)
+    counts = np.diff(starts)
+    first = normals[face_ids[starts[:-1]]]
+    second = normals[face_ids[starts[:-1] + (counts > 1)]]
+
+    kinds = np.full(len(edges), -1, dtype=np.int64)
+    facing = np.sign(first @ eye) != np.sign(second @ eye)
+    kinds[(counts == 2) & facing] = EDGE_KINDS.index("silhouette")
+    kinds[(counts == 2) & ((first * second).sum(axis=1) < np.cos(np.radians(sharp_angle)))] = EDGE_KINDS.index("sharp")
+    kinds[counts != 2] = EDGE_KINDS.index("boundary")
+    keep = kinds >= 0
+    return edges[keep], kinds[keep]
+
+
+def depth_buffer(pixels, depth, faces, shape, return_faces=False):
+    """
+    Rasterize the nearest surface depth of every pixel.
+
+    Every triangle is cut into the row spans its pixel centres cover, the
+    spans are expanded to pixels and the triangle's depth plane is evaluated
+    there; np.minimum.at keeps the nearest value per pixel. Triangles are
+    processed in passes of about RASTER_CHUNK pixels, and a fragment that
+    equals the buffer after its own pass is the nearest so far, which is
+    how the face of every pixel is tracked.
+
+    Parameters:
+        pixels (np.ndarray): (V, 2) vertex positions in pixel units (column, row).
+        depth (np.ndarray): (V,) distance of every vertex from the viewer.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        shape (tuple): (rows, cols) of the buffer.
+        return_faces (bool): Also return the face seen in every pixel.
+
+    Returns:
+        np.ndarray: (rows, cols) depth per pixel, inf where no surface is seen;
+        with return_faces, a tuple of it and the (rows, cols) face ids (-1 where empty).
+    """
+    rows, cols = shape
+    buffer = np.full(rows * cols, np.inf)
+    face_ids = np.full(rows * cols, -1, dtype=np.int64) if return_faces else None
+    triangles = pixels[faces]
+    corner_depths = depth[faces]
+    a, b, c = triangles[:, 0], triangles[:, 1], triangles[:, 2]
+    area = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0])
+
+    # Triangles seen edge-on cover no area and are left out
+    keep = np.abs(area) > 1e-12
+    area = np.where(keep, area, 1.0)
+    # Depth = depth_a + gradient . (pixel - a)
+    dz1, dz2 = corner_depths[:, 1] - corner_depths[:, 0], corner_depths[:, 2] - corner_depths[:, 0]
+    gradient = np.column_stack([
+        (dz1 * (c[:, 1] - a[:, 1]) - dz2 * (b[:, 1] - a[:, 1])) / area,
+        (dz2 * (b[:, 0] - a[:, 0]) - dz1 * (c[:, 0] - a[:, 0])) / area,
+    ])
+
+    first_row = np.clip(np.ceil(triangles[:, :, 1].min(axis=1)), 0, rows - 1).astype(np.int64)
+    last_row = np.clip(np.floor(triangles[:, :, 1].max(axis=1)), 0, rows - 1).astype(np.int64)
+    row_counts = np.where(keep, np.maximum(last_row - first_row + 1, 0), 0)
+    # Pixels covered plus one per row and column, an upper bound of the pixels of a pass
+    estimate = np.abs(area) / 2 + row_counts + np.ptp(triangles[:, :, 0], axis=1) + 1
+    ids = np.flatnonzero(row_counts)
+    bounds = np.searchsorted(np.cumsum(estimate[ids]), np.arange(RASTER_CHUNK, estimate[ids].sum(), RASTER_CHUNK))
+
+    for chunk in np.split(ids, np.unique(bounds)):
+        if not len(chunk):
+            continue
+        # One (triangle, row) pair per scanline crossing the triangle
+        counts = row_counts[chunk]
+        triangle = np.repeat(chunk, counts)
+        y = first_row[triangle] + np.arange(int(counts.sum())) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        # The span runs between the crossings of the row with the triangle's edges
+        start, stop = triangles[triangle], np.roll(triangles[triangle], -1, axis=1)
+        rise = stop[:, :, 1] - start[:, :, 1]
+        crosses = (start[:, :, 1] - y[:, None]) * (stop[:, :, 1] - y[:, None]) <= 0
+        crosses &= rise != 0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            x = start[:, :, 0] + (y[:, None] - start[:, :, 1]) * (stop[:, :, 0] - start[:, :, 0]) / rise
+        first = np.ceil(np.where(crosses, x, np.inf).min(axis=1) - 1e-9)
+        last = np.floor(np.where(crosses, x, -np.inf).max(axis=1) + 1e-9)
+        first = np.clip(first, 0, cols).astype(np.int64)
+        last = np.clip(last, -1, cols - 1).astype(np.int64)
+        spans = np.maximum(last - first + 1, 0)
+
+        pair = np.repeat(np.arange(len(triangle)), spans)
+        x = first[pair] + np.arange(int(spans.sum())) - np.repeat(np.cumsum(spans) - spans, spans)
+        y, triangle = y[pair], triangle[pair]
+        values = (corner_depths[triangle, 0] + gradient[triangle, 0] * (x - a[triangle, 0])
+                  + gradient[triangle, 1] * (y - a[triangle, 1]))
+        index = y * cols + x
+        np.minimum.at(buffer, index, values)
+        if return_faces:
+            nearest = values <= buffer[index]
+            face_ids[index[nearest]] = triangle[nearest]
+    if return_faces:
+        return buffer.reshape(rows, cols), face_ids.reshape(rows, cols)
+    return buffer.reshape(rows, cols)
+
+
+def visible_runs(starts, ends, depths, buffer, bias):
+    """
+    Split edges into maximal visible and hidden runs.
+
+    Each edge is cut into pieces about one pixel long and the midpoint of
+    every piece is compared with the farthest surface of the 3x3 pixels
+    around it, so an edge is not hidden by the faces it bounds.
+
+    Parameters:
+        starts, ends (np.ndarray): (K, 2) edge end points in pixel units.
+        depths (np.ndarray): (K, 2) viewer distance of both end points.
+        buffer (np.ndarray): Output of depth_buffer.
+        bias (float): Depth slack in the units of depths.
+
+    Returns:
+        tuple: (edge, t_start, t_end, hidden) per run, with the run's span as
+        fractions of its edge.
+    """
+    lengths = np.linalg.norm(ends - starts, axis=1)
+    pieces = np.maximum(np.ceil(lengths * SAMPLES_PER_PIXEL), 1).astype(np.int64)
+    edge = np.repeat(np.arange(len(starts)), pieces)
+    index = np.arange(int(pieces.sum())) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    t = (index + 0.5) / pieces[edge]
+
+    position = starts[edge] + t[:, None] * (ends[edge] - starts[edge])
+    sample_depth = depths[edge, 0] + t * (depths[edge, 1] - depths[edge, 0])
+    rows, cols = buffer.shape
+    column = np.clip(np.rint(position[:, 0]).astype(np.int64), 0, cols - 1)
+    row = np.clip(np.rint(position[:, 1]).astype(np.int64), 0, rows - 1)
+    farthest = ndimage.maximum_filter(buffer, size=3)
+    hidden = sample_depth > farthest[row, column] + bias
+
+    run_start = np.flatnonzero(np.r_[True, (edge[1:] != edge[:-1]) | (hidden[1:] != hidden[:-1])])
+    run_stop = np.r_[run_start[1:], len(edge)] - 1
+    run_edge = edge[run_start]
+    return (run_edge, index[run_start] / pieces[run_edge], (index[run_stop] + 1) / pieces[run_edge],
+            hidden[run_start])
+
+
+def key_dimensions(vertices, circles, max_circles=MAX_CIRCLE_LABELS):
+    """
+    Choose the dimension labels of a drawing.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        circles (list): Output of detect_circles.
+        max_circles (int): Most distinct diameters to label.
+
+    Returns:
+        list: Dicts with position and text: the three overall extents,
+        placed at the middle of a bounding-box edge, then one label per
+        distinct diameter (to 0.01 units) at the rim of its largest circle.
+    """
+    lower, upper = vertices.min(axis=0), vertices.max(axis=0)
+    labels = []
+    for axis, name in enumerate("XYZ"):
+        position = lower.copy()
+        position[axis] = (lower[axis] + upper[axis]) / 2
+        labels.append({'position': position, 'text': f"{name} {upper[axis] - lower[axis]:.2f}"})
+
+    seen = set()
+    for circle in circles:
+        diameter = round(circle['diameter'], 2)
+        if diameter in seen:
+            continue
+        seen.add(diameter)
+        # A point on the rim: any direction perpendicular to the axis
+        axis = np.asarray(circle['axis'], dtype=np.float64)
+        radial = np.cross(axis, [1.0, 0.0, 0.0] if abs(axis[0]) < 0.9 else [0.0, 1.0, 0.0])
+        radial /= np.linalg.norm(radial)
+        labels.append({'position': circle['center'] + circle['radius'] * radial, 'text': f"Ø{diameter:.2f}"})
+        if len(seen) == max_circles:
+            break
+    return labels
+
+
+def sketch_drawing(vertices, faces, elevation=ELEVATION, azimuth=AZIMUTH, resolution=DEPTH_RESOLUTION,
+                   sharp_angle=SHARP_ANGLE, dimensions=True, geometry=None):
+    """
+    Compute the hidden-line drawing of a mesh.
+
+    Parameters:
+        vertices (np.ndarray): (V, 3) mesh vertices.
+        faces (np.ndarray): (F, 3) vertex indices per face.
+        elevation, azimuth (float): View angles in degrees, as for Axes3D.view_init.
+        resolution (int): Pixels along the longer side of the depth buffer.
+        sharp_angle (float): Dihedral angle in degrees above which an edge is drawn.
+        dimensions (bool): Label the overall extents and the hole and boss diameters.
+        geometry (FaceGeometry): Precomputed face geometry of the mesh.
+
+    Returns:
+        SketchDrawing: The drawing.
+    """
+    vertices = np.asarray(vertices, dtype=np.float64)
+    faces = np.asarray(faces, dtype=np.int64)
+    if geometry is None:
+        geometry = FaceGeometry(vertices, faces)
+    right, up, eye = view_axes(elevation, azimuth)
+    normals = geometry.normals.astype(np.float64)
+
+    screen = np.column_stack([vertices @ right, vertices @ up])
+    depth = -(vertices @ eye)
+    origin = screen.min(axis=0)
+    extent = float(np.ptp(screen, axis=0).max()) or 1.0
+    pixel_size = extent / (resolution - 3)
+    # One empty pixel around the model, with the rows running upwards
+    pixels = (screen - origin) / pixel_size + 1
+    shape = tuple(np.ceil(np.ptp(screen, axis=0)[::-1] / pixel_size).astype(np.int64) + 3)
+    buffer = depth_buffer(pixels, depth, faces, shape)
+
+    edges, kinds = drawing_edges(faces, normals, eye, sharp_angle)
+    bias = DEPTH_BIAS * float(np.ptp(vertices, axis=0).max() or 1.0)
+    run_edge, t_start, t_end, hidden = visible_runs(pixels[edges[:, 0]], pixels[edges[:, 1]], depth[edges], buffer, bias)
+
+    first, second = vertices[edges[run_edge, 0]], vertices[edges[run_edge, 1]]
+    segments = np.stack([first + t_start[:, None] * (second - first), first + t_end[:, None] * (second - first)], axis=1)
+    labels = key_dimensions(vertices, detect_circles(vertices, faces, geometry=geometry)) if dimensions else []
+    return SketchDrawing(segments, segments @ np.column_stack([right, up]), hidden, kinds[run_edge], labels,
+                         elevation, azimuth)
+
+
+def mesh_sketch(mesh, **kwargs):
+    """
+    sketch_drawing for a trimesh or Open3D mesh, reusing its shared FaceGeometry.
+
+    Parameters:
+        mesh: trimesh.Trimesh or open3d.geometry.TriangleMesh.
+        **kwargs: Options of sketch_drawing.
+
+    Returns:
+        SketchDrawing: The drawing.
+    """
+    geometry = mesh_face_geometry(mesh)
+    return sketch_drawing(geometry.vertices, geometry.faces, geometry=geometry, **kwargs)
+
+
+def plot_sketch(drawing, ax=None, show_hidden=True, color='k', hidden_color='0.6'):
+    """
+    Draw a sketch on a 3D axis with one Line3DCollection.
+
+    The axis gets the drawing's view, an orthographic projection and equal
+    scaling, so the hidden runs match what the axis shows.
+
+    Parameters:
+        drawing (SketchDrawing): Output of sketch_drawing.
+        ax (Axes3D): Axis to draw on; a new figure is created when None.
+        show_hidden (bool): Draw the hidden runs dashed instead of leaving them out.
+        color, hidden_color: Colors of the visible and hidden runs.
+
+    Returns:
+        Axes3D: The axis.
+    """
+    import matplotlib.pyplot as plt
+    from mpl_toolkits.mplot3d.art3d import Line3DCollection
+
+    if ax is None:
+        ax = plt.figure().add_subplot(111, projection='3d')
+    keep = np.ones(len(drawing), dtype=bool) if show_hidden else ~drawing.hidden
+    hidden = drawing.hidden[keep]
+    ax.add_collection3d(Line3DCollection(
+        drawing.segments[keep],
+        colors=np.where(hidden, hidden_color, color),
+        linestyles=[(0, (4, 3)) if value else 'solid' for value in hidden],
+        linewidths=np.where(hidden, 0.6, 1.0),
+    ))
+    for label in drawing.dimensions:
+        ax.text(*label['position'], label['text'], color='red', fontsize=8)
+
+    points = drawing.segments.reshape(-1, 3)
+    if len(points):
+        lower, upper = points.min(axis=0), points.max(axis=0)
+        ax.set_xlim(lower[0], upper[0])
+        ax.set_ylim(lower[1], upper[1])
+        ax.set_zlim(lower[2], upper[2])
+        ax.set_box_aspect(np.maximum(upper - lower, 1e-9 * float((upper - lower).max() or 1.0)))
+    ax.set_proj_type('ortho')
+    ax.view_init(drawing.elevation, drawing.azimuth)
+    ax.set_xlabel('X axis')
+    ax.set_ylabel('Y axis')
+    ax.set_zlabel('Z axis')
+    return ax
+
+
+def sketch_svg(drawing, path=None, show_hidden=True, width=800, margin=20):
+    """
+    Export a sketch as an SVG with one path for the visible and one for the hidden runs.
+
+    Parameters:
+        drawing (SketchDrawing): Output of sketch_drawing.
+        path (str): File to write, or None to only return the text.
+        show_hidden (bool): Include the hidden runs as a dashed path.
+        width (int): Width of the drawing area in SVG units; the height follows the view.
+        margin (int): Empty border in SVG units.
+
+    Returns:
+        str: The SVG document.
+    """
+    screen = drawing.screen.reshape(-1, 2)
+    lower = screen.min(axis=0) if len(screen) else np.zeros(2)
+    extent = np.ptp(screen, axis=0) if len(screen) else np.ones(2)
+    scale = width / (float(extent[0]) or 1.0)
+    height = int(np.ceil(float(extent[1]) * scale))
+
+    def to_svg(points):
+        # SVG rows run downwards
+        return np.column_stack([(points[:, 0] - lower[0]) * scale + margin,
+                                (lower[1] + extent[1] - points[:, 1]) * scale + margin])
+
+    def path_data(segments):
+        ends = to_svg(segments.reshape(-1, 2)).reshape(-1, 4)
+        return " ".join(f"M{x0:.2f} {y0:.2f}L{x1:.2f} {y1:.2f}" for x0, y0, x1, y1 in ends)
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width + 2 * margin}" height="{height + 2 * margin}">',
+        f'<path d="{path_data(drawing.screen[~drawing.hidden])}" stroke="black" stroke-width="1" fill="none" '
+        f'stroke-linecap="round"/>',
+    ]
+    if show_hidden and drawing.hidden.any():
+        parts.append(f'<path d="{path_data(drawing.screen[drawing.hidden])}" stroke="#999" stroke-width="0.6" '
+                     f'fill="none" stroke-dasharray="4 3"/>')
+    right, up, _ = view_axes(drawing.elevation, drawing.azimuth)
+    for label in drawing.dimensions:
+        x, y = to_svg(np.array([[label['position'] @ right, label['position'] @ up]]))[0]
+        parts.append(f'<text x="{x:.2f}" y="{y:.2f}" font-size="10" fill="red">{label["text"]}</text>')
+    parts.append('</svg>')
+
+    svg = "\n".join(parts)
+    if path is not None:
+        with open(path, "w", encoding="utf-8") as handle:
+            handle.write(svg)
+    return svg
@@ -0,0 +1,235 @@
+# stl_reader.py reads binary and ASCII STL files into NumPy arrays without any per-triangle Python work. Binary files are memory-mapped as a structured view (normal, 3 vertices, attribute) and duplicate corner vertices are welded with a vectorized hash. The resulting vertex and face arrays can be wrapped as trimesh, Open3D or PyVista meshes so every pipeline stage loads STLs through the same fast path.
+import os
+
+import numpy as np
+
+HEADER_SIZE = 80
+COUNT_SIZE = 4
+
+# Layout of one binary STL record (50 bytes, little endian)
+STL_DTYPE = np.dtype([
+    ('normal', '<f4', (3,)),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
+
+# Default rounding used when welding, matching the merge tolerance of trimesh (1e-8)
+WELD_DIGITS = 8
+
+# Odd 64-bit constants used to mix the three coordinate bit patterns into one hash
+_HASH_PRIMES = np.array([0x9E3779B185EBCA87, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+
+
+class StlMesh:
+    """
+    Triangle mesh read from an STL file.
+
+    Attributes:
+        vertices (np.ndarray): (V, 3) float32 array of welded vertices.
+        faces (np.ndarray): (F, 3) int64 array of vertex indices per triangle.
+        face_normals (np.ndarray): (F, 3) float32 array of the normals stored in the file.
+        records (np.ndarray): Structured STL_DTYPE view of the file for binary STLs, None for ASCII.
+    """
+
+    def __init__(self, vertices, faces, face_normals, records=None):
+        self.vertices = vertices
+        self.faces = faces
+        self.face_normals = face_normals
+        self.records = records
+
+    @property
+    def triangles(self):
+        """(F, 3, 3) array of the corner coordinates of every triangle."""
+        return self.vertices[self.faces]
+
+    def to_trimesh(self):
+        """Wrap the arrays as a trimesh.Trimesh without re-processing them."""
+        import trimesh
+        return trimesh.Trimesh(vertices=np.asarray(self.vertices, dtype=np.float64), faces=self.faces, process=False)
+
+    def to_open3d(self):
+        """Wrap the arrays as an open3d.geometry.TriangleMesh."""
+        import open3d as o3d
+        mesh = o3d.geometry.TriangleMesh(
+            o3d.utility.Vector3dVector(np.asarray(self.vertices, dtype=np.float64)),
+            o3d.utility.Vector3iVector(np.asarray(self.faces, dtype=np.int32)),
+        )
+        return mesh
+
+    def to_pyvista(self):
+        """Wrap the arrays as a pyvista.PolyData."""
+        import pyvista as pv
+        cells = np.column_stack([np.full(len(self.faces), 3, dtype=self.faces.dtype), self.faces]).ravel()
+        return pv.PolyData(np.asarray(self.vertices, dtype=np.float64), cells)
+
+
+def _read_source(source):
+    """Return (path, data) where exactly one is set for a path, bytes or file-like source."""
+    if isinstance(source, (str, os.PathLike)):
+        return os.fspath(source), None
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return None, source
+    if hasattr(source, "getbuffer"):
+        return None, source.getbuffer()
+    return None, source.read()
+
+
+def _binary_face_count(size, head):
+    """Return the triangle count if the size matches a binary STL, otherwise None."""
+    if size < HEADER_SIZE + COUNT_SIZE:
+        return None
+    count = int(np.frombuffer(head, dtype='<u4', count=1, offset=HEADER_SIZE)[0])
+    if size == HEADER_SIZE + COUNT_SIZE + count * STL_DTYPE.itemsize:
+        return count
+    return None
+
+
+def read_stl_records(source):
+    """
+    Read the raw triangle records of an STL file.
+
+    Binary files are mapped (from disk) or viewed (from memory) as a structured
+    STL_DTYPE array without copying. ASCII files are tokenized in one pass.
+    Files whose header starts with "solid" but whose size matches the binary
+    layout are read as binary, as several CAD exporters write such headers.
+
+    Parameters:
+        source (str, bytes or file-like): Path to the STL file or its contents.
+
+    Returns:
+        tuple: (triangles, normals, records) where triangles is an (F, 3, 3) float32
+        array, normals is an (F, 3) float32 array and records is the structured
+        view for binary files (None for ASCII).
+    """
+    path, data = _read_source(source)
+
+    if path is not None:
+        size = os.path.getsize(path)
+        with open(path, 'rb') as stl_file:
+            head = stl_file.read(HEADER_SIZE + COUNT_SIZE)
+    else:
+        size = len(data)
+        head = bytes(data[:HEADER_SIZE + COUNT_SIZE])
+
+    count = _binary_face_count(size, head)
+    if count is not None:
+        if count == 0:
+            records = np.zeros(0, dtype=STL_DTYPE)
+        elif path is not None:
+            records = np.memmap(path, dtype=STL_DTYPE, mode='r', offset=HEADER_SIZE + COUNT_SIZE, shape=(count,))
+        else:
+            records = np.frombuffer(data, dtype=STL_DTYPE, count=count, offset=HEADER_SIZE + COUNT_SIZE)
+        return records['vertices'], records['normal'], records
+
+    if not head.lstrip().lower().startswith(b'solid'):
+        raise ValueError("Not a valid binary or ASCII STL file")
+
+    if data is None:
+        with open(path, 'rb') as stl_file:
+            data = stl_file.read()
+    triangles, normals = _parse_ascii(bytes(data))
+    return triangles, normals, None
+
+
+def _parse_ascii(data):
+    """Parse ASCII STL text into (triangles, normals) with vectorized token indexing."""
+    tokens = np.array(data.split())
+    lowered = np.char.lower(tokens)
+
+    vertex_at = np.flatnonzero(lowered == b'vertex')
+    normal_at = np.flatnonzero(lowered == b'normal')
+    if len(vertex_at) % 3 != 0:
+        raise ValueError("ASCII STL has an incomplete facet")
+
+    offsets = np.arange(1, 4)
+    triangles = tokens[vertex_at[:, None] + offsets].astype(np.float32).reshape(-1, 3, 3)
+    if len(normal_at) == len(triangles):
+        normals = tokens[normal_at[:, None] + offsets].astype(np.float32)
+    else:
+        normals = np.zeros((len(triangles), 3), dtype=np.float32)
+    return triangles, normals
+
+
+def weld_vertices(corners, digits=None):
+    """
+    Merge identical corner coordinates into a shared vertex array.
+
+    Every corner is hashed from the bit pattern of its three coordinates, the
+    hashes are grouped with np.unique and any hash collision is detected and
+    resolved exactly, so no Python loop over vertices or triangles is needed.
+
+    Parameters:
+        corners (np.ndarray): (N, 3) array of corner coordinates.
+        digits (int): If given, coordinates are rounded to this many decimals
+            before welding so nearly identical vertices merge as well.
+
+    Returns:
+        tuple: (vertices, inverse) where vertices is the (V, 3) array of unique
+        vertices in first-seen order and inverse maps every corner to its vertex.
+    """
+    corners = np.ascontiguousarray(corners, dtype=np.float32)
+    keys = corners if digits is None else np.round(corners, digits)
+    # Fold -0.0 into 0.0 so both zeros share a bit pattern
+    keys = keys + np.float32(0.0)
+
+    bits = keys.view(np.uint32).astype(np.uint64)
+    hashes = bits * _HASH_PRIMES
+    hashes = hashes[:, 0] ^ (hashes[:, 1] >> np.uint64(1)) ^ (hashes[:, 2] << np.uint64(1))
+
+    _, first, inverse = np.unique(hashes, return_index=True, return_inverse=True)
+    inverse = inverse.ravel()
+
+    if not np.array_equal(bits[first[inverse]], bits):
+        # Hash collision: fall back to exact grouping on the raw coordinate bytes
+        rows = np.ascontiguousarray(bits).view(np.dtype((np.void, bits.dtype.itemsize * 3))).ravel()
+        _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+        inverse = inverse.ravel()
+
+    # Renumber vertices in order of first appearance to keep face winding stable
+    order = np.argsort(first, kind='stable')
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    vertices = corners[first[order]]
+    return vertices, rank[inverse]
+
+
+def load_stl(source, digits=WELD_DIGITS, drop_degenerate=False):
+    """
+    Load an STL file into welded vertex and face arrays.
+
+    Parameters:
+        source (str, bytes or file-like): Path to the STL file or its contents,
+            e.g. a Streamlit upload, so no temporary file is needed.
+        digits (int): Rounding used when welding vertices, None for exact bit matches.
+        drop_degenerate (bool): Remove triangles that reference the same vertex twice.
+
+    Returns:
+        StlMesh: The welded mesh.
+    """
+    triangles, normals, records = read_stl_records(source)
+
+    vertices, inverse = weld_vertices(triangles.reshape(-1, 3), digits=digits)
+    faces = inverse.reshape(-1, 3).astype(np.int64)
+    normals = np.asarray(normals)
+
+    if drop_degenerate and len(faces):
+        keep = (faces[:, 0] != faces[:, 1]) & (faces[:, 1] != faces[:, 2]) & (faces[:, 0] != faces[:, 2])
+        faces = faces[keep]
+        normals = normals[keep]
+
+    return StlMesh(vertices, faces, normals, records)
+
+
+def load_trimesh(source, digits=WELD_DIGITS):
+    """Load an STL through the fast path and return it as a trimesh.Trimesh."""
+    return load_stl(source, digits=digits).to_trimesh()
+
+
+def load_open3d(source, digits=WELD_DIGITS):
+    """Load an STL through the fast path and return it as an open3d TriangleMesh."""
+    return load_stl(source, digits=digits).to_open3d()
+
+
+def load_pyvista(source, digits=WELD_DIGITS):
+    """Load an STL through the fast path and return it as a pyvista.PolyData."""
+    return load_stl(source, digits=digits).to_pyvista()
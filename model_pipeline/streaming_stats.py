@@ -0,0 +1,210 @@
+# streaming_stats.py accumulates summary statistics of a stream of values (such as curvatures) without holding the whole stream in memory. A StreamingStats keeps the count, mean and variance (Welford's algorithm in its chunked form by Chan et al.), the minimum and maximum, and a QuantileSketch for approximate percentiles. States are small, picklable and mergeable, so chunks, files and worker processes can be summarised independently and combined afterwards.
+import math
+
+import numpy as np
+
+# Rows per chunk when a large array is consumed in pieces
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+
+def iter_chunks(values, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield consecutive slices of an array (or np.memmap) of at most chunk_size rows."""
+    for start in range(0, len(values), chunk_size):
+        yield values[start:start + chunk_size]
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with a relative accuracy guarantee.
+
+    Values are counted in logarithmic buckets (as in DDSketch), so a returned
+    quantile is within relative_accuracy of a true sample value of that rank.
+    Positive and negative values use separate buckets, and values closer to zero
+    than min_value are counted as zero. Merging adds bucket counts, so merging
+    sketches gives the same result as one sketch fed with all the values.
+
+    Parameters:
+        relative_accuracy (float): Maximum relative error of the quantiles.
+        min_value (float): Magnitude below which values count as zero.
+    """
+
+    def __init__(self, relative_accuracy=0.01, min_value=1e-12):
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def _add_buckets(self, buckets, magnitudes):
+        keys = np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64)
+        unique_keys, counts = np.unique(keys, return_counts=True)
+        for key, count in zip(unique_keys.tolist(), counts.tolist()):
+            buckets[key] = buckets.get(key, 0) + count
+
+    def update(self, values):
+        """Add a chunk of finite values to the sketch."""
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if not len(values):
+            return
+        positive = values > self.min_value
+        negative = values < -self.min_value
+        self._add_buckets(self.positive, values[positive])
+        self._add_buckets(self.negative, -values[negative])
+        self.zero_count += int(len(values) - positive.sum() - negative.sum())
+        self.count += len(values)
+
+    def merge(self, other):
+        """Add the counts of another sketch with the same accuracy to this one."""
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge quantile sketches with different accuracies")
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def _bucket_value(self, key):
+        """Representative value of a bucket, within relative_accuracy of all its members."""
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        """
+        Return the approximate q-quantile (0 <= q <= 1), or NaN for an empty sketch.
+        """
+        if self.count == 0:
+            return float("nan")
+        rank = q * (self.count - 1)
+        seen = 0
+        # Negative values from the most negative upwards, then zero, then positive values
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+        return self._bucket_value(max(self.positive)) if self.positive else 0.0
+
+
+class StreamingStats:
+    """
+    Running count, mean, variance, minimum, maximum and quantiles of a value stream.
+
+    Each update() folds a whole chunk in with the parallel form of Welford's
+    algorithm, so the cost per value is a few vectorized NumPy operations and
+    the result does not depend on how the stream was split into chunks.
+    Non-finite values are skipped and counted in `skipped`.
+
+    Parameters:
+        relative_accuracy (float): Relative accuracy of the quantile sketch.
+    """
+
+    def __init__(self, relative_accuracy=0.01):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.skipped = 0
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def _combine(self, count, mean, m2, minimum, maximum):
+        """Fold the moments of another batch into this state (Chan et al.)."""
+        if count == 0:
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta * delta * self.count * count / total
+        self.count = total
+        self.min = min(self.min, minimum)
+        self.max = max(self.max, maximum)
+
+    def update(self, values):
+        """
+        Add a chunk of values.
+
+        Parameters:
+            values (array-like): Any shape; it is flattened.
+
+        Returns:
+            StreamingStats: self, so calls can be chained.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        finite = np.isfinite(values)
+        if not finite.all():
+            self.skipped += int(len(values) - finite.sum())
+            values = values[finite]
+        if len(values):
+            mean = float(values.mean())
+            m2 = float(np.square(values - mean).sum())
+            self._combine(len(values), mean, m2, float(values.min()), float(values.max()))
+            self.sketch.update(values)
+        return self
+
+    def update_chunks(self, chunks):
+        """Add every chunk of an iterable of arrays."""
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other):
+        """Merge another state, e.g. from a different file or worker, into this one."""
+        self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        self.skipped += other.skipped
+        self.sketch.merge(other.sketch)
+        return self
+
+    @property
+    def variance(self):
+        """Population variance (as np.var), NaN when empty."""
+        return self.m2 / self.count if self.count else float("nan")
+
+    @property
+    def std(self):
+        """Population standard deviation (as np.std), NaN when empty."""
+        return math.sqrt(self.variance) if self.count else float("nan")
+
+    def quantile(self, q):
+        """Approximate q-quantile from the sketch."""
+        return self.sketch.quantile(q)
+
+    def summary(self, prefix=""):
+        """
+        Return the statistics as a flat dictionary.
+
+        Parameters:
+            prefix (str): Prepended to every key, e.g. "curvature_".
+
+        Returns:
+            dict: count, mean, std, min, max, p05, median and p95.
+        """
+        empty = self.count == 0
+        return {
+            f"{prefix}count": self.count,
+            f"{prefix}mean": self.mean if not empty else float("nan"),
+            f"{prefix}std": self.std,
+            f"{prefix}min": self.min if not empty else float("nan"),
+            f"{prefix}max": self.max if not empty else float("nan"),
+            f"{prefix}p05": self.quantile(0.05),
+            f"{prefix}median": self.quantile(0.5),
+            f"{prefix}p95": self.quantile(0.95),
+        }
+
+
+def merge_stats(states):
+    """Merge an iterable of StreamingStats into a new state."""
+    merged = None
+    for state in states:
+        if merged is None:
+            merged = StreamingStats(state.sketch.relative_accuracy)
+        merged.merge(state)
+    return merged if merged is not None else StreamingStats()
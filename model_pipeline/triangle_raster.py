@@ -0,0 +1,276 @@
+# triangle_raster.py rasterizes projected mesh triangles into a bit-packed silhouette mask and traces its contours. Triangles are filled with a vectorized scanline pass one band of tiles at a time, so a large grid never exists as a dense array. The pixel size is chosen from the projection extent and a target feature size. Contours are traced only around the tiles the silhouette boundary passes through, so the tracing cost follows the outline rather than the whole grid.
+import numpy as np
+from scipy import ndimage
+from skimage import measure
+
+# Side length in pixels of the square tiles the mask is processed in (a multiple of 8)
+TILE_SIZE = 64
+# Pixels across the target feature size when one is given
+PIXELS_PER_FEATURE = 4
+# Tolerance in pixels for pixel centres lying on a triangle edge
+EDGE_EPSILON = 1e-9
+
+
+class RasterGrid:
+    """
+    Mapping between plane coordinates and the pixels of a raster.
+
+    Pixel (i, j) has its centre at origin + (i, j) * pixel_size, which is also
+    the coordinate system skimage.measure.find_contours reports contours in.
+
+    Attributes:
+        origin (np.ndarray): (2,) plane coordinates of pixel (0, 0).
+        pixel_size (float): Side length of a pixel in plane units.
+        shape (tuple): (rows, cols) of the raster, both multiples of TILE_SIZE.
+    """
+
+    def __init__(self, origin, pixel_size, shape):
+        self.origin = np.asarray(origin, dtype=np.float64)
+        self.pixel_size = float(pixel_size)
+        self.shape = tuple(int(size) for size in shape)
+
+    def to_pixels(self, points):
+        """Convert (N, 2) plane coordinates to fractional pixel coordinates."""
+        return (np.asarray(points, dtype=np.float64) - self.origin) / self.pixel_size
+
+    def to_plane(self, pixels):
+        """Convert (N, 2) pixel coordinates (such as a contour) back to plane coordinates."""
+        return np.asarray(pixels, dtype=np.float64) * self.pixel_size + self.origin
+
+
+def raster_grid(plane_points, img_size=1000, feature_size=None):
+    """
+    Choose the raster for a set of projected points.
+
+    Parameters:
+        plane_points (np.ndarray): (N, 2) projected vertices.
+        img_size (int): Maximum number of pixels along the longer side.
+        feature_size (float): Smallest feature (in plane units) that should be
+            resolved. Without it the longer side gets img_size pixels.
+
+    Returns:
+        RasterGrid: Square pixels with a one pixel empty border around the points.
+    """
+    plane_points = np.asarray(plane_points, dtype=np.float64)
+    min_vals = plane_points.min(axis=0)
+    extent = plane_points.max(axis=0) - min_vals
+    longest = float(extent.max())
+
+    pixel_size = longest / max(img_size - 3, 1)
+    if feature_size:
+        # Only as fine as the feature size needs, never finer than img_size allows
+        pixel_size = max(feature_size / PIXELS_PER_FEATURE, pixel_size)
+    if pixel_size <= 0:
+        pixel_size = 1.0
+
+    # One empty pixel around the points so every contour closes
+    origin = min_vals - pixel_size
+    cells = np.floor(extent / pixel_size).astype(np.int64) + 3
+    shape = -(-cells // TILE_SIZE) * TILE_SIZE
+    return RasterGrid(origin, pixel_size, shape)
+
+
+def _scanline_setup(triangles):
+    """
+    Precompute the scanline parameters of every triangle.
+
+    The corners are sorted by row into top (A), middle (B) and bottom (C), so
+    on any scanline one span end lies on the long edge A-C and the other on
+    A-B above B or on B-C below it.
+
+    Parameters:
+        triangles (np.ndarray): (T, 3, 2) triangles in pixel coordinates.
+
+    Returns:
+        np.ndarray: (T, 7) columns uA, vA, uB, vB and the dv/du slopes of the
+        edges A-B, A-C and B-C (zero for edges parallel to the rows).
+    """
+    order = np.argsort(triangles[:, :, 0], axis=1)
+    corners = np.take_along_axis(triangles, order[:, :, None], axis=1)
+    a, b, c = corners[:, 0], corners[:, 1], corners[:, 2]
+
+    def slope(start, end):
+        du = end[:, 0] - start[:, 0]
+        flat = du <= EDGE_EPSILON
+        return np.where(flat, 0.0, (end[:, 1] - start[:, 1]) / np.where(flat, 1.0, du))
+
+    return np.column_stack([a[:, 0], a[:, 1], b[:, 0], b[:, 1], slope(a, b), slope(a, c), slope(b, c)])
+
+
+def _band_spans(setup, row_first, row_last, row_start, row_stop):
+    """
+    Compute the filled column span of every triangle on every row of a band.
+
+    Parameters:
+        setup (np.ndarray): (T, 7) output of _scanline_setup.
+        row_first, row_last (np.ndarray): (T,) first and last scanline of each triangle.
+        row_start, row_stop (int): Rows of the band.
+
+    Returns:
+        tuple: (rows, first, last) integer arrays, one entry per (triangle, row)
+        pair whose row centre crosses the triangle.
+    """
+    rows_min = np.maximum(row_first, row_start)
+    rows_max = np.minimum(row_last, row_stop - 1)
+    counts = np.maximum(rows_max - rows_min + 1, 0)
+    total = int(counts.sum())
+    if total == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty
+
+    # Expand to one entry per (triangle, scanline)
+    owner = np.repeat(np.arange(len(setup)), counts)
+    rows = rows_min[owner] + np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    ua, va, ub, vb, s_ab, s_ac, s_bc = setup[owner].T
+    u = rows.astype(np.float64)
+
+    # Span ends on the long edge and on the upper or lower short edge
+    v_long = va + (u - ua) * s_ac
+    v_short = np.where(u <= ub, va + (u - ua) * s_ab, vb + (u - ub) * s_bc)
+
+    first = np.ceil(np.minimum(v_long, v_short) - EDGE_EPSILON).astype(np.int64)
+    last = np.floor(np.maximum(v_long, v_short) + EDGE_EPSILON).astype(np.int64)
+    keep = first <= last
+    return rows[keep], first[keep], last[keep]
+
+
+def rasterize_triangles(plane_points, faces, grid):
+    """
+    Fill projected triangles into a bit-packed mask.
+
+    The grid is processed in bands of TILE_SIZE rows: the spans of all
+    triangles overlapping a band are accumulated in a small difference array,
+    turned into a boolean band and packed 8 pixels per byte. A pixel is filled
+    when its centre lies inside (or on the edge of) a triangle.
+
+    Parameters:
+        plane_points (np.ndarray): (N, 2) projected vertices.
+        faces (np.ndarray): (F, 3) vertex indices per triangle, or None to
+            stamp the points only.
+        grid (RasterGrid): Raster to fill.
+
+    Returns:
+        np.ndarray: (rows, cols // 8) uint8 mask packed along the columns with np.packbits.
+    """
+    rows, cols = grid.shape
+    packed = np.zeros((rows, cols // 8), dtype=np.uint8)
+    pixels = grid.to_pixels(plane_points)
+
+    if faces is not None and len(faces):
+        triangles = pixels[np.asarray(faces)]
+        setup = _scanline_setup(triangles)
+        # Scanlines (pixel rows) whose centre lies within each triangle's row range
+        row_first = np.ceil(triangles[:, :, 0].min(axis=1) - EDGE_EPSILON).astype(np.int64)
+        row_last = np.floor(triangles[:, :, 0].max(axis=1) + EDGE_EPSILON).astype(np.int64)
+        band_of_first = row_first // TILE_SIZE
+        band_of_last = row_last // TILE_SIZE
+        stamp = np.zeros((0, 2), dtype=np.int64)
+    else:
+        # Without faces only the vertices themselves are marked
+        setup = None
+        stamp = np.clip(np.rint(pixels).astype(np.int64), 0, [rows - 1, cols - 1])
+
+    for band in range(rows // TILE_SIZE):
+        row_start = band * TILE_SIZE
+        row_stop = row_start + TILE_SIZE
+        # Difference array of span starts and ends; one extra column absorbs
+        # the end markers of spans reaching the last column
+        width = cols + 1
+        counts = np.zeros(TILE_SIZE * width, dtype=np.int64)
+
+        if setup is not None:
+            in_band = (band_of_first <= band) & (band_of_last >= band)
+            span_rows, first, last = _band_spans(setup[in_band], row_first[in_band], row_last[in_band], row_start, row_stop)
+            first = np.clip(first, 0, cols)
+            last = np.clip(last, -1, cols - 1)
+            valid = first <= last
+            offsets = (span_rows[valid] - row_start) * width
+            counts += np.bincount(offsets + first[valid], minlength=len(counts))
+            counts -= np.bincount(offsets + last[valid] + 1, minlength=len(counts))
+
+        filled = np.cumsum(counts.reshape(TILE_SIZE, width)[:, :cols], axis=1) > 0
+        in_stamp = (stamp[:, 0] >= row_start) & (stamp[:, 0] < row_stop)
+        filled[stamp[in_stamp, 0] - row_start, stamp[in_stamp, 1]] = True
+        packed[row_start:row_stop] = np.packbits(filled, axis=1)
+
+    return packed
+
+
+def unpack_mask(packed, cols=None):
+    """Unpack a bit-packed mask (or a region of one) to a boolean array."""
+    return np.unpackbits(packed, axis=1, count=cols).astype(bool)
+
+
+def tile_states(packed):
+    """
+    Classify every tile of a packed mask.
+
+    Returns:
+        np.ndarray: (rows // TILE_SIZE, cols // TILE_SIZE) int8 array with 0 for
+        empty tiles, 1 for full tiles and -1 for tiles with both.
+    """
+    rows, byte_cols = packed.shape
+    tiles = packed.reshape(rows // TILE_SIZE, TILE_SIZE, byte_cols // (TILE_SIZE // 8), TILE_SIZE // 8)
+    empty = ~tiles.any(axis=(1, 3))
+    full = (tiles == 0xFF).all(axis=(1, 3))
+    return np.where(empty, 0, np.where(full, 1, -1)).astype(np.int8)
+
+
+def boundary_tiles(states):
+    """
+    Return a boolean mask of the tiles a silhouette contour can pass through.
+
+    These are the mixed tiles plus uniform tiles that differ from a uniform neighbour.
+    """
+    active = states < 0
+    for axis in (0, 1):
+        first = [slice(None), slice(None)]
+        second = [slice(None), slice(None)]
+        first[axis] = slice(None, -1)
+        second[axis] = slice(1, None)
+        a, b = states[tuple(first)], states[tuple(second)]
+        differ = (a >= 0) & (b >= 0) & (a != b)
+        active[tuple(first)] |= differ
+        active[tuple(second)] |= differ
+    return active
+
+
+def trace_contours(packed, level=0.5):
+    """
+    Trace the contours of a packed mask, tile cluster by tile cluster.
+
+    Connected groups of boundary tiles are unpacked with a one pixel margin and
+    passed to find_contours separately, so empty and solid areas of the grid
+    are never unpacked or scanned. Every contour only passes through the tiles
+    of one group (and the uniform tiles next to them).
+
+    Parameters:
+        packed (np.ndarray): Mask from rasterize_triangles.
+        level (float): Contour level passed to find_contours.
+
+    Returns:
+        list: (K, 2) contours in pixel coordinates of the whole grid.
+    """
+    rows = packed.shape[0]
+    cols = packed.shape[1] * 8
+    clusters, count = ndimage.label(boundary_tiles(tile_states(packed)), structure=np.ones((3, 3)))
+
+    contours = []
+    for label, (tile_rows, tile_cols) in enumerate(ndimage.find_objects(clusters), start=1):
+        row_start = max(tile_rows.start * TILE_SIZE - 1, 0)
+        row_stop = min(tile_rows.stop * TILE_SIZE + 1, rows)
+        col_start = max(tile_cols.start * TILE_SIZE - 1, 0)
+        col_stop = min(tile_cols.stop * TILE_SIZE + 1, cols)
+
+        # Unpack only the byte columns covering the cluster
+        byte_start = col_start // 8
+        region = unpack_mask(packed[row_start:row_stop, byte_start:-(-col_stop // 8)])
+        region = region[:, col_start - byte_start * 8:col_stop - byte_start * 8]
+
+        for contour in measure.find_contours(region.astype(np.uint8), level=level):
+            contour = contour + (row_start, col_start)
+            # The bounding box may overlap another cluster; keep only this cluster's contours
+            tiles = np.floor(contour).astype(np.int64) // TILE_SIZE
+            if clusters[tiles[:, 0], tiles[:, 1]].max() == label:
+                contours.append(contour)
+    return contours
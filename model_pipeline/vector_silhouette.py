@@ -0,0 +1,188 @@
+# vector_silhouette.py computes the exact outline of a mesh projected onto a plane as Shapely polygons, without rasterizing. Projected triangles are grouped into connected patches of the same orientation; each patch is a non-overlapping coverage and is merged with Shapely's fast coverage union. The patch outlines are then merged with unary unions guided by an STRtree, so only patches that actually overlap are unioned together. The result keeps holes and is in the mesh's own units (millimetres for the lock parts).
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import shapely
+from shapely import STRtree
+from shapely.errors import GEOSException
+from shapely.geometry.polygon import orient
+
+from mesh_segmentation import face_adjacency, union_find
+
+# Projected triangles with |area| below this fraction of the squared extent are dropped
+DEGENERATE_AREA = 1e-12
+# Relative area mismatch that reveals an overlapping (non-coverage) patch
+COVERAGE_TOLERANCE = 1e-9
+# Precision grid, as a fraction of the extent, for unions GEOS cannot node exactly
+SNAP_GRID = 1e-7
+# Holes smaller than this fraction of the squared extent are round-off slivers between patches
+SLIVER_AREA = 1e-9
+
+
+def is_closed(faces):
+    """Return True when every edge of the mesh is shared by exactly two faces."""
+    edges = np.sort(np.asarray(faces)[:, [0, 1, 1, 2, 2, 0]].reshape(-1, 2), axis=1).astype(np.int64)
+    keys = edges[:, 0] * (edges.max() + 1) + edges[:, 1]
+    _, counts = np.unique(keys, return_counts=True)
+    return bool(np.all(counts == 2))
+
+
+def projected_triangles(plane_points, faces):
+    """
+    Project triangles and compute their signed areas in the plane.
+
+    Parameters:
+        plane_points (np.ndarray): (N, 2) projected vertices.
+        faces (np.ndarray): (F, 3) vertex indices per triangle.
+
+    Returns:
+        tuple: (triangles, signed_areas, keep) where triangles is (F, 3, 2),
+        signed_areas is positive for counter-clockwise triangles and keep marks
+        the non-degenerate ones.
+    """
+    plane_points = np.asarray(plane_points, dtype=np.float64)
+    triangles = plane_points[np.asarray(faces)]
+    first = triangles[:, 1] - triangles[:, 0]
+    second = triangles[:, 2] - triangles[:, 0]
+    signed_areas = (first[:, 0] * second[:, 1] - first[:, 1] * second[:, 0]) / 2
+
+    extent = float(np.ptp(plane_points, axis=0).max()) if len(plane_points) else 0.0
+    keep = np.abs(signed_areas) > DEGENERATE_AREA * extent ** 2
+    return triangles, signed_areas, keep
+
+
+def orientation_patches(faces, signs):
+    """
+    Label connected patches of faces that share an edge and have the same orientation.
+
+    Parameters:
+        faces (np.ndarray): (F, 3) vertex indices of the kept triangles.
+        signs (np.ndarray): (F,) orientation (+1 or -1) of each triangle in the plane.
+
+    Returns:
+        np.ndarray: (F,) patch label per face.
+    """
+    pairs = face_adjacency(faces)
+    pairs = pairs[signs[pairs[:, 0]] == signs[pairs[:, 1]]]
+    return union_find(len(faces), pairs)
+
+
+def _union(geometries, grid_size):
+    """Unary union that falls back to a snapped precision grid on robustness errors."""
+    try:
+        return shapely.union_all(geometries)
+    except GEOSException:
+        return shapely.union_all(geometries, grid_size=grid_size)
+
+
+def _patch_outline(polygons, area, grid_size):
+    """Merge the triangles of one patch, with a full union when they overlap."""
+    try:
+        merged = shapely.coverage_union_all(polygons)
+    except GEOSException:
+        merged = None
+    # A folded patch overlaps itself, which the coverage union cannot handle
+    if merged is None or not merged.is_valid or abs(merged.area - area) > COVERAGE_TOLERANCE * max(area, 1.0):
+        merged = _union(polygons, grid_size)
+    return merged
+
+
+def merge_overlapping(geometries, grid_size=0.0):
+    """
+    Union geometries in groups of overlapping ones.
+
+    An STRtree finds the intersecting pairs, which are grouped with union-find;
+    each group is merged with one unary union and disjoint geometries are
+    passed through untouched.
+
+    Parameters:
+        geometries (np.ndarray): Array of Shapely geometries.
+        grid_size (float): Precision grid used if an exact union fails.
+
+    Returns:
+        list: Merged geometries, one per group.
+    """
+    geometries = np.asarray(geometries, dtype=object)
+    if len(geometries) < 2:
+        return list(geometries)
+
+    tree = STRtree(geometries)
+    pairs = tree.query(geometries, predicate='intersects').T
+    labels = union_find(len(geometries), pairs)
+
+    order = np.argsort(labels, kind='stable')
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    return [
+        group_geometries[0] if len(group_geometries) == 1 else _union(group_geometries, grid_size)
+        for group_geometries in (geometries[group] for group in np.split(order, boundaries))
+    ]
+
+
+def drop_slivers(polygon, min_area):
+    """Return the polygon without holes whose area is below min_area."""
+    holes = [hole for hole in polygon.interiors if shapely.area(shapely.Polygon(hole)) >= min_area]
+    if len(holes) == len(polygon.interiors):
+        return polygon
+    return shapely.Polygon(polygon.exterior, holes)
+
+
+def silhouette_polygons(plane_points, faces, cull_back_faces=None):
+    """
+    Compute the exact silhouette of projected triangles as polygons with holes.
+
+    Parameters:
+        plane_points (np.ndarray): (N, 2) projected vertices.
+        faces (np.ndarray): (F, 3) vertex indices per triangle.
+        cull_back_faces (bool): Drop triangles facing away from the viewer.
+            By default they are dropped only for closed meshes, where the
+            front-facing triangles already cover the whole silhouette.
+
+    Returns:
+        list: Counter-clockwise shapely Polygons, largest first.
+    """
+    faces = np.asarray(faces)
+    triangles, signed_areas, keep = projected_triangles(plane_points, faces)
+    if cull_back_faces is None:
+        cull_back_faces = is_closed(faces)
+    if cull_back_faces:
+        keep &= signed_areas > 0
+    if not np.any(keep):
+        return []
+
+    triangles = triangles[keep]
+    signs = np.sign(signed_areas[keep])
+    labels = orientation_patches(faces[keep], signs)
+    polygons = shapely.polygons(np.concatenate([triangles, triangles[:, :1]], axis=1))
+    areas = np.abs(signed_areas[keep])
+    extent = float(np.ptp(triangles.reshape(-1, 2), axis=0).max())
+    grid_size = SNAP_GRID * extent
+
+    order = np.argsort(labels, kind='stable')
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    outlines = [_patch_outline(polygons[patch], areas[patch].sum(), grid_size) for patch in np.split(order, boundaries)]
+
+    parts = shapely.get_parts(np.array(merge_overlapping(outlines, grid_size), dtype=object))
+    parts = [
+        orient(drop_slivers(part, SLIVER_AREA * extent ** 2))
+        for part in parts if part.geom_type == 'Polygon' and not part.is_empty
+    ]
+    return sorted(parts, key=lambda part: part.area, reverse=True)
+
+
+def plane_silhouettes(planes, faces, workers=None):
+    """
+    Compute the silhouettes of several projections concurrently.
+
+    Shapely 2 releases the GIL inside GEOS operations, so the planes run in threads.
+
+    Parameters:
+        planes (list): (N, 2) projected vertices per plane, e.g. from project_to_2d_planes.
+        faces (np.ndarray): (F, 3) vertex indices per triangle.
+        workers (int): Threads to use; one per plane by default.
+
+    Returns:
+        list: One list of polygons per plane, in input order.
+    """
+    cull_back_faces = is_closed(faces)
+    with ThreadPoolExecutor(max_workers=workers or len(planes)) as executor:
+        return list(executor.map(lambda plane_points: silhouette_polygons(plane_points, faces, cull_back_faces), planes))